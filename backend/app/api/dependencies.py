@@ -4,20 +4,51 @@ from typing import Optional
 
 from app import crud, models
 from app.core.config import settings
+from app.core.principal_cache import PlayerPrincipal, principal_cache
 from app.db.session import get_db
 from app.game_state import active_game_sessions  # <<< ADDED THIS IMPORT
 from fastapi import Depends, Header, HTTPException, status
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 ALGORITHM = settings.ALGORITHM
 SECRET_KEY = settings.SECRET_KEY
 
 
+def get_principal_from_token(token: str, db: Session) -> Optional[PlayerPrincipal]:
+    """
+    Verifies a JWT and returns the player it belongs to, or None.
+    Served from principal_cache when the token was verified recently; otherwise the
+    token is decoded, the Player row is loaded once, and the result is cached.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    from jose import JWTError, jwt  # Off the import path; see app.core.security
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        player_id_str: Optional[str] = payload.get("sub")
+        if player_id_str is None:
+            return None
+        player_uuid = uuid.UUID(player_id_str)
+    except (JWTError, ValueError):
+        return None
+
+    player = crud.crud_player.get_player(db, player_id=player_uuid)
+    if player is None:
+        return None
+    principal = PlayerPrincipal(
+        id=player.id, username=player.username, is_sysop=player.is_sysop
+    )
+    principal_cache.put(token, principal, token_expires_at=payload.get("exp"))
+    return principal
+
+
 async def get_current_player(
     db: Session = Depends(get_db),
     authorization: Optional[str] = Header(None),  # <<< THIS IS THE MAGIC
-) -> models.Player:
+) -> PlayerPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,29 +66,26 @@ async def get_current_player(
     except ValueError:
         raise credentials_exception
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username_or_player_id: Optional[str] = payload.get("sub")
-        if username_or_player_id is None:
-            raise credentials_exception
-
-        try:
-            player_uuid = uuid.UUID(username_or_player_id)
-        except ValueError:
-            raise credentials_exception
-
-    except JWTError:
+    principal = get_principal_from_token(token, db)
+    if principal is None:
         raise credentials_exception
+    return principal
 
-    player = crud.crud_player.get_player(db, player_id=player_uuid)
-    if player is None:
-        raise credentials_exception
-    return player
+
+async def get_current_sysop(
+    current_player: PlayerPrincipal = Depends(get_current_player),
+) -> PlayerPrincipal:
+    if not current_player.is_sysop:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A strange force prevents you from seeing that.",
+        )
+    return current_player
 
 
 async def get_current_active_character(
     db: Session = Depends(get_db),
-    current_player: models.Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player),
 ) -> models.Character:
     character_id = active_game_sessions.get(current_player.id)
 
@@ -67,7 +95,8 @@ async def get_current_active_character(
             detail="No active character selected for this session. Please select a character.",
         )
 
-    character = crud.crud_character.get_character(db, character_id=character_id)
+    # Primary-key lookup; the owner comes along in the same query (Character.owner is lazy="joined").
+    character = db.get(models.Character, character_id)
     if not character:
         active_game_sessions.pop(current_player.id, None)
         raise HTTPException(
@@ -4,6 +4,7 @@ from .endpoints import (  # This imports the router from endpoints/room.py
     character,
     character_class,
     command,
+    debug,
     hotbar,
     inventory,
     map,
@@ -27,3 +28,4 @@ api_router.include_router(
     character_class.router, prefix="/character-class", tags=["Character Classes"]
 )
 api_router.include_router(hotbar.router, prefix="/character/me", tags=["Hotbar"])
+api_router.include_router(debug.router, prefix="/debug", tags=["Debug"])
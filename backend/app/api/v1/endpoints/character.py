@@ -3,11 +3,15 @@ import logging
 import uuid
 from typing import Any, List  # Ensure List and Any are imported
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.principal_cache import PlayerPrincipal
 from app.schemas.abilities import CharacterAbilitiesResponse
-from app.websocket_manager import connection_manager  # Import connection_manager
+from app.websocket_manager import (  # Import connection_manager
+    WHO_LIST_VERSION_HEADER,
+    connection_manager,
+)
 
 from .... import crud, models, schemas
 
@@ -29,7 +33,7 @@ def create_new_character_for_current_player(
     character_payload: schemas.CharacterCreate = Body(
         ...
     ),  # Contains name, optional class_name
-    current_player: models.Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player),
 ) -> Any:
     # ... (existing_character check remains the same) ...
     existing_character = crud.crud_character.get_character_by_name(
@@ -67,7 +71,7 @@ def create_new_character_for_current_player(
 @router.get("/mine", response_model=List[schemas.Character])
 def read_characters_for_current_player(
     db: Session = Depends(get_db),
-    current_player: models.Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player),
 ):
     """
     Retrieve all characters for the currently authenticated player.
@@ -85,7 +89,7 @@ def select_character_for_session(
     *,
     db: Session = Depends(get_db),
     character_id: uuid.UUID,
-    current_player: models.Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player),
 ) -> Any:
     """
     Selects a character to be the active character for the player's session.
@@ -258,27 +262,17 @@ async def get_player_abilities(
 
 @router.get("/who_list", response_model=List[schemas.WhoListEntry])
 def get_who_list(
-    db: Session = Depends(get_db),
+    response: Response,
     # current_player: models.Player = Depends(get_current_player) # Optional: secure if needed, but who list is often public
 ) -> Any:
     """
     Retrieve a list of all currently online characters.
+    Served from the connection manager's online-character index, already sorted by name.
+    The version header lets clients apply later who_list_updated diffs on top of it.
     """
-    online_character_ids = list(connection_manager.player_active_characters.values())
-
-    who_list_entries: List[schemas.WhoListEntry] = []
-    for char_id in online_character_ids:
-        character = crud.crud_character.get_character(db, character_id=char_id)
-        if character:
-            who_list_entries.append(
-                schemas.WhoListEntry(
-                    name=character.name,
-                    class_name=character.class_name,
-                    level=character.level,
-                    experience_points=character.experience_points,
-                )
-            )
-
-    # Sort by name for consistent display
-    who_list_entries.sort(key=lambda x: x.name.lower())
+    response.headers[WHO_LIST_VERSION_HEADER] = str(connection_manager.who_list_version)
+    who_list_entries: List[schemas.WhoListEntry] = [
+        schemas.WhoListEntry(**online.as_who_entry())
+        for online in connection_manager.get_online_characters()
+    ]
     return who_list_entries
@@ -1,8 +1,9 @@
 # backend/app/api/v1/endpoints/character_class.py (NEW FILE)
 from typing import List
 
-from app import crud, models, schemas  # app.
+from app import crud, schemas  # app.
 from app.api.dependencies import get_current_player
+from app.core.principal_cache import PlayerPrincipal
 from app.db.session import get_db
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
@@ -32,7 +33,7 @@ def read_available_character_class_templates(
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_player: models.Player = Depends(get_current_player),  # Protect the endpoint
+    current_player: PlayerPrincipal = Depends(get_current_player),  # Protect the endpoint
 ):
     """
     Retrieve a list of all available character class templates for a logged-in user.
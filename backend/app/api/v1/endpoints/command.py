@@ -32,7 +32,7 @@ COMMAND_REGISTRY: Dict[str, CommandHandler] = {}
 # <<< THE FUNCTION DEFINITION YOU RIGHTFULLY POINTED OUT WAS MISSING FROM MY EXPLANATION >>>
 def build_command_registry():
     """
-    Dynamically builds the command registry at startup.
+    Dynamically builds the command registry at startup (main.lifespan).
     This function populates the COMMAND_REGISTRY with both static commands
     and dynamic chat commands loaded from the chat_channels.json file.
     """
@@ -102,6 +102,10 @@ def build_command_registry():
         "list": shop_parser.handle_list,
         "buy": shop_parser.handle_buy,
         "sell": shop_parser.handle_sell,
+        # Chat channel subscriptions
+        "channels": chat_parser.handle_channels,
+        "join": chat_parser.handle_join_channel,
+        "leave": chat_parser.handle_leave_channel,
     }
     COMMAND_REGISTRY.update(static_commands)
 
@@ -112,7 +116,11 @@ def build_command_registry():
     logger.info(f"Command registry built with {len(COMMAND_REGISTRY)} total commands.")
 
 
-build_command_registry()
+def get_command_registry() -> Dict[str, CommandHandler]:
+    """The registry, built on first use if the lifespan hasn't built it yet (e.g. in tests)."""
+    if not COMMAND_REGISTRY:
+        build_command_registry()
+    return COMMAND_REGISTRY
 
 
 # <<< NEW CORE LOGIC FUNCTION >>>
@@ -144,7 +152,7 @@ async def execute_command_logic(context: CommandContext) -> schemas.CommandRespo
             )
 
     # 1. Check the dynamically-built command registry.
-    handler = COMMAND_REGISTRY.get(context.command_verb)
+    handler = get_command_registry().get(context.command_verb)
     if handler:
         return await handler(context)
 
@@ -216,8 +224,7 @@ async def process_command_for_character(
     # Call the new shared logic function
     response = await execute_command_logic(context)
 
-    # HTTP endpoint still needs to commit the transaction if changes were made
-    if response.message_to_player or response.room_data or response.special_payload:
-        db.commit()
+    # Commands only stage their changes; this is the one commit for the HTTP path
+    db.commit()
 
     return response
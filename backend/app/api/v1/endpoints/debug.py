@@ -0,0 +1,58 @@
+# backend/app/api/v1/endpoints/debug.py
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.dependencies import get_current_sysop
+from app.core.loop_monitor import loop_monitor
+from app.core.principal_cache import PlayerPrincipal
+from app.db import session as db_session
+from app.db.session_stats import session_stats
+from app.services.chat_history import chat_history
+from app.services.chat_manager import chat_manager
+
+router = APIRouter()
+
+
+@router.get("/db_sessions")
+def get_db_session_report(
+    sort_by: str = Query("hold_total_s", description="Any report column, e.g. wait_max_ms or queries"),
+    limit: int = Query(25, ge=1, le=500),
+    reset: bool = Query(False, description="Clear the counters after reading them"),
+    sysop: PlayerPrincipal = Depends(get_current_sysop),
+) -> Dict[str, Any]:
+    """
+    Which code paths (WS verbs, ticker tasks, HTTP routes) hold pooled DB connections
+    longest, wait longest for one, and run the most queries.
+    """
+    pool_status = db_session.engine.pool.status() if db_session.engine else None
+    rows: List[Dict[str, Any]] = session_stats.report(sort_by=sort_by, limit=limit)
+    if reset:
+        session_stats.reset()
+    return {"pool": pool_status, "tags": rows}
+
+
+@router.get("/loop")
+def get_loop_report(
+    limit: int = Query(20, ge=1, le=500),
+    stacks: bool = Query(True, description="Include the captured stack of each stall"),
+    reset: bool = Query(False, description="Clear the stall history after reading it"),
+    sysop: PlayerPrincipal = Depends(get_current_sysop),
+) -> Dict[str, Any]:
+    """
+    Event-loop scheduling lag and the most recent stalls, each with the stack of
+    whatever was holding the loop.
+    """
+    report = loop_monitor.report(limit=limit, include_stacks=stacks)
+    if reset:
+        loop_monitor.reset()
+    return report
+
+
+@router.get("/chat")
+def get_chat_report(sysop: PlayerPrincipal = Depends(get_current_sysop)) -> Dict[str, Any]:
+    """
+    Per-channel messages/sec, deliveries and rate-limit drops, plus the chat
+    history buffers and archive queue.
+    """
+    return {"channels": chat_manager.get_stats(), "history": chat_history.get_stats()}
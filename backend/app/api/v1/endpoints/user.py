@@ -3,13 +3,17 @@ import logging
 from datetime import timedelta  # For token expiration
 from typing import Any
 
-from app import crud, models, schemas  # Import schemas, crud, models
+from app import crud, schemas  # Import schemas, crud
 from app.api.dependencies import get_current_player  # Add this import
 from app.core.config import settings  # For ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.principal_cache import PlayerPrincipal, principal_cache
 from app.core.security import (  # Import create_access_token
+    PasswordHasherBusy,
     create_access_token,
-    verify_password,
+    hash_password,
+    verify_and_update_password,
 )
+from app.db.async_db import run_db
 from app.db.session import get_db
 from fastapi import (  # Added Body
     APIRouter,
@@ -53,19 +57,29 @@ def debug_headers(request: Request):
 
 
 @router.post("/login", response_model=Token)
-def login_user_for_access_token(
+async def login_user_for_access_token(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     try:
-        player = crud.crud_player.get_player_by_username(
-            db, username=form_data.username
+        player = await run_db(
+            crud.crud_player.get_player_by_username, db, username=form_data.username
         )
-        if not player or not verify_password(form_data.password, player.hashed_password):  # type: ignore
+        password_ok, upgraded_hash = (
+            await verify_and_update_password(form_data.password, player.hashed_password)
+            if player
+            else (False, None)
+        )
+        if not password_ok:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if upgraded_hash:
+            # Stored hash used an old cost factor; swap in the rehash made during verification.
+            player.hashed_password = upgraded_hash
+            await run_db(db.commit)
+            logger.info(f"Rehashed password for player '{player.username}' on login.")
 
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -74,6 +88,13 @@ def login_user_for_access_token(
         return Token(access_token=access_token, token_type="bearer")
     except HTTPException as http_exc:
         raise http_exc
+    except PasswordHasherBusy:
+        logger.warning("Login rejected: password hashing queue is full.")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins right now. Please try again in a moment.",
+            headers={"Retry-After": "2"},
+        )
     except Exception:
         import traceback
 
@@ -84,19 +105,25 @@ def login_user_for_access_token(
 
 
 @router.get("/me", response_model=schemas.Player)
-def read_users_me(current_player: models.Player = Depends(get_current_player)) -> Any:
+def read_users_me(current_player: PlayerPrincipal = Depends(get_current_player)) -> Any:
     return current_player
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout_user(current_player: PlayerPrincipal = Depends(get_current_player)):
+    """Drops the player's cached auth principals; the next request re-verifies against the DB."""
+    principal_cache.invalidate_player(current_player.id)
+
+
 @router.post(
     "/register", response_model=schemas.Player, status_code=status.HTTP_201_CREATED
 )
-def register_new_user(
+async def register_new_user(
     *, db: Session = Depends(get_db), player_in: schemas.PlayerCreate
 ) -> Any:
     try:
-        existing_player = crud.crud_player.get_player_by_username(
-            db, username=player_in.username
+        existing_player = await run_db(
+            crud.crud_player.get_player_by_username, db, username=player_in.username
         )
         if existing_player:
             raise HTTPException(
@@ -106,14 +133,20 @@ def register_new_user(
 
         # --- THE GENESIS PROTOCOL ---
         # Check if any players exist in the database.
-        is_first_player = crud.crud_player.count_players(db) == 0
+        is_first_player = await run_db(crud.crud_player.count_players, db) == 0
 
         if is_first_player:
             logger.info("The Genesis Player is registering. Anointing as Sysop.")
 
         # Call the modified create_player function, passing the result of our check.
-        player = crud.crud_player.create_player(
-            db, player_in=player_in, is_sysop=is_first_player
+        # DB calls go through run_db: this endpoint is async, so it runs on the event loop.
+        hashed_password = await hash_password(player_in.password)
+        player = await run_db(
+            crud.crud_player.create_player,
+            db,
+            player_in=player_in,
+            is_sysop=is_first_player,
+            hashed_password=hashed_password,
         )
         # --- END GENESIS PROTOCOL ---
 
@@ -121,6 +154,13 @@ def register_new_user(
 
     except HTTPException as http_exc:
         raise http_exc
+    except PasswordHasherBusy:
+        logger.warning("Registration rejected: password hashing queue is full.")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is busy. Please try again in a moment.",
+            headers={"Retry-After": "2"},
+        )
     except Exception:
         import traceback
 
@@ -2,7 +2,8 @@
 import logging
 from typing import List
 
-from app import crud, models, schemas
+from app import models, schemas
+from app.services.chat_history import chat_history
 from app.services.chat_manager import chat_manager
 from app.websocket_manager import connection_manager
 from sqlalchemy.orm import Session
@@ -84,19 +85,34 @@ async def _handle_broadcast_channel(
     payload_self = {**base_payload, "is_self": True}
 
     # --- Broadcast to subscribers ---
-    # For now, we subscribe everyone to public channels upon connection. A more advanced
-    # system would have join/leave commands. Let's assume everyone is subscribed.
-    subscribers = connection_manager.get_all_active_player_ids()  # Simple for now
-
     sender_player_id = character.player_id
-    other_player_ids = [pid for pid in subscribers if pid != sender_player_id]
-
-    # Send to others
-    if other_player_ids:
-        await connection_manager.broadcast_to_players(
-            {"type": "chat_message", "payload": payload_other}, other_player_ids
+    if not chat_manager.is_subscribed(sender_player_id, channel.channel_id_tag):
+        return schemas.CommandResponse(
+            message_to_player=f"You are not listening to {channel.display_name}. Type 'join {channel.channel_id_tag}' first."
         )
 
+    rate_limit_reason = chat_manager.check_rate_limit(
+        sender_player_id, channel.channel_id_tag
+    )
+    if rate_limit_reason:
+        return schemas.CommandResponse(message_to_player=rate_limit_reason)
+
+    # Encoded once and fanned out as text, instead of re-serialized per recipient.
+    encoded_other = connection_manager.encode_payload(
+        {"type": "chat_message", "payload": payload_other}
+    )
+    # Snapshot the recipients: the subscriber set can change while sends are awaited.
+    recipient_ids = [
+        pid
+        for pid in chat_manager.get_subscribers(channel.channel_id_tag)
+        if pid != sender_player_id
+    ]
+    delivered = await connection_manager.send_encoded_to_players(
+        encoded_other, recipient_ids
+    )
+    chat_manager.record_message(channel.channel_id_tag, delivered)
+    chat_history.record(channel.channel_id_tag, character.name, message_text)
+
     # Send confirmation to self
     await connection_manager.send_personal_message(
         {"type": "chat_message", "payload": payload_self}, sender_player_id
@@ -119,17 +135,15 @@ async def _handle_tell_channel(
     target_name = args[0]
     message_text = " ".join(args[1:])
 
-    # Find the target character. They must be online.
-    target_char = crud.crud_character.get_character_by_name(db, name=target_name)
+    # Resolved from the online-character index: no DB round trip, and a unique prefix works too.
+    target_char = connection_manager.resolve_online_character(target_name)
 
-    if not target_char or not connection_manager.is_player_connected(
-        target_char.player_id
-    ):
+    if not target_char:
         return schemas.CommandResponse(
             message_to_player=f"You can't seem to find '{target_name}' online."
         )
 
-    if target_char.id == character.id:
+    if target_char.character_id == character.id:
         return schemas.CommandResponse(
             message_to_player="Talking to yourself is the first sign of madness."
         )
@@ -169,3 +183,63 @@ async def _handle_tell_channel(
     )
 
     return schemas.CommandResponse()  # No direct message_to_player needed
+
+
+# --- Channel Subscription Commands ---
+
+
+async def handle_channels(context: CommandContext) -> schemas.CommandResponse:
+    """Lists the channels the player can listen to and whether they are subscribed."""
+    player_id = context.active_character.player_id
+    lines = ["Chat channels:"]
+    for tag, channel in chat_manager.channels.items():
+        if not chat_manager.is_subscribable(channel):
+            continue
+        if not chat_manager.player_can_access(channel, context.active_character.owner):
+            continue
+        state = "on" if chat_manager.is_subscribed(player_id, tag) else "off"
+        aliases = ", ".join(channel.command_aliases)
+        lines.append(f"  {channel.display_name} ({tag}) [{state}] - {aliases}")
+    lines.append("Use 'join <channel>' or 'leave <channel>'.")
+    return schemas.CommandResponse(message_to_player="\n".join(lines))
+
+
+def _resolve_subscribable_channel(context: CommandContext, verb: str):
+    if not context.args:
+        return None, f"{verb.capitalize()} which channel?"
+    channel = chat_manager.find_channel(context.args[0])
+    if not channel or not chat_manager.is_subscribable(channel):
+        return None, f"There is no channel called '{context.args[0]}'."
+    if not chat_manager.player_can_access(channel, context.active_character.owner):
+        return None, "You don't have permission to use that channel."
+    return channel, None
+
+
+async def handle_join_channel(context: CommandContext) -> schemas.CommandResponse:
+    channel, error = _resolve_subscribable_channel(context, "join")
+    if error:
+        return schemas.CommandResponse(message_to_player=error)
+    player_id = context.active_character.player_id
+    if chat_manager.is_subscribed(player_id, channel.channel_id_tag):
+        return schemas.CommandResponse(
+            message_to_player=f"You are already listening to {channel.display_name}."
+        )
+    chat_manager.subscribe_player(player_id, channel.channel_id_tag)
+    return schemas.CommandResponse(
+        message_to_player=f"You are now listening to {channel.display_name}."
+    )
+
+
+async def handle_leave_channel(context: CommandContext) -> schemas.CommandResponse:
+    channel, error = _resolve_subscribable_channel(context, "leave")
+    if error:
+        return schemas.CommandResponse(message_to_player=error)
+    player_id = context.active_character.player_id
+    if not chat_manager.is_subscribed(player_id, channel.channel_id_tag):
+        return schemas.CommandResponse(
+            message_to_player=f"You aren't listening to {channel.display_name}."
+        )
+    chat_manager.unsubscribe_player(player_id, channel.channel_id_tag)
+    return schemas.CommandResponse(
+        message_to_player=f"You stop listening to {channel.display_name}."
+    )
@@ -28,8 +28,9 @@ async def handle_giveme(context: CommandContext) -> schemas.CommandResponse:
                     quantity=1,
                 )
             )
-            context.db.commit()  # Commit the change
+            context.db.flush()  # Staged; the caller commits
             # VERY IMPORTANT: Re-fetch the character to update relationships like inventory
+            context.db.expire(context.active_character, ["inventory_items"])
             context.active_character = crud.crud_character.get_character(
                 context.db, character_id=context.active_character.id
             )
@@ -114,9 +115,7 @@ async def handle_set_hp(context: CommandContext) -> schemas.CommandResponse:
     if character.current_health > character.max_health:
         character.current_health = character.max_health
 
-    context.db.add(character)
-    context.db.commit()
-    context.db.refresh(character)
+    context.db.add(character)  # Staged; the caller commits
     return schemas.CommandResponse(
         room_data=context.current_room_schema,
         message_to_player=f"HP set to {character.current_health}/{character.max_health}.",
@@ -147,12 +146,11 @@ async def handle_mod_xp(context: CommandContext) -> schemas.CommandResponse:
             message_to_player="Error modifying XP.",
         )
 
-    context.db.commit()  # Commit the changes from add_experience
-    context.db.refresh(updated_char)
+    # add_experience staged its changes; the caller commits
 
-    await connection_manager.broadcast({"type": "who_list_updated"})  # Broadcast update
+    connection_manager.schedule_who_list_update()
     logger.info(
-        f"Debug command mod_xp used for char {updated_char.name}. Broadcasted who_list_updated."
+        f"Debug command mod_xp used for char {updated_char.name}. Scheduled who_list_updated."
     )
 
     full_message = "\n".join(messages)
@@ -221,12 +219,12 @@ async def handle_set_level(context: CommandContext) -> schemas.CommandResponse:
             "Warning: Max iterations reached in set_level. Level may not be correctly set."
         )
 
-    context.db.commit()
-    context.db.refresh(character)
+    # Staged; the caller commits, and the who list follows once it does
+    connection_manager.index_online_character_on_commit(context.db, character)
 
-    await connection_manager.broadcast({"type": "who_list_updated"})  # Broadcast update
+    connection_manager.schedule_who_list_update()
     logger.info(
-        f"Debug command set_level used for char {character.name}. Broadcasted who_list_updated."
+        f"Debug command set_level used for char {character.name}. Scheduled who_list_updated."
     )
 
     messages.append(
@@ -274,9 +272,7 @@ async def handle_set_money(context: CommandContext) -> schemas.CommandResponse:
     character.silver_coins = silver
     character.copper_coins = copper
 
-    context.db.add(character)
-    context.db.commit()
-    context.db.refresh(character)
+    context.db.add(character)  # Staged; the caller commits
 
     message = f"Currency set to: {plat}p {gold}g {silver}s {copper}c."
     return schemas.CommandResponse(
@@ -146,8 +146,7 @@ async def handle_unlock(context: CommandContext) -> schemas.CommandResponse:
             current_room_orm.exits = updated_exits_dict
 
             attributes.flag_modified(current_room_orm, "exits")
-            context.db.add(current_room_orm)
-            context.db.commit()
+            context.db.add(current_room_orm)  # Staged; the caller commits
 
             message_to_player = f"You try the {successfully_unlocked_with_item.name}... *click* It unlocks the way {target_direction}!"
 
@@ -264,9 +263,7 @@ async def handle_search(context: CommandContext) -> schemas.CommandResponse:
             room_interactables_list_of_dicts  # Assign modified list back
         )
         attributes.flag_modified(current_room_orm, "interactables")
-        context.db.add(current_room_orm)
-        context.db.commit()
-        # context.db.refresh(current_room_orm) # If schema needs immediate reflection of change
+        context.db.add(current_room_orm)  # Staged; the caller commits
 
     if (
         not found_something_new and len(messages_to_player) == 1
@@ -366,12 +363,8 @@ async def handle_contextual_interactable_action(
                                 )
 
                         if rooms_actually_modified_this_action:
-                            context.db.commit()
-                            # Refresh the current room ORM if it was among those modified,
-                            # to ensure the response_room_schema is up-to-date.
-                            if current_room_orm in rooms_actually_modified_this_action:
-                                context.db.refresh(current_room_orm)
-
+                            # Staged; the caller commits. current_room_orm already holds
+                            # the change, so the response_room_schema is up-to-date.
                             response_room_schema = schemas.RoomInDB.from_orm(
                                 current_room_orm
                             )  # Update with potentially changed current room
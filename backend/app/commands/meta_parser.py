@@ -27,10 +27,7 @@ async def handle_autoloot(context: CommandContext) -> schemas.CommandResponse:
         )
 
     character_orm.autoloot_enabled = not character_orm.autoloot_enabled
-    context.db.add(character_orm)
-    context.db.commit()
-    # No need to refresh context.active_character here as the command response doesn't depend on it,
-    # but the change is in the DB. The character_orm instance is up-to-date.
+    context.db.add(character_orm)  # Staged; the caller commits
 
     status = "enabled" if character_orm.autoloot_enabled else "disabled"
     return schemas.CommandResponse(
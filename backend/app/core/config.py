@@ -19,12 +19,58 @@ class Settings(BaseSettings):
         if IS_ALEMBIC_ENV_PY_CONTEXT
         else os.getenv("DATABASE_URL", "postgresql://user:password@db/llmud_db")
     )  # Added os.getenv for normal case
+    # Connection pool. pool_size + max_overflow is the most connections one process opens.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 5000  # 0 disables; Postgres only
+    # Sessions holding a connection longer than this are logged with their tag.
+    DB_SLOW_SESSION_HOLD_SECONDS: float = 0.5
+    # Threads that run DB calls off the event loop (app.db.async_db). Keep below DB_POOL_SIZE.
+    DB_ASYNC_WORKERS: int = 4
+    # WS commands committing within this window share one batch and one WAL flush (0 disables).
+    DB_GROUP_COMMIT_WINDOW_MS: float = 2.0
+    DB_GROUP_COMMIT_MAX_BATCH: int = 64
+    # Fraction of WS commands and ticker tasks checked against app.db.query_budget (0 disables).
+    QUERY_BUDGET_SAMPLE_RATE: float = 0.05
+    # Online characters' HP/MP/XP/coins/room are written behind (app.services.character_state)
+    # at most this often; it is also the most a crash can lose. 0 writes every change through.
+    CHARACTER_FLUSH_INTERVAL_SECONDS: float = 3.0
+    # Startup seeding (app.db.seeding): seeders whose files are unchanged are skipped unless
+    # forced; independent seeders run on this many threads (always one on SQLite).
+    SEED_FORCE: bool = False
+    SEED_WORKERS: int = 4
+    # Warm-up after startup (app.core.warmup): /readyz answers 503 until it has finished, and a
+    # WS connect that arrives before then waits up to this long for it before being served cold.
+    WARMUP_WS_WAIT_SECONDS: float = 10.0
     SECRET_KEY: str = (
         "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"  # CHANGE THIS IN PRODUCTION!
     )
     GEMINI_API_KEY: Optional[str] = None
+    # NPC dialogue: how many provider calls may be in flight at once, and how long each may take.
+    NPC_DIALOGUE_MAX_CONCURRENCY: int = 4
+    NPC_DIALOGUE_TIMEOUT_SECONDS: float = 10.0
+    # Per-NPC tokens per day, enforced before each call. 0 disables the limit.
+    NPC_DIALOGUE_DAILY_TOKEN_BUDGET: int = 20000
+    # Chat: recent messages kept per channel for catch-up on connect, and where they are archived.
+    CHAT_HISTORY_PER_CHANNEL: int = 50
+    CHAT_ARCHIVE_DIR: Optional[str] = None  # None disables archiving
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # Token expires in 7 days
+    # Verified token -> player principal cache used by the auth dependencies.
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10_000
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 300.0
+    # Bcrypt cost factor. Changing it rehashes each player's password on their next login.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # Dedicated password hashing threads, and how many hashes may queue before logins get a 503.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Event-loop monitor: heartbeat period, lag that counts as a stall, stalls kept for /debug/loop.
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.1
+    LOOP_STALL_THRESHOLD_SECONDS: float = 0.25
+    LOOP_STALL_HISTORY: int = 100
+    LOOP_STALL_LOG_FILE: Optional[str] = None  # Rotating file for stall reports; None logs to stdout only
 
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "DEBUG").upper()
     SHOW_COMBAT_ROLLS_TO_PLAYER: bool = (
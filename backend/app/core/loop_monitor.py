@@ -0,0 +1,170 @@
+# backend/app/core/loop_monitor.py
+"""
+Event-loop stall detector.
+
+A heartbeat task sleeps for LOOP_MONITOR_INTERVAL_SECONDS and measures how late it
+wakes up: that lateness is the scheduling delay every socket, ticker and request on
+the loop saw at the same moment. A watchdog thread watches the heartbeat; when it
+hasn't beaten for LOOP_STALL_THRESHOLD_SECONDS the loop is stuck inside one callback,
+so the watchdog snapshots the loop thread's stack -- the `handle_ws_*` handler, ticker
+task or seed loader holding it. When the loop comes back the heartbeat records the
+stall with its real length and that stack.
+
+Healthy loops pay for one sleep per interval and a timestamp check on the watchdog
+thread; stacks are only captured while the loop is stuck.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Frames kept from the innermost end of a captured stack.
+STACK_LIMIT = 25
+# Heartbeat lags kept for the percentile report (about a minute at the default interval).
+RECENT_LAG_SAMPLES = 600
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval: float = settings.LOOP_MONITOR_INTERVAL_SECONDS,
+        threshold: float = settings.LOOP_STALL_THRESHOLD_SECONDS,
+        history: int = settings.LOOP_STALL_HISTORY,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.recent_lags: Deque[float] = deque(maxlen=RECENT_LAG_SAMPLES)
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.stalls_total = 0
+        self.max_lag = 0.0
+
+        self._last_beat = time.monotonic()
+        self._captured_stack: Optional[List[str]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    # --- Heartbeat (loop side) ---
+
+    async def _heartbeat(self, first_beat_due: float):
+        loop = asyncio.get_running_loop()
+        # The first deadline comes from start(): a loop blocked before this task
+        # first runs (startup seeding right after start) is a stall too.
+        expected = first_beat_due
+        while True:
+            await asyncio.sleep(max(0.0, expected - loop.time()))
+            lag = max(0.0, loop.time() - expected)
+            with self._lock:
+                self._last_beat = time.monotonic()
+                stack, self._captured_stack = self._captured_stack, None
+            self.recent_lags.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag >= self.threshold:
+                self._record_stall(lag, stack)
+            expected = loop.time() + self.interval
+
+    def _record_stall(self, lag: float, stack: Optional[List[str]]):
+        self.stalls_total += 1
+        where = stack[-1].strip().splitlines()[0] if stack else "unknown (stall ended before the watchdog looked)"
+        self.stalls.append(
+            {"at": time.time(), "lag_ms": round(lag * 1000, 1), "where": where, "stack": stack or []}
+        )
+        logger.warning(
+            f"Event loop stalled for {lag * 1000:.0f}ms at {where}"
+            + ("\n" + "".join(stack) if stack else "")
+        )
+
+    # --- Watchdog (its own thread) ---
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                stuck_for = time.monotonic() - self._last_beat - self.interval
+                if stuck_for < self.threshold or self._captured_stack is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    # One snapshot per stall: it is the callback that has been running
+                    # for `threshold` already, which is the one worth blaming.
+                    self._captured_stack = traceback.format_stack(frame)[-STACK_LIMIT:]
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Starts monitoring the running loop. Call from the loop's thread."""
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        first_beat_due = asyncio.get_running_loop().time() + self.interval
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(first_beat_due))
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Loop monitor started (interval {self.interval * 1000:.0f}ms, "
+            f"stall threshold {self.threshold * 1000:.0f}ms)."
+        )
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+        self._watchdog = None
+
+    # --- Reporting ---
+
+    def report(self, limit: int = 20, include_stacks: bool = True) -> Dict[str, Any]:
+        lags = sorted(self.recent_lags)
+
+        def percentile(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))] * 1000, 2) if lags else 0.0
+
+        stalls = list(self.stalls)[-limit:][::-1]
+        if not include_stacks:
+            stalls = [{k: v for k, v in stall.items() if k != "stack"} for stall in stalls]
+        return {
+            "running": self._heartbeat_task is not None and not self._heartbeat_task.done(),
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "recent_lag_ms": {"p50": percentile(0.5), "p99": percentile(0.99), "max": percentile(1.0)},
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "stalls_total": self.stalls_total,
+            "stalls": stalls,
+        }
+
+    def reset(self):
+        self.recent_lags.clear()
+        self.stalls.clear()
+        self.stalls_total = 0
+        self.max_lag = 0.0
+
+
+def _attach_stall_log_file():
+    """Optionally mirrors stall reports into their own size-rotated file."""
+    if not settings.LOOP_STALL_LOG_FILE:
+        return
+    handler = RotatingFileHandler(
+        settings.LOOP_STALL_LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+    logger.addHandler(handler)
+
+
+_attach_stall_log_file()
+
+# Global instance
+loop_monitor = LoopMonitor()
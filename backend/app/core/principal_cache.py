@@ -0,0 +1,95 @@
+# backend/app/core/principal_cache.py
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlayerPrincipal:
+    """
+    The authenticated player as the auth dependencies hand it out. Carries only what
+    request handlers read off the player, so it can be cached across sessions.
+    Load the Player row explicitly when anything else is needed.
+    """
+
+    id: uuid.UUID
+    username: str
+    is_sysop: bool
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of verified token -> PlayerPrincipal. An entry lives until the
+    earlier of the TTL and the token's own expiry, so a hit skips both the JWT
+    decode and the Player query.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # token -> (principal, monotonic deadline)
+        self._entries: "OrderedDict[str, Tuple[PlayerPrincipal, float]]" = OrderedDict()
+        self._tokens_by_player: Dict[uuid.UUID, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[PlayerPrincipal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        principal, deadline = entry
+        if time.monotonic() >= deadline:
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return principal
+
+    def put(self, token: str, principal: PlayerPrincipal, token_expires_at: Optional[float] = None):
+        """`token_expires_at` is the JWT 'exp' claim (epoch seconds); the entry never outlives it."""
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._remove(token)
+        self._entries[token] = (principal, time.monotonic() + ttl)
+        self._tokens_by_player.setdefault(principal.id, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            oldest_token = next(iter(self._entries))
+            self._remove(oldest_token)
+
+    def invalidate_player(self, player_id: uuid.UUID):
+        """Drops every cached token for a player, e.g. on logout or when their sysop flag changes."""
+        for token in self._tokens_by_player.pop(player_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_player.clear()
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_player.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_player[entry[0].id]
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+)
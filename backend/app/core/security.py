@@ -1,72 +1,174 @@
 # backend/app/core/security.py
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone  # Use timezone-aware datetimes
-from typing import Any, Optional, Union
-
-from jose import JWTError, jwt  # Import from jose
-from passlib.context import CryptContext
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
 
 from ..core.config import settings  # Import our settings instance
 
-# Initialize CryptContext. We'll use bcrypt.
-# "auto" will use the first scheme (bcrypt) for hashing new passwords
-# and will also be able to verify passwords hashed with any scheme listed.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """
+    The bcrypt CryptContext, built on first use: passlib is slow to import and only
+    register/login need it, so it stays off the startup path.
+
+    "auto" will use the first scheme (bcrypt) for hashing new passwords and will also
+    be able to verify passwords hashed with any scheme listed. Hashes made with a
+    different cost factor are flagged for rehash (see verify_and_update_password).
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    )
+
+
+def warm_auth_libraries():
+    """Imports jose and builds the CryptContext; a startup warm-up step (see app.core.warmup)."""
+    from jose import jwt  # noqa: F401
+
+    get_pwd_context()
+
 
 ALGORITHM = settings.ALGORITHM
 SECRET_KEY = settings.SECRET_KEY
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password.
-    
-    Bcrypt has a 72-byte limit. We truncate to ensure compatibility.
-    """
+def _truncate_password(password: str) -> str:
+    """Bcrypt has a 72-byte limit. We truncate to ensure compatibility."""
     # Truncate password to 72 bytes if needed (bcrypt limitation)
-    password_bytes = plain_password.encode('utf-8')
+    password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
-    
+
     # Decode back to string, ignoring any incomplete UTF-8 sequences at the boundary
-    plain_password = password_bytes.decode('utf-8', errors='ignore')
-    
+    return password_bytes.decode('utf-8', errors='ignore')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against a hashed password. Blocking; prefer verify_and_update_password."""
+    return verify_and_update_password_sync(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password_sync(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (is_valid, new_hash). new_hash is set when the password is valid but its stored
+    hash uses an outdated cost factor or scheme, so the caller can save the rehash.
+    """
+    plain_password = _truncate_password(plain_password)
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify_and_update(plain_password, hashed_password)
     except ValueError as e:
         # Handle bcrypt errors gracefully
         if "password cannot be longer than 72 bytes" in str(e):
             # Try with character truncation as last resort
-            plain_password = plain_password[:72]
             try:
-                return pwd_context.verify(plain_password, hashed_password)
+                return get_pwd_context().verify_and_update(plain_password[:72], hashed_password)
             except Exception:
-                return False
+                return False, None
         raise
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt.
-    
-    Bcrypt has a 72-byte limit. We truncate to ensure compatibility.
-    """
-    # Truncate password to 72 bytes if needed (bcrypt limitation)
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
-    # Decode back to string, ignoring any incomplete UTF-8 sequences at the boundary
-    password = password_bytes.decode('utf-8', errors='ignore')
-    
+    """Hash a password using bcrypt. Blocking; prefer hash_password from async code."""
+    password = _truncate_password(password)
     try:
-        return pwd_context.hash(password)
+        return get_pwd_context().hash(password)
     except ValueError as e:
         # If we still hit the 72-byte limit, try one more time with strict truncation
         if "password cannot be longer than 72 bytes" in str(e):
-            password = password[:72]
-            return pwd_context.hash(password)
+            return get_pwd_context().hash(password[:72])
         raise
 
 
+# --- Password Hashing Pool ---
+# Bcrypt is deliberately slow. Running it on a small dedicated pool keeps a login storm
+# from tying up the event loop or the threadpool shared by every sync endpoint, and
+# the pending limit turns overload into fast 503s instead of an ever-growing queue.
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordHashPool:
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected_count = 0
+
+    @property
+    def pending(self) -> int:
+        """Hashes queued or running right now."""
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected_count += 1
+                raise PasswordHasherBusy(
+                    f"{self._pending} password hashes already pending"
+                )
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Async verify_and_update_password_sync on the hashing pool. Raises PasswordHasherBusy."""
+    return await password_hash_pool.run(
+        verify_and_update_password_sync, plain_password, hashed_password
+    )
+
+
+async def hash_password(password: str) -> str:
+    """Async get_password_hash on the hashing pool. Raises PasswordHasherBusy."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -81,5 +183,7 @@ def create_access_token(
         "exp": expire,
         "sub": str(subject),
     }  # "sub" is the standard claim for subject (e.g., player_id)
+    from jose import jwt  # Lazy, like passlib: only token issue and verify need it
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -0,0 +1,142 @@
+# backend/app/core/warmup.py
+"""
+Warm-up before a freshly started process takes players.
+
+The lifespan only does what the game needs to be correct (tables, seeds, respawn
+timers) and then lets the server bind its port. Everything that merely makes the
+first requests fast -- a primed DB pool, loaded catalogs and tables, the
+statements a reconnecting player runs -- is a warm-up step, run in order on the
+DB thread pool right after. Until the last step has run, GET /readyz answers 503
+with each step's progress, so a load balancer keeps routing players to the old
+process during a rolling restart. A WS connect that reaches this process anyway
+waits for the warm-up (up to WARMUP_WS_WAIT_SECONDS) instead of paying for it.
+
+A step that fails is logged and reported, but doesn't hold readiness back: every
+cache it would have filled also fills on first use.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from ..db import session as db_session
+from ..db.async_db import run_db
+from ..db.session_stats import set_db_tag
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WarmupStep:
+    name: str
+    run: Callable[[Session], Any]  # Runs on a DB thread; may return a count for the report
+
+
+class WarmUp:
+    def __init__(self):
+        self._progress: List[Dict[str, Any]] = []
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._done: Optional[asyncio.Event] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._finished_at is not None
+
+    # --- Lifecycle ---
+
+    def start(self, steps: Sequence[WarmupStep]):
+        """Runs the steps in the background, in order. Call from the loop's thread."""
+        if self._task and not self._task.done():
+            return
+        self._progress = [{"name": step.name, "state": "pending"} for step in steps]
+        self._started_at = time.monotonic()
+        self._finished_at = None
+        self._done = asyncio.Event()
+        self._task = asyncio.create_task(self._run(list(steps)))
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds for the warm-up to finish. True once it has, or
+        when none was started (nothing to wait for).
+        """
+        if self._done is None or self.ready:
+            return True
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.ready
+
+    async def _run(self, steps: List[WarmupStep]):
+        for step, progress in zip(steps, self._progress):
+            progress["state"] = "running"
+            started = time.perf_counter()
+            try:
+                result = await run_db(self._run_step, step)
+                progress["state"] = "done"
+                if isinstance(result, int):
+                    progress["count"] = result
+            except Exception as e:
+                logger.error(f"Warm-up step '{step.name}' failed: {e}", exc_info=True)
+                progress["state"] = "failed"
+                progress["error"] = str(e)
+            progress["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self._finished_at = time.monotonic()
+        self._done.set()
+        logger.info(
+            f"Warm-up finished in {self._elapsed() * 1000:.0f} ms: "
+            + ", ".join(f"{p['name']} {p['state']} ({p['ms']:.0f} ms)" for p in self._progress)
+        )
+
+    @staticmethod
+    def _run_step(step: WarmupStep) -> Any:
+        set_db_tag(f"warmup:{step.name}")
+        with db_session.SessionLocal(bind=db_session.engine) as db:
+            try:
+                return step.run(db)
+            finally:
+                db.rollback()  # Warm-up only reads
+
+    # --- Reporting ---
+
+    def _elapsed(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        return (self._finished_at or time.monotonic()) - self._started_at
+
+    def report(self) -> Dict[str, Any]:
+        if self._started_at is None:
+            status = "starting"
+        else:
+            status = "ready" if self.ready else "warming"
+        return {
+            "status": status,
+            "steps_done": sum(1 for p in self._progress if p["state"] in ("done", "failed")),
+            "steps_total": len(self._progress),
+            "elapsed_ms": round(self._elapsed() * 1000, 1),
+            "steps": [dict(p) for p in self._progress],
+        }
+
+
+# Global instance
+warmup = WarmUp()
+
+metrics.gauge(
+    "llmud_ready", "1 once the warm-up has finished and /readyz answers 200.",
+    callback=lambda: 1.0 if warmup.ready else 0.0,
+)
@@ -161,6 +161,26 @@ def get_xp_for_level(level: int) -> Union[int, float]:
     return XP_THRESHOLDS.get(level, float("inf"))
 
 
+def get_character_vitals(character: models.Character) -> Dict[str, Any]:
+    """Full vitals snapshot in the wire shape documented in schemas/vitals.py."""
+    xp_for_next_level = get_xp_for_level(character.level + 1)
+    return {
+        "current_hp": character.current_health,
+        "max_hp": character.max_health,
+        "current_mp": character.current_mana,
+        "max_mp": character.max_mana,
+        "current_xp": character.experience_points,
+        "next_level_xp": (
+            int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
+        ),
+        "level": character.level,
+        "platinum": character.platinum_coins,
+        "gold": character.gold_coins,
+        "silver": character.silver_coins,
+        "copper": character.copper_coins,
+    }
+
+
 def get_character(db: Session, character_id: uuid.UUID) -> Optional[models.Character]:
     # Ensure class_template_ref is loaded if needed frequently after fetching a character.
     # Consider adding options(joinedload(models.Character.class_template_ref)) if it's always used.
@@ -591,6 +611,10 @@ def add_experience(
         character.experience_points = 0
 
     db.add(character)  # Ensure character is staged after all XP and level modifications
+    # Keep the who list's level/XP in step without it going back to the DB, once this commits.
+    from app.websocket_manager import connection_manager  # Local import to avoid circular dependency
+
+    connection_manager.index_online_character_on_commit(db, character)
     # db.commit() # <<< REMOVED - Caller (e.g. skill_resolver or command handler) commits
     # db.refresh(character) # <<< REMOVED
 
@@ -610,16 +634,22 @@ def get_characters_in_room(
     Get all characters in a room, filtering to only show those with active connections.
     """
     # Import here to avoid circular dependency at module load time
+    from ..services.character_state import character_state
     from ..websocket_manager import connection_manager
-    
-    query = db.query(models.Character).filter(
-        models.Character.current_room_id == room_id
+
+    # An online character's room is held in memory (write-behind), so the row may lag behind.
+    character_ids = [
+        character_id
+        for character_id in character_state.character_ids_in_room(room_id)
+        if character_id != exclude_character_id
+    ]
+    if not character_ids:
+        return []
+
+    all_chars = (
+        db.query(models.Character).filter(models.Character.id.in_(character_ids)).all()
     )
-    if exclude_character_id:
-        query = query.filter(models.Character.id != exclude_character_id)
-    
-    all_chars = query.all()
-    
+
     # Filter to only characters with active player connections
     online_chars = []
     for char in all_chars:
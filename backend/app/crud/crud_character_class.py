@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional  # Added Dict, Any
 from sqlalchemy.orm import Session, attributes  # Added attributes
 
 from .. import models, schemas
+from ..db.seeding import bulk_upsert
 
 logger = logging.getLogger(__name__)  # Get a logger
 
@@ -118,10 +119,8 @@ def seed_initial_character_class_templates(db: Session):
         )
         return
 
-    seeded_count = 0
-    updated_count = 0
+    rows = []
     skipped_count = 0
-
     for template_data in class_template_definitions:
         template_name = template_data.get("name")
         if not template_name:
@@ -130,75 +129,18 @@ def seed_initial_character_class_templates(db: Session):
             )
             skipped_count += 1
             continue
-
-        existing_template = get_character_class_template_by_name(db, name=template_name)
-
         try:
-            if existing_template:
-                template_update_schema = schemas.CharacterClassTemplateUpdate(
-                    **template_data
-                )
-                # Pass the ORM object and the Pydantic update schema to the update function
-                update_character_class_template(
-                    db,
-                    db_template=existing_template,
-                    template_in=template_update_schema,
-                )
-
-                # Crude check for logging if changes were actually made
-                original_dump = schemas.CharacterClassTemplate.from_orm(
-                    existing_template
-                ).model_dump(exclude={"id"})
-                updated_dump_from_data = schemas.CharacterClassTemplateCreate(
-                    **template_data
-                ).model_dump()
-                is_actually_changed = False
-                for key, value_from_json in updated_dump_from_data.items():
-                    if original_dump.get(key) != value_from_json:
-                        is_actually_changed = True
-                        break
-                if is_actually_changed:
-                    logger.info(f"Updating character class template: {template_name}")
-                    updated_count += 1
-                else:
-                    # logger.debug(f"Class template '{template_name}' exists and no changes detected.")
-                    skipped_count += 1
-            else:
-                template_create_schema = schemas.CharacterClassTemplateCreate(
-                    **template_data
-                )
-                logger.info(
-                    f"Creating character class template: {template_create_schema.name}"
-                )
-                create_character_class_template(db, template_in=template_create_schema)
-                seeded_count += 1
-        except Exception as e_pydantic_or_db:
+            rows.append(schemas.CharacterClassTemplateCreate(**template_data).model_dump())
+        except Exception as e_pydantic:
             logger.error(
-                f"Pydantic validation or DB operation failed for class template '{template_name}': {e_pydantic_or_db}. Data: {template_data}",
-                exc_info=True,
+                f"Validation failed for class template '{template_name}': {e_pydantic}. Data: {template_data}"
             )
             skipped_count += 1
-            db.rollback()  # Rollback this specific item's attempt
-            continue
-
-    if seeded_count > 0 or updated_count > 0:
-        try:
-            logger.info(
-                f"Committing {seeded_count} new and {updated_count} updated class templates."
-            )
-            db.commit()
-            logger.info("Character class template seeding commit successful.")
-        except Exception as e_commit:
-            logger.error(
-                f"Error committing class template seeds: {e_commit}. Rolling back.",
-                exc_info=True,
-            )
-            db.rollback()
-    else:
-        logger.info(
-            "No new class templates to seed or templates to update. No commit needed for class templates."
-        )
 
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.CharacterClassTemplate, rows, key=("name",)
+    )
+    db.commit()
     logger.info(
-        f"Character class template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged/Skipped: {skipped_count}"
+        f"Character class template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
     )
@@ -9,6 +9,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
+from ..db.seeding import bulk_upsert
 
 logger = logging.getLogger(__name__)  # Get a logger for this module
 
@@ -77,68 +78,28 @@ def seed_initial_items(db: Session):
         )
         return
 
-    seeded_count = 0
+    rows = []
     skipped_count = 0
-    updated_count = 0  # For clarity
-
     for item_data in item_definitions:
         item_name = item_data.get("name")
         if not item_name:
             logger.warning(f"Skipping item entry due to missing name: {item_data}")
             skipped_count += 1
             continue
-
-        existing_item = get_item_by_name(db, name=item_name)
-
         try:
-            if existing_item:
-                logger.debug(f"Item '{item_name}' already exists. Attempting update...")
-                item_update_schema = schemas.ItemUpdate(**item_data)
-                changed = False
-                for field, value in item_update_schema.model_dump(
-                    exclude_unset=True
-                ).items():
-                    if getattr(existing_item, field) != value:
-                        setattr(existing_item, field, value)
-                        changed = True
-                if changed:
-                    db.add(existing_item)
-                    logger.info(f"Updated item: {item_name}")
-                    updated_count += 1
-                else:
-                    # logger.debug(f"Item '{item_name}' exists and no changes detected. Skipping update.")
-                    skipped_count += (
-                        1  # Not really skipped, but not "newly seeded" or "updated"
-                    )
-            else:
-                item_create_schema = schemas.ItemCreate(**item_data)
-                logger.info(f"Creating item: {item_create_schema.name}")
-                create_item(db, item_in=item_create_schema)
-                seeded_count += 1
+            rows.append(schemas.ItemCreate(**item_data).model_dump())
         except Exception as e_pydantic:
             logger.error(
-                f"Pydantic validation or DB operation failed for item '{item_name}': {e_pydantic}. Data: {item_data}"
+                f"Pydantic validation failed for item '{item_name}': {e_pydantic}. Data: {item_data}"
             )
             skipped_count += 1
-            continue
-
-    if seeded_count > 0 or updated_count > 0:
-        try:
-            logger.info(
-                f"Committing {seeded_count} new items and {updated_count} updated items."
-            )
-            db.commit()
-            logger.info("Item seeding commit successful.")
-        except Exception as e_commit:
-            logger.error(f"Error committing item seeds: {e_commit}. Rolling back.")
-            db.rollback()
-    else:
-        logger.info(
-            "No new items to seed or items to update. No commit needed for items."
-        )
 
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.Item, rows, key=("name",)
+    )
+    db.commit()
     logger.info(
-        f"Item seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged/Skipped: {skipped_count}"
+        f"Item seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
     )
 
 
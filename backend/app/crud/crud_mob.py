@@ -3,12 +3,23 @@ import json  # For loading JSON
 import logging  # For logging (finally!)
 import os  # For path joining
 import uuid
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple  # Added Any for seed data
-
+from typing import (  # Added Any for seed data
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, attributes, joinedload
 
-from .. import crud, models, schemas
+from .. import models, schemas
+from ..db.seeding import bulk_upsert
+from ..game_logic.respawn_scheduler import respawn_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +27,68 @@ logger = logging.getLogger(__name__)
 SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "seeds")
 
 
+class MobSpawnRequest(NamedTuple):
+    """One entry for spawn_mobs_bulk: spawn `count` copies of a template into a room."""
+
+    mob_template_id: uuid.UUID
+    room_id: uuid.UUID
+    spawn_definition_id: Optional[uuid.UUID] = None
+    count: int = 1
+
+
+class _CachedMobTemplate(NamedTuple):
+    name: str
+    base_health: int
+
+
+# Spawn validation caches. Templates are only changed by seeding (which invalidates
+# its entries) and rooms are never deleted at runtime, so a miss is the only refresh.
+_mob_template_cache: Dict[uuid.UUID, _CachedMobTemplate] = {}
+_known_room_ids: Set[uuid.UUID] = set()
+
+
+def invalidate_spawn_caches(mob_template_id: Optional[uuid.UUID] = None):
+    if mob_template_id is None:
+        _mob_template_cache.clear()
+        _known_room_ids.clear()
+    else:
+        _mob_template_cache.pop(mob_template_id, None)
+
+
+def _resolve_spawn_targets(
+    db: Session, template_ids: Iterable[uuid.UUID], room_ids: Iterable[uuid.UUID]
+):
+    """Loads any templates/rooms missing from the caches with one query each."""
+    missing_templates = {t for t in template_ids if t not in _mob_template_cache}
+    if missing_templates:
+        rows = db.query(
+            models.MobTemplate.id, models.MobTemplate.name, models.MobTemplate.base_health
+        ).filter(models.MobTemplate.id.in_(missing_templates))
+        for template_id, name, base_health in rows:
+            _mob_template_cache[template_id] = _CachedMobTemplate(name, base_health)
+
+    missing_rooms = {r for r in room_ids if r not in _known_room_ids}
+    if missing_rooms:
+        rows = db.query(models.Room.id).filter(models.Room.id.in_(missing_rooms))
+        _known_room_ids.update(room_id for (room_id,) in rows)
+
+
+def warm_spawn_caches(db: Session) -> int:
+    """Warm-up: fills the spawn caches with every mob template and room. Returns the template count."""
+    rows = db.query(
+        models.MobTemplate.id, models.MobTemplate.name, models.MobTemplate.base_health
+    )
+    for template_id, name, base_health in rows:
+        _mob_template_cache[template_id] = _CachedMobTemplate(name, base_health)
+    _known_room_ids.update(room_id for (room_id,) in db.query(models.Room.id))
+    return len(_mob_template_cache)
+
+
+def get_cached_mob_template_name(mob_template_id: uuid.UUID) -> Optional[str]:
+    cached = _mob_template_cache.get(mob_template_id)
+    return cached.name if cached else None
+
+
 def _load_seed_data_generic(
     filename: str, data_type_name: str
 ) -> List[Dict[str, Any]]:  # Made generic
@@ -86,6 +159,7 @@ def update_mob_template(
             changed = True
     if changed:
         db.add(db_template)
+        invalidate_spawn_caches(db_template.id)
     return db_template  # Return template whether changed or not, caller might need it
 
 
@@ -118,14 +192,12 @@ def spawn_mob_in_room(
     instance_properties_override: Optional[Dict] = None,
     originating_spawn_definition_id: Optional[uuid.UUID] = None,
 ) -> Optional[models.RoomMobInstance]:
-    template = get_mob_template(db, mob_template_id)
+    _resolve_spawn_targets(db, (mob_template_id,), (room_id,))
+    template = _mob_template_cache.get(mob_template_id)
     if not template:
         logger.error(f"spawn_mob_in_room: Mob template ID {mob_template_id} not found.")
         return None
-    room = (
-        db.query(models.Room).filter(models.Room.id == room_id).first()
-    )  # Consider using crud.crud_room.get_room_by_id
-    if not room:
+    if room_id not in _known_room_ids:
         logger.error(f"spawn_mob_in_room: Room ID {room_id} not found.")
         return None
 
@@ -137,14 +209,83 @@ def spawn_mob_in_room(
         spawn_definition_id=originating_spawn_definition_id,
     )
     db.add(mob_instance)
+    if originating_spawn_definition_id:
+        respawn_scheduler.note_spawned(originating_spawn_definition_id)
     # db.commit() # Caller of spawn_mob_in_room should commit, esp. if part of larger transaction (e.g. mob_respawner)
     # db.refresh(mob_instance) # Also by caller if needed immediately after commit
     logger.info(
-        f"Staged spawn of mob '{template.name}' (Template ID: {template.id}) in room '{room.name}' (Room ID: {room_id}). Instance ID will be assigned on commit."
+        f"Staged spawn of mob '{template.name}' (Template ID: {mob_template_id}) in room {room_id}. Instance ID will be assigned on commit."
     )
     return mob_instance  # Return uncommitted instance
 
 
+def spawn_mobs_bulk(
+    db: Session, requests: Iterable[MobSpawnRequest]
+) -> List[models.RoomMobInstance]:
+    """
+    Spawns many mobs with a single INSERT ... RETURNING. Each request is
+    (mob_template_id, room_id, spawn_definition_id, count); plain tuples work too.
+    Templates and rooms are validated against the module caches, so a warm
+    call issues no SELECTs. Requests with an unknown template or room are
+    skipped with an error. Returns the new (flushed, uncommitted) instances.
+    """
+    requests = [MobSpawnRequest(*r) for r in requests]
+    # The ORM batches consecutive rows with the same non-NULL columns, so keep
+    # the spawn-definition-less (debug/static) rows together at the end.
+    requests = sorted(
+        (r for r in requests if r.count > 0),
+        key=lambda r: r.spawn_definition_id is None,
+    )
+    if not requests:
+        return []
+
+    _resolve_spawn_targets(
+        db, (r.mob_template_id for r in requests), (r.room_id for r in requests)
+    )
+
+    rows: List[Dict[str, Any]] = []
+    spawned_per_definition: Dict[uuid.UUID, int] = {}
+    for request in requests:
+        template = _mob_template_cache.get(request.mob_template_id)
+        if not template:
+            logger.error(
+                f"spawn_mobs_bulk: Mob template ID {request.mob_template_id} not found. Skipping {request.count} spawns."
+            )
+            continue
+        if request.room_id not in _known_room_ids:
+            logger.error(
+                f"spawn_mobs_bulk: Room ID {request.room_id} not found. Skipping {request.count} spawns."
+            )
+            continue
+        row = {
+            "room_id": request.room_id,
+            "mob_template_id": request.mob_template_id,
+            "current_health": template.base_health,
+            "spawn_definition_id": request.spawn_definition_id,
+        }
+        # Each row needs its own dict; the ORM fills in the primary key per row.
+        rows.extend(dict(row) for _ in range(request.count))
+        if request.spawn_definition_id:
+            spawned_per_definition[request.spawn_definition_id] = (
+                spawned_per_definition.get(request.spawn_definition_id, 0)
+                + request.count
+            )
+
+    if not rows:
+        return []
+
+    new_instances = list(
+        db.scalars(insert(models.RoomMobInstance).returning(models.RoomMobInstance), rows)
+    )
+    for spawn_def_id, count in spawned_per_definition.items():
+        respawn_scheduler.note_spawned(spawn_def_id, count)
+
+    logger.info(
+        f"Bulk spawned {len(new_instances)} mobs across {len(requests)} spawn requests."
+    )
+    return new_instances
+
+
 def despawn_mob_from_room(db: Session, room_mob_instance_id: uuid.UUID) -> bool:
     instance = get_room_mob_instance(db, room_mob_instance_id)
     if instance:
@@ -159,16 +300,7 @@ def despawn_mob_from_room(db: Session, room_mob_instance_id: uuid.UUID) -> bool:
         db.delete(instance)
 
         if spawn_def_id_to_update:
-            crud.crud_mob_spawn_definition.update_mob_spawn_definition_next_check_time(
-                db,
-                definition_id=spawn_def_id_to_update,
-                next_check_time=datetime.now(
-                    timezone.utc
-                ),  # Trigger immediate re-check
-            )
-            logger.debug(
-                f"Flagged immediate re-check for spawn definition {spawn_def_id_to_update} due to mob despawn."
-            )
+            respawn_scheduler.note_removed(db, spawn_def_id_to_update)
 
         # db.commit() # Caller of despawn (e.g. combat processor) should handle commit
         return True
@@ -222,10 +354,8 @@ def seed_initial_mob_templates(db: Session):
         )
         return
 
-    seeded_count = 0
-    updated_count = 0
-    skipped_count = 0  # For items that exist and have no changes
-
+    rows = []
+    skipped_count = 0
     for template_data in mob_template_definitions:
         template_name = template_data.get("name")
         if not template_name:
@@ -234,80 +364,21 @@ def seed_initial_mob_templates(db: Session):
             )
             skipped_count += 1
             continue
-
-        existing_template = get_mob_template_by_name(db, name=template_name)
-
         try:
-            if existing_template:
-                template_update_schema = schemas.MobTemplateUpdate(**template_data)
-                # Pass the ORM object and the Pydantic update schema to the update function
-                updated_template = update_mob_template(
-                    db,
-                    db_template=existing_template,
-                    template_in=template_update_schema,
-                )
-                # Check if update_mob_template actually staged a change by checking session dirty status or a flag.
-                # For now, we'll assume if no exception, it's either updated or was identical.
-                # To be more precise, compare dicts or check db.is_modified(existing_template) before commit
-
-                # A simple way to check if changes were made for logging purposes:
-                original_dump = schemas.MobTemplate.from_orm(
-                    existing_template
-                ).model_dump(
-                    exclude={"id"}
-                )  # Exclude id for comparison
-                updated_dump_from_data = schemas.MobTemplateCreate(
-                    **template_data
-                ).model_dump()  # Create a full model from data
-
-                # Compare relevant fields. This is a bit verbose.
-                # A better way might be for update_mob_template to return a boolean indicating change.
-                is_actually_changed = False
-                for key, value_from_json in updated_dump_from_data.items():
-                    if original_dump.get(key) != value_from_json:
-                        is_actually_changed = True
-                        break
-
-                if (
-                    is_actually_changed
-                ):  # If update_mob_template would have made changes
-                    logger.info(f"Updating mob template: {template_name}")
-                    updated_count += 1
-                else:
-                    # logger.debug(f"Mob template '{template_name}' exists and no changes detected.")
-                    skipped_count += 1
-            else:  # Template does not exist, create it
-                template_create_schema = schemas.MobTemplateCreate(**template_data)
-                logger.info(f"Creating mob template: {template_create_schema.name}")
-                create_mob_template(db, template_in=template_create_schema)
-                seeded_count += 1
-        except Exception as e_pydantic_or_db:  # Catch broader exceptions
+            rows.append(schemas.MobTemplateCreate(**template_data).model_dump())
+        except Exception as e_pydantic:
             logger.error(
-                f"Validation or DB operation failed for mob template '{template_name}': {e_pydantic_or_db}. Data: {template_data}",
-                exc_info=True,
+                f"Validation failed for mob template '{template_name}': {e_pydantic}. Data: {template_data}"
             )
             skipped_count += 1
-            db.rollback()  # Rollback this specific item's attempt
-            continue  # Continue to next item
 
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.MobTemplate, rows, key=("name",)
+    )
+    db.commit()
     if seeded_count > 0 or updated_count > 0:
-        try:
-            logger.info(
-                f"Committing {seeded_count} new and {updated_count} updated mob templates."
-            )
-            db.commit()
-            logger.info("Mob template seeding commit successful.")
-        except Exception as e_commit:
-            logger.error(
-                f"Error committing mob template seeds: {e_commit}. Rolling back.",
-                exc_info=True,
-            )
-            db.rollback()
-    else:
-        logger.info(
-            "No new mob templates to seed or templates to update. No commit needed for mob templates."
-        )
-
+        # Names and base health may have changed under the spawn caches; reload them on next use.
+        invalidate_spawn_caches()
     logger.info(
-        f"Mob template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged/Skipped: {skipped_count}"
+        f"Mob template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
     )
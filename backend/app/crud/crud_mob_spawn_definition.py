@@ -7,10 +7,12 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session, attributes
 
 from .. import models, schemas
-from ..crud import crud_mob, crud_room
+from ..crud import crud_mob
+from ..db.seeding import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
@@ -154,14 +156,17 @@ def seed_initial_mob_spawn_definitions(db: Session):
         logger.warning("No spawn definitions found in JSON file. Skipping.")
         return
 
-    seeded_count = 0
-    updated_count = 0
-    skipped_count = 0
-
-    logger.info("Clearing all existing mob instances for a clean seed...")
-    db.query(models.RoomMobInstance).delete()
-    logger.info("Existing mobs cleared.")
+    # Resolve room coords and template names from two lookups instead of two queries per entry.
+    room_ids = {
+        (x, y, z): room_id
+        for room_id, x, y, z in db.query(
+            models.Room.id, models.Room.x, models.Room.y, models.Room.z
+        )
+    }
+    mob_template_ids = dict(db.query(models.MobTemplate.name, models.MobTemplate.id))
 
+    rows = []
+    skipped_count = 0
     for def_data in spawn_definitions_data:
         def_name = def_data.get("definition_name")
         if not def_name:
@@ -171,114 +176,90 @@ def seed_initial_mob_spawn_definitions(db: Session):
             skipped_count += 1
             continue
 
-        # --- Resolve Room and Mob Template from names/coords ---
-        room = None
-        if "room_coords" in def_data:
-            coords = def_data["room_coords"]
-            room = crud_room.get_room_by_coords(
-                db, x=coords.get("x"), y=coords.get("y"), z=coords.get("z")
-            )
-            if not room:
-                logger.error(
-                    f"For spawn '{def_name}', could not find room at coords {coords}. Skipping."
-                )
-                skipped_count += 1
-                continue
-        else:
+        coords = def_data.get("room_coords")
+        if coords is None:
             logger.error(
                 f"Spawn definition '{def_name}' is missing 'room_coords'. Skipping."
             )
             skipped_count += 1
             continue
-
-        mob_template = None
-        if "mob_template_name" in def_data:
-            mob_template = crud_mob.get_mob_template_by_name(
-                db, name=def_data["mob_template_name"]
+        room_id = room_ids.get((coords.get("x"), coords.get("y"), coords.get("z")))
+        if not room_id:
+            logger.error(
+                f"For spawn '{def_name}', could not find room at coords {coords}. Skipping."
             )
-            if not mob_template:
-                logger.error(
-                    f"For spawn '{def_name}', could not find mob template named '{def_data['mob_template_name']}'. Skipping."
-                )
-                skipped_count += 1
-                continue
-        else:
+            skipped_count += 1
+            continue
+
+        template_name = def_data.get("mob_template_name")
+        if template_name is None:
             logger.error(
                 f"Spawn definition '{def_name}' is missing 'mob_template_name'. Skipping."
             )
             skipped_count += 1
             continue
+        mob_template_id = mob_template_ids.get(template_name)
+        if not mob_template_id:
+            logger.error(
+                f"For spawn '{def_name}', could not find mob template named '{template_name}'. Skipping."
+            )
+            skipped_count += 1
+            continue
 
-        # --- Create or Update the definition ---
         try:
-            # Prepare the data for Pydantic model, replacing names with IDs
+            # Replace names and coords with IDs for the Pydantic model
             pydantic_data = def_data.copy()
-            pydantic_data["room_id"] = room.id
-            pydantic_data["mob_template_id"] = mob_template.id
-            pydantic_data.pop(
-                "room_coords", None
-            )  # Remove keys not in the Pydantic model
+            pydantic_data["room_id"] = room_id
+            pydantic_data["mob_template_id"] = mob_template_id
+            pydantic_data.pop("room_coords", None)
             pydantic_data.pop("mob_template_name", None)
-
-            existing_def = get_mob_spawn_definition_by_name(
-                db, definition_name=def_name
-            )
-
-            if not existing_def:
-                spawn_create_schema = schemas.MobSpawnDefinitionCreate(**pydantic_data)
-                create_mob_spawn_definition(db, definition_in=spawn_create_schema)
-                logger.info(f"  CREATED mob spawn definition: {def_name}")
-                seeded_count += 1
-            else:
-                spawn_update_schema = schemas.MobSpawnDefinitionUpdate(**pydantic_data)
-                original_dump = schemas.MobSpawnDefinition.from_orm(
-                    existing_def
-                ).model_dump()
-
-                update_mob_spawn_definition(
-                    db, db_definition=existing_def, definition_in=spawn_update_schema
-                )
-
-                # Check if it was actually modified to log correctly
-                db.flush()  # Flush to see changes in the session
-                updated_dump = schemas.MobSpawnDefinition.from_orm(
-                    existing_def
-                ).model_dump()
-                if original_dump != updated_dump:
-                    logger.info(f"  UPDATED mob spawn definition: {def_name}")
-                    updated_count += 1
-                else:
-                    skipped_count += 1
-
+            rows.append(schemas.MobSpawnDefinitionCreate(**pydantic_data).model_dump())
         except Exception as e:
-            logger.error(
-                f"Error processing spawn definition '{def_name}': {e}", exc_info=True
-            )
+            logger.error(f"Error validating spawn definition '{def_name}': {e}")
             skipped_count += 1
-            db.rollback()  # Rollback this specific entry's changes
 
-    if seeded_count > 0 or updated_count > 0:
-        logger.info(
-            f"Committing {seeded_count} new and {updated_count} updated mob spawn definitions."
-        )
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.MobSpawnDefinition, rows, key=("definition_name",)
+    )
+    if seeded_count or updated_count:
+        # Live mobs were spawned from the old definitions; start clean from the new ones.
+        logger.info("Clearing all existing mob instances for a clean seed...")
+        db.query(models.RoomMobInstance).delete()
+        logger.info("Existing mobs cleared.")
         db.commit()
     else:
-        logger.info("No new or updated spawn definitions to commit.")
-        db.rollback()  # Rollback if only skips occurred
+        # Re-run only because an upstream seed changed: leave the live mobs alone.
+        db.rollback()
+    logger.info(
+        f"Mob spawn definition seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
+    )
+
 
-        logger.info("--- Bootstrapping initial mob populations ---")
+def bootstrap_mob_populations(db: Session):
+    """
+    Tops every active definition up to its minimum population. Runs on every boot,
+    whether or not the definitions were re-seeded.
+    """
+    logger.info("--- Bootstrapping initial mob populations ---")
     all_active_defs = get_all_active_definitions(db)
-    bootstrap_spawn_count = 0
-    for definition in all_active_defs:
-        # Check how many are ALREADY there for this definition (should be 0 after our purge)
-        living_children_count = (
-            db.query(models.RoomMobInstance)
-            .filter(
-                models.RoomMobInstance.spawn_definition_id == definition.id,
-                models.RoomMobInstance.current_health > 0,
-            )
-            .count()
+    # Check how many are ALREADY there per definition, in one GROUP BY
+    living_counts = dict(
+        db.query(
+            models.RoomMobInstance.spawn_definition_id,
+            func.count(models.RoomMobInstance.id),
+        )
+        .filter(
+            models.RoomMobInstance.spawn_definition_id.in_(
+                [d.id for d in all_active_defs]
+            ),
+            models.RoomMobInstance.current_health > 0,
         )
+        .group_by(models.RoomMobInstance.spawn_definition_id)
+        .all()
+    )
+    bootstrap_requests: List[crud_mob.MobSpawnRequest] = []
+    for definition in all_active_defs:
+        living_children_count = living_counts.get(definition.id, 0)
 
         if living_children_count < definition.quantity_min:
             num_to_spawn = (
@@ -290,19 +271,17 @@ def seed_initial_mob_spawn_definitions(db: Session):
                 logger.info(
                     f"  BOOTSTRAP: Spawning {num_to_spawn} mobs for '{definition.definition_name}'"
                 )
-                for _ in range(num_to_spawn):
-                    crud_mob.spawn_mob_in_room(
-                        db,
-                        room_id=definition.room_id,
+                bootstrap_requests.append(
+                    crud_mob.MobSpawnRequest(
                         mob_template_id=definition.mob_template_id,
-                        originating_spawn_definition_id=definition.id,
+                        room_id=definition.room_id,
+                        spawn_definition_id=definition.id,
+                        count=num_to_spawn,
                     )
-                    bootstrap_spawn_count += 1
+                )
+
+    bootstrap_spawn_count = len(crud_mob.spawn_mobs_bulk(db, bootstrap_requests))
 
     if bootstrap_spawn_count > 0:
         logger.info(f"Committing {bootstrap_spawn_count} bootstrapped mob instances.")
         db.commit()
-
-    logger.info(
-        f"Mob spawn definition seeding complete. New: {seeded_count}, Updated: {updated_count}, Skipped/Error: {skipped_count}"
-    )
@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
+from ..db.seeding import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
@@ -54,10 +55,8 @@ def seed_initial_npc_templates(db: Session):
         logger.warning("No NPC definitions found in npcs.json. Aborting NPC seeding.")
         return
 
-    seeded_count = 0
-    updated_count = 0
+    rows = []
     skipped_count = 0
-
     for npc_data in npc_definitions:
         tag = npc_data.get("unique_name_tag")
         if not tag:
@@ -66,53 +65,22 @@ def seed_initial_npc_templates(db: Session):
             )
             skipped_count += 1
             continue
-
-        existing_npc = get_npc_template_by_tag(db, unique_name_tag=tag)
-
         try:
-            # We need a Pydantic model to validate the data from JSON
-            # Let's create one on the fly here for simplicity or assume it exists in schemas
-            # For now, we'll pass the dict directly and let the ORM handle it, but a schema is better.
-
-            if existing_npc:
-                logger.debug(
-                    f"NPC template '{tag}' already exists. Checking for updates..."
-                )
-                changed = False
-                for field, value in npc_data.items():
-                    if getattr(existing_npc, field) != value:
-                        setattr(existing_npc, field, value)
-                        changed = True
-                if changed:
-                    db.add(existing_npc)
-                    logger.info(f"Updated NPC template: {tag}")
-                    updated_count += 1
-                else:
-                    skipped_count += 1
-            else:
-                # This assumes your JSON data keys match the model attributes exactly.
-                # A proper implementation uses a Pydantic schema here.
-                # create_npc_template(db, template_in=schemas.NpcTemplateCreate(**npc_data))
-                db_npc = models.NpcTemplate(**npc_data)
-                db.add(db_npc)
-                seeded_count += 1
-                logger.info(f"Creating NPC template: {tag}")
-
+            rows.append(schemas.NpcTemplateCreate(**npc_data).model_dump())
         except Exception as e:
-            logger.error(f"Failed to process NPC template '{tag}': {e}", exc_info=True)
+            logger.error(f"Failed to validate NPC template '{tag}': {e}")
             skipped_count += 1
-            db.rollback()
-            continue
 
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.NpcTemplate, rows, key=("unique_name_tag",)
+    )
+    db.commit()
     if seeded_count > 0 or updated_count > 0:
-        logger.info(
-            f"Committing {seeded_count} new and {updated_count} updated NPC templates."
-        )
-        db.commit()
-    else:
-        logger.info("No new or updated NPC templates. No commit needed.")
-        db.rollback()  # Rollback if nothing changed
+        # Templates changed under the in-memory catalog; rebuild it on next use.
+        from ..game_logic.npc_catalog import npc_catalog
+
+        npc_catalog.invalidate()
 
     logger.info(
-        f"NPC template seeding complete. New: {seeded_count}, Updated: {updated_count}, Skipped: {skipped_count}"
+        f"NPC template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
     )
@@ -22,13 +22,20 @@ def count_players(db: Session) -> int:
 
 
 def create_player(
-    db: Session, *, player_in: schemas.PlayerCreate, is_sysop: bool = False
+    db: Session,
+    *,
+    player_in: schemas.PlayerCreate,
+    is_sysop: bool = False,
+    hashed_password: Optional[str] = None,
 ) -> models.Player:
     """
     Creates a new player.
     Accepts an is_sysop flag to explicitly set the user's admin status.
+    Pass `hashed_password` when it was already computed off the event loop
+    (see core.security.hash_password); otherwise it is hashed here, blocking.
     """
-    hashed_password = get_password_hash(player_in.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(player_in.password)
 
     # <<< THE FIX IS HERE >>>
     # We must also exclude 'is_sysop' from the dump, because we are supplying it manually.
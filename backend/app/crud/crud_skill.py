@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional  # Added Dict, Any
 from sqlalchemy.orm import Session, attributes  # Added attributes
 
 from .. import models, schemas
+from ..db.seeding import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
@@ -132,10 +133,8 @@ def seed_initial_skill_templates(db: Session):
         )
         return
 
-    seeded_count = 0
-    updated_count = 0
+    rows = []
     skipped_count = 0
-
     for template_data in skill_template_definitions:
         template_tag = template_data.get("skill_id_tag")
         template_name = template_data.get("name")
@@ -145,77 +144,18 @@ def seed_initial_skill_templates(db: Session):
             )
             skipped_count += 1
             continue
-
-        existing_template = get_skill_template_by_tag(db, skill_id_tag=template_tag)
-
         try:
-            if existing_template:
-                template_update_schema = schemas.SkillTemplateUpdate(**template_data)
-                update_skill_template(
-                    db,
-                    db_template=existing_template,
-                    template_in=template_update_schema,
-                )
-
-                # Simplified check for logging updates
-                # A more robust check would compare dicts before and after potential update_skill_template modifications
-                # For now, if the object is in session and dirty, it's an update.
-                # Or, if update_skill_template itself indicated a change.
-                # Let's assume a change if any field in template_data differs from existing_template
-                original_dump = schemas.SkillTemplate.from_orm(
-                    existing_template
-                ).model_dump(exclude={"id"})
-                current_data_dump = schemas.SkillTemplateCreate(
-                    **template_data
-                ).model_dump()  # Use Create schema for full data
-
-                is_actually_changed = False
-                for key, value_from_json in current_data_dump.items():
-                    if original_dump.get(key) != value_from_json:
-                        is_actually_changed = True
-                        break
-                if is_actually_changed:
-                    logger.info(
-                        f"Updating skill template: {template_name} ({template_tag})"
-                    )
-                    updated_count += 1
-                else:
-                    # logger.debug(f"Skill template '{template_name}' ({template_tag}) exists and no changes detected.")
-                    skipped_count += 1
-            else:
-                template_create_schema = schemas.SkillTemplateCreate(**template_data)
-                logger.info(
-                    f"Creating skill template: {template_create_schema.name} ({template_create_schema.skill_id_tag})"
-                )
-                create_skill_template(db, template_in=template_create_schema)
-                seeded_count += 1
-        except Exception as e_pydantic_or_db:
+            rows.append(schemas.SkillTemplateCreate(**template_data).model_dump())
+        except Exception as e_pydantic:
             logger.error(
-                f"Validation or DB operation failed for skill template '{template_name}' ({template_tag}): {e_pydantic_or_db}. Data: {template_data}",
-                exc_info=True,
+                f"Validation failed for skill template '{template_name}' ({template_tag}): {e_pydantic}. Data: {template_data}"
             )
             skipped_count += 1
-            db.rollback()
-            continue
-
-    if seeded_count > 0 or updated_count > 0:
-        try:
-            logger.info(
-                f"Committing {seeded_count} new and {updated_count} updated skill templates."
-            )
-            db.commit()
-            logger.info("Skill template seeding commit successful.")
-        except Exception as e_commit:
-            logger.error(
-                f"Error committing skill template seeds: {e_commit}. Rolling back.",
-                exc_info=True,
-            )
-            db.rollback()
-    else:
-        logger.info(
-            "No new skill templates to seed or templates to update. No commit needed for skill templates."
-        )
 
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.SkillTemplate, rows, key=("skill_id_tag",)
+    )
+    db.commit()
     logger.info(
-        f"Skill template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged/Skipped: {skipped_count}"
+        f"Skill template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
     )
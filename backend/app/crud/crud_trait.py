@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional  # Added Dict, Any
 from sqlalchemy.orm import Session, attributes  # Added attributes
 
 from .. import models, schemas
+from ..db.seeding import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
@@ -129,10 +130,8 @@ def seed_initial_trait_templates(db: Session):
         )
         return
 
-    seeded_count = 0
-    updated_count = 0
+    rows = []
     skipped_count = 0
-
     for template_data in trait_template_definitions:
         template_tag = template_data.get("trait_id_tag")
         template_name = template_data.get("name")
@@ -142,71 +141,18 @@ def seed_initial_trait_templates(db: Session):
             )
             skipped_count += 1
             continue
-
-        existing_template = get_trait_template_by_tag(db, trait_id_tag=template_tag)
-
         try:
-            if existing_template:
-                template_update_schema = schemas.TraitTemplateUpdate(**template_data)
-                update_trait_template(
-                    db,
-                    db_template=existing_template,
-                    template_in=template_update_schema,
-                )
-
-                original_dump = schemas.TraitTemplate.from_orm(
-                    existing_template
-                ).model_dump(exclude={"id"})
-                current_data_dump = schemas.TraitTemplateCreate(
-                    **template_data
-                ).model_dump()
-                is_actually_changed = False
-                for key, value_from_json in current_data_dump.items():
-                    if original_dump.get(key) != value_from_json:
-                        is_actually_changed = True
-                        break
-                if is_actually_changed:
-                    logger.info(
-                        f"Updating trait template: {template_name} ({template_tag})"
-                    )
-                    updated_count += 1
-                else:
-                    # logger.debug(f"Trait template '{template_name}' ({template_tag}) exists and no changes detected.")
-                    skipped_count += 1
-            else:
-                template_create_schema = schemas.TraitTemplateCreate(**template_data)
-                logger.info(
-                    f"Creating trait template: {template_create_schema.name} ({template_create_schema.trait_id_tag})"
-                )
-                create_trait_template(db, template_in=template_create_schema)
-                seeded_count += 1
-        except Exception as e_pydantic_or_db:
+            rows.append(schemas.TraitTemplateCreate(**template_data).model_dump())
+        except Exception as e_pydantic:
             logger.error(
-                f"Validation or DB operation failed for trait template '{template_name}' ({template_tag}): {e_pydantic_or_db}. Data: {template_data}",
-                exc_info=True,
+                f"Validation failed for trait template '{template_name}' ({template_tag}): {e_pydantic}. Data: {template_data}"
             )
             skipped_count += 1
-            db.rollback()
-            continue
-
-    if seeded_count > 0 or updated_count > 0:
-        try:
-            logger.info(
-                f"Committing {seeded_count} new and {updated_count} updated trait templates."
-            )
-            db.commit()
-            logger.info("Trait template seeding commit successful.")
-        except Exception as e_commit:
-            logger.error(
-                f"Error committing trait template seeds: {e_commit}. Rolling back.",
-                exc_info=True,
-            )
-            db.rollback()
-    else:
-        logger.info(
-            "No new trait templates to seed or templates to update. No commit needed for trait templates."
-        )
 
+    seeded_count, updated_count, unchanged_count = bulk_upsert(
+        db, models.TraitTemplate, rows, key=("trait_id_tag",)
+    )
+    db.commit()
     logger.info(
-        f"Trait template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged/Skipped: {skipped_count}"
+        f"Trait template seeding complete. New: {seeded_count}, Updated: {updated_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}"
     )
@@ -0,0 +1,165 @@
+# backend/app/db/async_db.py
+"""
+Awaitable access to the synchronous SQLAlchemy layer for the real-time paths.
+
+Every CRUD function takes a sync Session, and calling one from an `async def`
+blocks the event loop that serves every socket for the length of the round trip.
+`run_db` runs such a call on a small dedicated DB thread pool instead, so the loop
+keeps serving other players while the query is in flight:
+
+    character = await run_in_session(crud.crud_character.get_character, character_id=cid)
+    room = await run_db(crud.crud_room.get_room_by_id, db, room_id)  # existing session
+    await run_db(db.commit)
+
+A session is not safe for concurrent use, but it may be handed between threads as
+long as only one caller touches it at a time -- which awaiting each call guarantees.
+Objects returned by run_in_session come from a closed session: loaded attributes
+(and eager relationships such as Character.owner) are readable, lazy loads are not.
+
+Game logic (WS command handlers, combat rounds, world tick tasks) interleaves many
+sync queries with its sends, so `run_game_logic` moves a whole coroutine onto one
+game logic thread with an event loop of its own:
+
+    await run_game_logic(process_combat_round, db, character_id, player_id)
+
+That thread runs one piece of game logic at a time, in the order they were handed
+over, so handlers still never race each other over the in-memory game state. The
+sockets belong to the serving loop: connection_manager hands sends made on the
+game logic thread back to it with `run_on_serving_loop`.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from ..core.config import settings
+from . import session as db_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_game_executor: Optional[ThreadPoolExecutor] = None
+_game_thread = threading.local()  # .loop: the game logic thread's own event loop
+# The loop that handed the running game logic over; set only in game logic's context.
+_serving_loop: ContextVar[Optional[asyncio.AbstractEventLoop]] = ContextVar(
+    "serving_loop", default=None
+)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DB_ASYNC_WORKERS, thread_name_prefix="db"
+        )
+    return _executor
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs a blocking DB call on the DB thread pool. The caller's db tag goes with it."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def _call_with_new_session(func: Callable[..., T], commit: bool, *args: Any, **kwargs: Any) -> T:
+    with db_session.SessionLocal(bind=db_session.engine) as db:
+        result = func(db, *args, **kwargs)
+        if commit:
+            db.commit()
+        return result
+
+
+async def run_in_session(
+    func: Callable[..., T], *args: Any, commit: bool = False, **kwargs: Any
+) -> T:
+    """Awaitable func(db, *args, **kwargs) with a short-lived session of its own."""
+    return await run_db(_call_with_new_session, func, commit, *args, **kwargs)
+
+
+def _get_game_executor() -> ThreadPoolExecutor:
+    global _game_executor
+    if _game_executor is None:
+        _game_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="game")
+    return _game_executor
+
+
+def _run_on_game_thread(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    loop = getattr(_game_thread, "loop", None)
+    if loop is None:
+        loop = _game_thread.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(func(*args, **kwargs))
+
+
+async def run_game_logic(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """
+    Awaits func(*args, **kwargs) run on the game logic thread, after whatever game logic
+    was handed over before it. The caller's context (db tag, query budget, unit of work)
+    goes with it. Game logic calling this runs func right away, where it is.
+    """
+    if _serving_loop.get() is not None:
+        # Already on the game logic thread, or on the serving loop for game logic that
+        # waits on us (run_on_serving_loop): queueing behind it would never return.
+        return await func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    context.run(_serving_loop.set, loop)
+    call = functools.partial(context.run, _run_on_game_thread, func, *args, **kwargs)
+    return await loop.run_in_executor(_get_game_executor(), call)
+
+
+def on_game_thread() -> bool:
+    """True while running game logic handed over with run_game_logic."""
+    loop = _serving_loop.get()
+    if loop is None:
+        return False
+    try:
+        return asyncio.get_running_loop() is not loop
+    except RuntimeError:
+        return False  # A DB thread working for game logic
+
+
+def serving_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """The loop that handed the running game logic over, or None outside game logic."""
+    return _serving_loop.get()
+
+
+async def run_on_serving_loop(func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """
+    From the game logic thread: awaits func(*args, **kwargs) run on the serving loop,
+    e.g. a send on one of its sockets. Anywhere else it just awaits it.
+    """
+    if not on_game_thread():
+        return await func(*args, **kwargs)
+    future = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), _serving_loop.get())
+    return await asyncio.wrap_future(future)
+
+
+def _close_game_thread_loop():
+    loop = getattr(_game_thread, "loop", None)
+    if loop is not None:
+        loop.close()
+        _game_thread.loop = None
+
+
+async def shutdown_game_thread():
+    """Waits for the game logic already handed over, which may still send on this loop."""
+    global _game_executor
+    if _game_executor is not None:
+        executor, _game_executor = _game_executor, None
+        executor.submit(_close_game_thread_loop)
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+
+
+def shutdown_db_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,136 @@
+# backend/app/db/query_budget.py
+"""
+Declared SQL query budgets per unit of work, keyed by the db tags from session_stats
+(`ws:<verb>`, `ticker:world:<task>`, `ticker:combat:round`).
+
+`count_queries()` counts the statements run inside it, including those run on the DB
+thread pool by run_db (the counter travels in the copied context). Tests use it via
+the `query_budget` fixture and fail when a command goes over budget; at runtime
+`sample_query_budget()` counts a sampled fraction of commands and ticker tasks and
+logs the ones over budget with their most repeated statements -- the usual N+1
+signature.
+
+Budgets are ceilings for the seeded world, not targets. When a change legitimately
+needs more queries, raise the number here in the same change, where review sees it.
+"""
+import logging
+import random
+import re
+from collections import Counter as StatementCounter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# "SELECT a.x AS a_x, a.y AS ... FROM a JOIN b" -> "SELECT ... FROM a JOIN b"
+_SELECT_LIST = re.compile(r"^SELECT\s.*?\sFROM\s", re.DOTALL)
+_MOVEMENT = ["n", "north", "s", "south", "e", "east", "w", "west", "u", "up", "d", "down", "go"]
+
+
+def _budgets(*groups: Tuple[int, Iterable[str]]) -> Dict[str, int]:
+    return {tag: budget for budget, tags in groups for tag in tags}
+
+
+QUERY_BUDGETS: Dict[str, int] = _budgets(
+    # WS verbs. Each includes the loop's own state load (player, character, room) and
+    # the post-commit inventory push for inventory-changing verbs.
+    (12, ["ws:look", "ws:l"]),
+    (24, [f"ws:{verb}" for verb in _MOVEMENT]),
+    (10, ["ws:inventory", "ws:i", "ws:score", "ws:sc", "ws:status", "ws:st"]),
+    (10, ["ws:skills", "ws:sk", "ws:traits", "ws:tr", "ws:help", "ws:?"]),
+    (10, ["ws:say", "ws:'", "ws:emote", "ws::"]),
+    (20, ["ws:attack", "ws:atk", "ws:kill", "ws:k"]),
+    (15, ["ws:list"]),
+    (20, ["ws:buy", "ws:sell"]),
+    (18, ["ws:get", "ws:take", "ws:drop", "ws:equip", "ws:eq", "ws:unequip", "ws:uneq"]),
+    # World ticker tasks, per tick. Respawns make the population manager spiky.
+    (60, ["ticker:world:mob_population_manager"]),
+    (20, ["ticker:world:roaming_mob_processor"]),
+    (20, ["ticker:world:aggressive_mob_processor"]),
+    (5, ["ticker:world:player_vital_regenerator"]),
+    (0, ["ticker:world:afk_player_checker"]),
+    # One character's combat round.
+    (25, ["ticker:combat:round"]),
+)
+# Anything not declared above.
+DEFAULT_WS_BUDGET = 25
+DEFAULT_BUDGET = 50
+
+
+def budget_for(tag: str) -> int:
+    budget = QUERY_BUDGETS.get(tag)
+    if budget is not None:
+        return budget
+    return DEFAULT_WS_BUDGET if tag.startswith("ws:") else DEFAULT_BUDGET
+
+
+class QueryCounter:
+    def __init__(self, tag: str, capture: bool = False):
+        self.tag = tag
+        self.count = 0
+        self.statements: Optional[List[str]] = [] if capture else None
+
+    @property
+    def budget(self) -> int:
+        return budget_for(self.tag)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.count > self.budget
+
+    def most_repeated(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """The statements run most often, select lists elided. Empty unless capturing."""
+        return StatementCounter(self.statements or []).most_common(limit)
+
+    def summary(self) -> str:
+        lines = [f"'{self.tag}' ran {self.count} queries (budget {self.budget})"]
+        lines += [f"  {times}x {statement}" for statement, times in self.most_repeated()]
+        return "\n".join(lines)
+
+
+_active_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@contextmanager
+def count_queries(tag: str, capture: bool = False) -> Iterator[QueryCounter]:
+    """Counts the SQL statements executed by this task (and its run_db calls) inside the block."""
+    counter = QueryCounter(tag, capture=capture)
+    token = _active_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _active_counter.reset(token)
+
+
+def _on_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _active_counter.get()
+    if counter is None:
+        return
+    counter.count += 1
+    if counter.statements is not None:
+        counter.statements.append(_SELECT_LIST.sub("SELECT ... FROM ", " ".join(statement.split()))[:160])
+
+
+def install_engine_events(engine):
+    event.listen(engine, "before_cursor_execute", _on_cursor_execute)
+
+
+@contextmanager
+def _checked(tag: str) -> Iterator[None]:
+    with count_queries(tag, capture=True) as counter:
+        yield
+    if counter.over_budget:
+        logger.warning(f"Query budget exceeded: {counter.summary()}")
+
+
+def sample_query_budget(tag: str) -> ContextManager:
+    """Budget-checks a QUERY_BUDGET_SAMPLE_RATE fraction of calls; the rest run uncounted."""
+    rate = settings.QUERY_BUDGET_SAMPLE_RATE
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return nullcontext()
+    return _checked(tag)
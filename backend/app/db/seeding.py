@@ -0,0 +1,192 @@
+# backend/app/db/seeding.py
+"""
+Startup seeding that only does work when a seed file has changed.
+
+Each Seeder names the seed files it reads, the seeders it builds on and a version.
+Its digest is the SHA-256 of those files, of its version and of the digests of the
+seeders it builds on -- so editing items.json re-runs the world seeder too, which
+places an item. Code changes don't count: bump the version when a seeder changes
+how it applies its files. After a seeder succeeds its digest is stored in
+seed_checksums; on the next boot a seeder whose digest still matches is skipped
+without opening its JSON. A new or wiped database has no digests and seeds it all.
+
+Seeders that don't build on each other run at the same time, each on its own
+session, on up to SEED_WORKERS threads (one on SQLite, which allows one writer).
+
+Seeders write their rows with bulk_upsert: one SELECT of the rows already there,
+then one executemany INSERT and one executemany UPDATE, not a query per row.
+"""
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.config import settings
+from . import session as db_session
+from .session_stats import set_db_tag
+
+logger = logging.getLogger(__name__)
+
+SEEDS_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "seeds")
+)
+
+
+@dataclass(frozen=True)
+class Seeder:
+    name: str
+    seed: Callable[[Session], Any]
+    files: Tuple[str, ...]  # Relative to app/seeds
+    after: Tuple[str, ...] = ()  # Seeders whose rows this one reads
+    version: int = 1  # Bump to re-run the seeder when its code changes
+
+
+def bulk_upsert(
+    db: Session, model: Any, rows: Sequence[Dict[str, Any]], key: Sequence[str]
+) -> Tuple[int, int, int]:
+    """
+    Inserts the rows whose natural `key` isn't in model's table yet and updates the
+    columns that differ on the rows that are. Doesn't commit. Returns
+    (created, updated, unchanged).
+
+    A row may carry an "id" so callers can reference new rows before they exist;
+    it is ignored for rows that are already there.
+    """
+    by_key: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for row in rows:
+        row_key = tuple(row[k] for k in key)
+        if row_key in by_key:
+            logger.warning(f"Duplicate {model.__name__} seed row for {row_key}; the last one wins.")
+        by_key[row_key] = row
+
+    names = sorted({name for row in by_key.values() for name in row} | set(key) | {"id"})
+    existing = {
+        tuple(current[k] for k in key): current
+        for current in (
+            record._asdict()
+            for record in db.execute(select(*(getattr(model, name) for name in names)))
+        )
+    }
+
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    for row_key, row in by_key.items():
+        current = existing.get(row_key)
+        if current is None:
+            inserts.append(row)
+            continue
+        changes = {
+            name: value
+            for name, value in row.items()
+            if name != "id" and current[name] != value
+        }
+        if changes:
+            updates.append({"id": current["id"], **changes})
+
+    if inserts:
+        db.execute(insert(model), inserts)
+    if updates:
+        db.execute(update(model), updates)
+    return len(inserts), len(updates), len(by_key) - len(inserts) - len(updates)
+
+
+def _digest(seeder: Seeder, upstream: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{seeder.name}:v{seeder.version}".encode())
+    for name in seeder.files:
+        path = os.path.join(SEEDS_DIR, name)
+        digest.update(name.encode())
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b"<missing>")  # So the file appearing later counts as a change
+    for upstream_digest in upstream:
+        digest.update(upstream_digest.encode())
+    return digest.hexdigest()
+
+
+def _digests(seeders: Sequence[Seeder]) -> Dict[str, str]:
+    digests: Dict[str, str] = {}
+    remaining = list(seeders)
+    while remaining:
+        ready = [s for s in remaining if all(name in digests for name in s.after)]
+        if not ready:
+            raise ValueError(
+                f"Seeders {[s.name for s in remaining]} build on unknown or circular seeders."
+            )
+        for seeder in ready:
+            digests[seeder.name] = _digest(seeder, [digests[name] for name in seeder.after])
+            remaining.remove(seeder)
+    return digests
+
+
+def _stored_digests() -> Dict[str, str]:
+    with db_session.SessionLocal(bind=db_session.engine) as db:
+        return dict(db.execute(select(models.SeedChecksum.seeder, models.SeedChecksum.sha256)).all())
+
+
+def _apply(seeder: Seeder, digest: str) -> float:
+    """Runs one seeder on its own session, then records its digest. Runs on a seeding thread."""
+    set_db_tag(f"seed:{seeder.name}")
+    started = time.perf_counter()
+    with db_session.SessionLocal(bind=db_session.engine) as db:
+        seeder.seed(db)
+        db.merge(
+            models.SeedChecksum(
+                seeder=seeder.name, sha256=digest, applied_at=datetime.now(timezone.utc)
+            )
+        )
+        db.commit()
+    return time.perf_counter() - started
+
+
+def run_seeders(seeders: Sequence[Seeder], force: bool = False) -> Dict[str, str]:
+    """
+    Applies every seeder whose inputs changed since it last succeeded, in dependency
+    order. Returns {seeder name: "applied" | "unchanged" | "failed" | "blocked"}; a
+    seeder is blocked, and retried next boot, when one it builds on failed.
+    """
+    digests = _digests(seeders)
+    stored = {} if force else _stored_digests()
+    outcome: Dict[str, str] = {
+        s.name: "unchanged" for s in seeders if stored.get(s.name) == digests[s.name]
+    }
+    pending = [s for s in seeders if s.name not in outcome]
+    if not pending:
+        logger.info(f"All {len(seeders)} seeders unchanged since their last run; nothing to seed.")
+        return outcome
+
+    workers = 1 if db_session.engine.dialect.name == "sqlite" else max(1, settings.SEED_WORKERS)
+    running: Dict[Any, Seeder] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed") as pool:
+        while pending or running:
+            for seeder in list(pending):
+                upstream = [outcome.get(name) for name in seeder.after]
+                if any(state in ("failed", "blocked") for state in upstream):
+                    logger.warning(f"Seeder '{seeder.name}' skipped: a seeder it builds on failed.")
+                    outcome[seeder.name] = "blocked"
+                    pending.remove(seeder)
+                elif all(state is not None for state in upstream):
+                    running[pool.submit(_apply, seeder, digests[seeder.name])] = seeder
+                    pending.remove(seeder)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                seeder = running.pop(future)
+                try:
+                    logger.info(f"Seeder '{seeder.name}' applied in {future.result() * 1000:.0f} ms.")
+                    outcome[seeder.name] = "applied"
+                except Exception as e:
+                    logger.error(f"Seeder '{seeder.name}' failed: {e}", exc_info=True)
+                    outcome[seeder.name] = "failed"
+    return outcome
@@ -3,10 +3,14 @@ import logging
 import time
 from typing import Generator
 
-from sqlalchemy import create_engine, exc
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from ..core.config import settings
+from . import query_budget
+from .session_stats import session_stats
 
 # Logger for this module
 logger = logging.getLogger(__name__)
@@ -18,11 +22,30 @@ if settings.DATABASE_URL is None:
 engine = None
 # The SessionLocal factory is created now, but it is not bound to any engine yet.
 SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+session_stats.install_session_events(SessionLocal)
 
 MAX_RETRIES = 10
 RETRY_DELAY = 5  # seconds
 
 
+def _engine_options(database_url: str) -> dict:
+    """Pool sizing and per-statement timeout from settings. SQLite (tests) keeps its defaults."""
+    options: dict = {"pool_pre_ping": True}
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+    return options
+
+
 def create_db_engine_with_retries():
     """
     This function no longer assigns to a global variable. It just creates,
@@ -32,8 +55,10 @@ def create_db_engine_with_retries():
         try:
             assert settings.DATABASE_URL is not None, "DATABASE_URL cannot be None"
             created_engine = create_engine(
-                str(settings.DATABASE_URL), pool_pre_ping=True
+                str(settings.DATABASE_URL), **_engine_options(str(settings.DATABASE_URL))
             )
+            session_stats.install_engine_events(created_engine)
+            query_budget.install_engine_events(created_engine)
             with created_engine.connect() as connection:
                 logger.info("Database connection successful during creation.")
                 return created_engine
@@ -54,6 +79,24 @@ def create_db_engine_with_retries():
     raise exc.OperationalError("Could not connect to database after multiple retries.")  # type: ignore
 
 
+def prime_pool(bind) -> int:
+    """
+    Opens the pool's steady-state connections up front, all at once so each is a new
+    one, so the first requests after a restart don't pay for connecting. Returns how many.
+    """
+    size = bind.pool.size() if isinstance(bind.pool, QueuePool) else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connection = bind.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
 def get_db() -> Generator:
     """
     FastAPI dependency that provides a database session.
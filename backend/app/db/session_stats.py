@@ -0,0 +1,182 @@
+# backend/app/db/session_stats.py
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_TAG = "untagged"
+_current_db_tag: ContextVar[str] = ContextVar("db_tag", default=DEFAULT_DB_TAG)
+
+_STATS_KEY = "_db_session_stats"
+_queries_total = metrics.counter("llmud_db_queries_total", "SQL statements executed.")
+# Path segments that are ids (UUIDs, numbers) collapse to {id} so HTTP tags stay low-cardinality.
+_ID_SEGMENT = re.compile(r"/(?:[0-9a-fA-F-]{32,36}|-?\d+)(?=/|$)")
+
+
+def set_db_tag(tag: str):
+    """
+    Labels DB work done from here on in the current task (a WS verb, a ticker task,
+    an HTTP route). Tasks copy the tag they were created with, so setting it inside a
+    connection's or ticker's own task doesn't leak elsewhere.
+    """
+    _current_db_tag.set(tag)
+
+
+def current_db_tag() -> str:
+    return _current_db_tag.get()
+
+
+@dataclass
+class TagStats:
+    checkouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    hold_total: float = 0.0
+    hold_max: float = 0.0
+    queries: int = 0
+    max_queries_per_checkout: int = 0
+
+    def as_dict(self, tag: str) -> Dict[str, Any]:
+        checkouts = self.checkouts or 1
+        return {
+            "tag": tag,
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / checkouts * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+            "hold_total_s": round(self.hold_total, 3),
+            "hold_avg_ms": round(self.hold_total / checkouts * 1000, 2),
+            "hold_max_ms": round(self.hold_max * 1000, 2),
+            "queries": self.queries,
+            "queries_per_checkout": round(self.queries / checkouts, 2),
+            "max_queries_per_checkout": self.max_queries_per_checkout,
+        }
+
+
+class SessionStatsRecorder:
+    """
+    Per-tag numbers on how sessions use pooled connections:
+
+    - wait: from a session's first statement to getting a connection (pool checkout,
+      including queueing when the pool is exhausted)
+    - hold: from getting the connection to the end of the transaction that released it
+    - queries: statements executed, attributed to the tag current when each ran
+
+    Wait and hold are attributed to the session's tag (session.info["db_tag"] if set,
+    else the task's tag when the transaction began).
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, TagStats] = {}
+        self._stats_lock = threading.Lock()
+        # Connections currently held by an instrumented session -> that session's state
+        self._held: Dict[Any, Dict[str, Any]] = {}
+
+    def _tag_stats(self, tag: str) -> TagStats:
+        stats = self._stats.get(tag)
+        if stats is None:
+            # DB threads record at the same time; only one may create a tag's entry.
+            with self._stats_lock:
+                stats = self._stats.setdefault(tag, TagStats())
+        return stats
+
+    # --- Event hooks ---
+
+    def install_session_events(self, session_factory):
+        event.listen(session_factory, "do_orm_execute", self._on_execute_requested)
+        event.listen(session_factory, "after_begin", self._on_connection_acquired)
+        event.listen(session_factory, "after_transaction_end", self._on_transaction_end)
+
+    def install_engine_events(self, engine):
+        event.listen(engine, "before_cursor_execute", self._on_cursor_execute)
+
+    def _on_execute_requested(self, orm_execute_state):
+        state = orm_execute_state.session.info.setdefault(_STATS_KEY, {})
+        if "began_at" not in state:
+            state.setdefault("requested_at", time.perf_counter())
+
+    def _on_connection_acquired(self, session, transaction, connection):
+        now = time.perf_counter()
+        state = session.info.setdefault(_STATS_KEY, {})
+        state["began_at"] = now
+        state["queries"] = 0
+        state["tag"] = session.info.get("db_tag") or current_db_tag()
+        self._held[connection] = state
+        state["connection"] = connection
+        wait = now - state.pop("requested_at", now)
+        stats = self._tag_stats(state["tag"])
+        stats.wait_total += wait
+        stats.wait_max = max(stats.wait_max, wait)
+
+    def _on_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        state = self._held.get(conn)
+        tag = current_db_tag()
+        if state is not None:
+            state["queries"] += 1
+            if tag == DEFAULT_DB_TAG:
+                tag = state["tag"]
+        self._tag_stats(tag).queries += 1
+        _queries_total.inc()
+
+    def _on_transaction_end(self, session, transaction):
+        if transaction.parent is not None:
+            return  # Only the root transaction gives the connection back
+        state = session.info.get(_STATS_KEY)
+        if not state or "began_at" not in state:
+            return
+        hold = time.perf_counter() - state.pop("began_at")
+        connection = state.pop("connection", None)
+        if connection is not None:
+            self._held.pop(connection, None)
+        # A tag set on the session after the transaction began still wins.
+        tag = session.info.get("db_tag") or state["tag"]
+        queries = state["queries"]
+
+        stats = self._tag_stats(tag)
+        stats.checkouts += 1
+        stats.hold_total += hold
+        stats.hold_max = max(stats.hold_max, hold)
+        stats.max_queries_per_checkout = max(stats.max_queries_per_checkout, queries)
+        if hold >= settings.DB_SLOW_SESSION_HOLD_SECONDS:
+            logger.warning(
+                f"DB session '{tag}' held a connection for {hold * 1000:.0f}ms ({queries} queries)."
+            )
+
+    # --- Reporting ---
+
+    def report(self, sort_by: str = "hold_total_s", limit: int = 25) -> List[Dict[str, Any]]:
+        """Per-tag stats, worst connection hogs first."""
+        with self._stats_lock:
+            tagged = list(self._stats.items())
+        rows = [stats.as_dict(tag) for tag, stats in tagged]
+        rows.sort(key=lambda row: row.get(sort_by, 0), reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+
+# Global instance
+session_stats = SessionStatsRecorder()
+
+
+class DbTagMiddleware:
+    """Tags DB work done by an HTTP request with its method and id-normalized path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            set_db_tag(f"http:{scope['method']} {_ID_SEGMENT.sub('/{id}', scope['path'])}")
+        await self.app(scope, receive, send)
@@ -0,0 +1,218 @@
+# backend/app/db/unit_of_work.py
+"""
+One commit per WebSocket command, and one WAL flush for many players' commits.
+
+Handlers stage their changes on the session they are given (db.add, db.flush when
+they need ids or fresh reads) and never commit. The WS loop owns the unit of work:
+
+    with unit_of_work(db) as uow:
+        await uow.run(handle_ws_buy, db, ...)  # on the game logic thread; frames it sends are held
+        await uow.commit()                     # held frames go out only after this succeeds
+
+While a unit of work is staging, frames its task sends through connection_manager
+are held and delivered in order after the commit. If the commit fails they are
+dropped, so a player is never told "You buy a torch" for a purchase that didn't
+persist.
+
+Commits go through `group_committer`, which gathers the commits that arrive within
+DB_GROUP_COMMIT_WINDOW_MS and runs them as one batch on the DB thread pool. On
+PostgreSQL every commit in a batch is asynchronous (synchronous_commit off), then
+one small synchronous transaction flushes the WAL through all of them -- one fsync
+for the batch instead of one per command. No commit in the batch is acknowledged
+(its awaiting command resumed) before that flush returns.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .async_db import run_db, run_game_logic
+from .session_stats import set_db_tag
+
+logger = logging.getLogger(__name__)
+
+_batch_size = metrics.histogram(
+    "llmud_db_group_commit_batch_size",
+    "Commits flushed together by the group committer.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+_batch_seconds = metrics.histogram(
+    "llmud_db_group_commit_seconds", "Wall time to commit one group-commit batch, WAL flush included."
+)
+
+
+def _commit(db: Session, asynchronous: bool):
+    if asynchronous and db.in_transaction():
+        db.execute(text("SET LOCAL synchronous_commit TO OFF"))
+    db.commit()
+
+
+def _commit_all(
+    commits: List[Tuple[Session, contextvars.Context]]
+) -> List[Optional[BaseException]]:
+    """Commits each session in turn; one failure doesn't stop the rest. Runs on a DB thread."""
+    bind = commits[0][0].get_bind()
+    flush_once = len(commits) > 1 and bind.dialect.name == "postgresql"
+    errors: List[Optional[BaseException]] = []
+    for db, context in commits:
+        try:
+            # In the committing command's context, so its db tag and query count include the flush.
+            context.run(_commit, db, flush_once)
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+    if flush_once and any(error is None for error in errors):
+        # A transaction that has an xid commits synchronously, and its WAL flush covers
+        # every commit record written before it: the whole batch is durable after this.
+        with bind.connect() as connection:
+            connection.execute(text("SELECT txid_current()"))
+            connection.commit()
+    return errors
+
+
+class GroupCommitter:
+    def __init__(self):
+        self._pending: List[Tuple[Session, contextvars.Context, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set = set()  # Keeps running batch tasks referenced
+        self.batches_committed = 0
+        self.commits = 0
+
+    async def commit(self, db: Session):
+        """Commits db, possibly together with other sessions. Raises if this session's commit failed."""
+        window = settings.DB_GROUP_COMMIT_WINDOW_MS / 1000
+        if window <= 0:
+            await run_db(db.commit)
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((db, contextvars.copy_context(), future))
+        if len(self._pending) >= settings.DB_GROUP_COMMIT_MAX_BATCH:
+            self._start_batch()
+        elif self._timer is None:
+            self._timer = loop.call_later(window, self._start_batch)
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The session is on a DB thread mid-commit; it must not be closed under it.
+            await asyncio.wait({future})
+            raise
+
+    def _start_batch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # A fresh context, so the batch doesn't run under one caller's db tag or unit of work.
+            task = contextvars.Context().run(asyncio.ensure_future, self._commit_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _commit_batch(
+        self, batch: List[Tuple[Session, contextvars.Context, asyncio.Future]]
+    ):
+        set_db_tag("ws:group_commit")
+        with _batch_seconds.time():
+            try:
+                errors = await run_db(_commit_all, [(db, context) for db, context, _ in batch])
+            except Exception as e:
+                # The WAL flush failed: none of the batch can be acknowledged as durable.
+                logger.error(f"Group commit of {len(batch)} sessions failed to flush: {e}")
+                errors = [e] * len(batch)
+        _batch_size.observe(len(batch))
+        self.batches_committed += 1
+        self.commits += len(batch)
+        for (_, _, future), error in zip(batch, errors):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+group_committer = GroupCommitter()
+
+
+class UnitOfWork:
+    def __init__(self, db: Session):
+        self.db = db
+        self.staging = False
+        self._owners: Set["asyncio.Task[Any]"] = set()
+        self._held: List[Callable[[], Awaitable[Any]]] = []
+
+    def hold(self, send: Callable[..., Awaitable[Any]], *args: Any) -> bool:
+        """
+        Queues send(*args) until the commit, if it is this unit's own task (or what it
+        runs with `run`) sending while it stages. Returns False when the caller should
+        send right away.
+        """
+        if not self.staging or asyncio.current_task() not in self._owners:
+            return False
+        self._held.append(functools.partial(send, *args))
+        return True
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Awaits func(*args) on the game logic thread as part of this unit (see run_game_logic)."""
+        return await run_game_logic(self._run_staged, func, *args)
+
+    async def _run_staged(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        task = asyncio.current_task()
+        if task in self._owners:
+            return await func(*args)
+        self._owners.add(task)
+        try:
+            return await func(*args)
+        finally:
+            self._owners.discard(task)
+
+    async def commit(self):
+        """Commits the staged changes, then delivers the frames held while staging."""
+        self.staging = False
+        try:
+            await group_committer.commit(self.db)
+        except Exception:
+            self._held.clear()
+            raise
+        held, self._held = self._held, []
+        for send in held:
+            await send()
+
+    async def rollback(self):
+        self.staging = False
+        self._held.clear()
+        await run_db(self.db.rollback)
+
+
+_current_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar(
+    "unit_of_work", default=None
+)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_unit_of_work.get()
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[UnitOfWork]:
+    """Stages one command on db. Frames held by a unit that never commits are dropped."""
+    uow = UnitOfWork(db)
+    uow.staging = True
+    uow._owners.add(asyncio.current_task())
+    token = _current_unit_of_work.set(uow)
+    try:
+        yield uow
+    finally:
+        _current_unit_of_work.reset(token)
+        if uow.staging and uow._held:
+            logger.debug(f"Unit of work ended without a commit; dropped {len(uow._held)} frames.")
+        uow.staging = False
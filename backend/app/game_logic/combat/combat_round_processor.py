@@ -69,22 +69,7 @@ async def process_combat_round(
             if current_room_for_update
             else None
         )
-        xp_for_next_lvl = crud.crud_character.get_xp_for_level(character.level + 1)
-        vitals_for_payload = {
-            "current_hp": character.current_health,
-            "max_hp": character.max_health,
-            "current_mp": character.current_mana,
-            "max_mp": character.max_mana,
-            "current_xp": character.experience_points,
-            "next_level_xp": (
-                int(xp_for_next_lvl) if xp_for_next_lvl != float("inf") else -1
-            ),  # Handle infinity
-            "level": character.level,
-            "platinum": character.platinum_coins,
-            "gold": character.gold_coins,
-            "silver": character.silver_coins,
-            "copper": character.copper_coins,
-        }
+        vitals_for_payload = crud.crud_character.get_character_vitals(character)
         await send_combat_log(
             player_id,
             round_log_dead_char,
@@ -620,24 +605,7 @@ async def process_combat_round(
         db, room_id=character.current_room_id
     )
 
-    xp_for_next_level_final = crud.crud_character.get_xp_for_level(character.level + 1)
-    final_vitals_payload = {
-        "current_hp": character.current_health,
-        "max_hp": character.max_health,
-        "current_mp": character.current_mana,
-        "max_mp": character.max_mana,
-        "current_xp": character.experience_points,
-        "next_level_xp": (
-            int(xp_for_next_level_final)
-            if xp_for_next_level_final != float("inf")
-            else -1
-        ),
-        "level": character.level,
-        "platinum": character.platinum_coins,
-        "gold": character.gold_coins,
-        "silver": character.silver_coins,
-        "copper": character.copper_coins,
-    }
+    final_vitals_payload = crud.crud_character.get_character_vitals(character)
 
     final_room_schema_for_response = None
     if final_room_for_payload_orm:
@@ -659,11 +627,9 @@ async def process_combat_round(
     if any("XP gained" in log_entry for log_entry in round_log) or any(
         "You have reached Level" in log_entry for log_entry in round_log
     ):
-        await websocket_manager.connection_manager.broadcast(
-            {"type": "who_list_updated"}
-        )  # MODIFIED USAGE
+        websocket_manager.connection_manager.schedule_who_list_update()
         logger.info(
-            f"Combat round for char {character_id} resulted in XP/level change. Broadcasted who_list_updated."
+            f"Combat round for char {character_id} resulted in XP/level change. Scheduled who_list_updated."
         )
 
     logger.info(
@@ -1,10 +1,15 @@
 # backend/app/game_logic/combat/combat_ticker.py
 import asyncio
 import logging
+import time
 import uuid
-from typing import Optional
+from typing import List, Optional
 
+from app.core.metrics import metrics
+from app.db.async_db import run_game_logic
+from app.db.query_budget import sample_query_budget
 from app.db.session import get_db
+from app.db.session_stats import set_db_tag
 
 from .combat_round_processor import process_combat_round
 from .combat_state_manager import active_combats, end_combat_for_character
@@ -14,14 +19,91 @@ logger = logging.getLogger(__name__)
 
 COMBAT_ROUND_INTERVAL = 3.0
 
+_tick_seconds = metrics.histogram(
+    "llmud_combat_tick_seconds", "Wall time of a combat tick across all active combats."
+)
+_round_seconds = metrics.histogram(
+    "llmud_combat_round_seconds", "Wall time of one character's combat round."
+)
+_round_errors = metrics.counter(
+    "llmud_combat_round_errors_total", "Combat rounds that raised and ended the combat."
+)
+metrics.gauge(
+    "llmud_active_combats",
+    "Characters currently in combat.",
+    callback=lambda: len(active_combats),
+)
+
 _combat_ticker_task_handle: Optional[asyncio.Task] = None
 
 
-async def combat_ticker_loop():
+async def _run_combat_tick(character_ids_in_combat: List[uuid.UUID]):
+    """One round for each character in combat. Runs on the game logic thread."""
     # Keep the local import here to prevent potential circular dependency issues.
     from app.websocket_manager import connection_manager as ws_manager
 
+    # --- THE FIX IS HERE: Use the same pattern as our other background tasks ---
+    with next(get_db()) as db:
+        for character_id in character_ids_in_combat:
+            player_id_for_char: Optional[uuid.UUID] = None
+
+            # Find the player_id for the character in combat
+            for pid_loop, charid_active_loop in list(
+                ws_manager.player_active_characters.items()
+            ):
+                if charid_active_loop == character_id:
+                    player_id_for_char = pid_loop
+                    break
+
+            if not player_id_for_char or not ws_manager.is_player_connected(
+                player_id_for_char
+            ):
+                logger.warning(
+                    f"Combat Ticker: Character {character_id} in combat but player not found or disconnected. Ending combat."
+                )
+                end_combat_for_character(
+                    character_id,
+                    reason="player_disconnected_or_not_found_in_ticker",
+                )
+                continue
+
+            # Check again in case a previous iteration removed this character from combat
+            if character_id not in active_combats:
+                continue
+
+            round_started = time.perf_counter()
+            try:
+                with sample_query_budget("ticker:combat:round"):
+                    await process_combat_round(db, character_id, player_id_for_char)
+                _round_seconds.observe(time.perf_counter() - round_started)
+            except Exception as e_combat_round:
+                _round_errors.inc()
+                logger.error(
+                    f"Combat Ticker: Error during process_combat_round for char {character_id}: {e_combat_round}",
+                    exc_info=True,
+                )
+                end_combat_for_character(
+                    character_id,
+                    reason=f"error_in_round_processing_ticker: {e_combat_round}",
+                )
+                try:
+                    # Ensure you're passing a list of strings for messages
+                    await send_combat_log(
+                        player_id_for_char,
+                        [
+                            "A server error occurred during your combat round. Combat has ended for you."
+                        ],
+                        combat_over=True,
+                    )
+                except Exception as e_send_err:
+                    logger.error(
+                        f"Combat Ticker: Failed to send combat error log to player {player_id_for_char}: {e_send_err}"
+                    )
+
+
+async def combat_ticker_loop():
     logger.info("Combat Ticker: Loop started.")
+    set_db_tag("ticker:combat")
     while True:
         await asyncio.sleep(COMBAT_ROUND_INTERVAL)
 
@@ -31,59 +113,11 @@ async def combat_ticker_loop():
         if not character_ids_in_combat:
             continue
 
-        # --- THE FIX IS HERE: Use the same pattern as our other background tasks ---
-        with next(get_db()) as db:
-            for character_id in character_ids_in_combat:
-                player_id_for_char: Optional[uuid.UUID] = None
-
-                # Find the player_id for the character in combat
-                for pid_loop, charid_active_loop in list(
-                    ws_manager.player_active_characters.items()
-                ):
-                    if charid_active_loop == character_id:
-                        player_id_for_char = pid_loop
-                        break
-
-                if not player_id_for_char or not ws_manager.is_player_connected(
-                    player_id_for_char
-                ):
-                    logger.warning(
-                        f"Combat Ticker: Character {character_id} in combat but player not found or disconnected. Ending combat."
-                    )
-                    end_combat_for_character(
-                        character_id,
-                        reason="player_disconnected_or_not_found_in_ticker",
-                    )
-                    continue
-
-                # Check again in case a previous iteration removed this character from combat
-                if character_id not in active_combats:
-                    continue
-
-                try:
-                    await process_combat_round(db, character_id, player_id_for_char)
-                except Exception as e_combat_round:
-                    logger.error(
-                        f"Combat Ticker: Error during process_combat_round for char {character_id}: {e_combat_round}",
-                        exc_info=True,
-                    )
-                    end_combat_for_character(
-                        character_id,
-                        reason=f"error_in_round_processing_ticker: {e_combat_round}",
-                    )
-                    try:
-                        # Ensure you're passing a list of strings for messages
-                        await send_combat_log(
-                            player_id_for_char,
-                            [
-                                "A server error occurred during your combat round. Combat has ended for you."
-                            ],
-                            combat_over=True,
-                        )
-                    except Exception as e_send_err:
-                        logger.error(
-                            f"Combat Ticker: Failed to send combat error log to player {player_id_for_char}: {e_send_err}"
-                        )
+        tick_started = time.perf_counter()
+        # The rounds' queries and state changes run off the event loop, in turn with
+        # the WS command handlers (see app.db.async_db.run_game_logic).
+        await run_game_logic(_run_combat_tick, character_ids_in_combat)
+        _tick_seconds.observe(time.perf_counter() - tick_started)
 
 
 def start_combat_ticker_task():
@@ -5,12 +5,11 @@ import logging
 import os
 import random
 import uuid
-from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from app import crud, models, schemas
 from app.commands.utils import get_formatted_mob_name, get_opposite_direction
-from app.game_state import mob_group_death_timestamps
+from app.db.unit_of_work import current_unit_of_work
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -39,7 +38,15 @@ def _load_loot_tables_from_json() -> Dict[str, Any]:
         return {}
 
 
-LOADED_LOOT_TABLES = _load_loot_tables_from_json()
+_loot_tables: Optional[Dict[str, Any]] = None
+
+
+def get_loot_tables() -> Dict[str, Any]:
+    """Loot tables by tag, read once: by main.lifespan at startup, or on first use."""
+    global _loot_tables
+    if _loot_tables is None:
+        _loot_tables = _load_loot_tables_from_json()
+    return _loot_tables
 
 # --- Constants and Maps ---
 direction_map = {
@@ -141,6 +148,20 @@ async def send_combat_log(
     """Sends a structured combat log message to a single player."""
     from app.websocket_manager import connection_manager as ws_manager  # Local import
 
+    # Held whole, like send_vitals, so the vitals diff (and its baseline) is taken
+    # when the frame goes out, not for a frame a failed commit drops.
+    uow = current_unit_of_work()
+    if uow is not None and uow.hold(
+        send_combat_log, player_id, messages, combat_over, room_data, character_vitals, transient
+    ):
+        return
+    if player_id not in ws_manager.active_player_connections:
+        return  # Nothing to deliver, and no per-connection vitals baseline to start
+
+    if character_vitals:
+        # Only the fields that changed since the last frame go out (schemas/vitals.py).
+        character_vitals = ws_manager.diff_vitals(player_id, character_vitals) or None
+
     if not messages and not combat_over and not room_data and not character_vitals:
         return
 
@@ -251,8 +272,9 @@ async def handle_mob_death_loot_and_cleanup(
     items_dropped_to_ground_details: List[str] = []
     if mob_template.loot_table_tags:
         for loot_tag in mob_template.loot_table_tags:
-            if loot_tag in LOADED_LOOT_TABLES:
-                potential_drops = LOADED_LOOT_TABLES[loot_tag]
+            loot_tables = get_loot_tables()
+            if loot_tag in loot_tables:
+                potential_drops = loot_tables[loot_tag]
                 for drop_entry in potential_drops:
                     if random.randint(1, 100) <= drop_entry.get("chance", 0):
                         item_template_to_drop = crud.crud_item.get_item_by_name(
@@ -336,46 +358,13 @@ async def handle_mob_death_loot_and_cleanup(
                 exclude_player_id=player_id,
             )
 
-    # --- Respawn Timer Logic ---
-    if killed_mob_instance.spawn_definition_id:
-        living_siblings_count = (
-            db.query(models.RoomMobInstance.id)
-            .filter(
-                models.RoomMobInstance.spawn_definition_id
-                == killed_mob_instance.spawn_definition_id,
-                models.RoomMobInstance.current_health > 0,
-                models.RoomMobInstance.id
-                != killed_mob_instance.id,  # Exclude the currently killed mob
-            )
-            .count()
-        )
-        spawn_def = crud.crud_mob_spawn_definition.get_definition(
-            db, definition_id=killed_mob_instance.spawn_definition_id
-        )
-        if spawn_def and living_siblings_count < spawn_def.quantity_min:
-            # Check if a respawn timer isn't already set for this group from a previous kill in the same tick/short interval
-            if (
-                killed_mob_instance.spawn_definition_id
-                not in mob_group_death_timestamps
-            ):
-                logger.info(
-                    f"DEATH_HANDLER: Mob group '{spawn_def.definition_name}' (ID: {spawn_def.id}) dropped below min ({living_siblings_count} < {spawn_def.quantity_min}). Starting respawn timer."
-                )
-                mob_group_death_timestamps[killed_mob_instance.spawn_definition_id] = (
-                    datetime.now(timezone.utc)
-                )
-            else:
-                logger.debug(
-                    f"DEATH_HANDLER: Mob group '{spawn_def.definition_name}' (ID: {spawn_def.id}) already has a respawn timer pending."
-                )
-
     # --- Despawn Mob ---
     logger.debug(
         f"Despawning mob instance {killed_mob_instance.id} for {mob_template.name}."
     )
-    crud.crud_mob.despawn_mob_from_room(
-        db, killed_mob_instance.id
-    )  # This commits internally
+    # Despawning also hands the death to the respawn scheduler, which starts the
+    # group's respawn timer if it dropped below its minimum.
+    crud.crud_mob.despawn_mob_from_room(db, killed_mob_instance.id)
 
     return character_after_loot, autoloot_occurred_for_items, autolooted_item_details
 
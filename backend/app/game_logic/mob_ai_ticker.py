@@ -3,9 +3,10 @@
 import logging
 import random
 import uuid
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from app import crud, models
+from app.db.async_db import run_db
 from app.game_logic.combat import combat_state_manager, combat_utils
 from app.schemas.common_structures import ExitDetail
 from app.services.room_service import (  # <<< We'll use this proper service
@@ -18,13 +19,9 @@ from sqlalchemy.orm import Session, joinedload
 logger = logging.getLogger(__name__)
 
 
-async def process_roaming_mobs_task(db: Session):
-    """
-    Handles random movement for mobs with 'random_adjacent' roaming behavior.
-    Ensures mobs do not move through locked doors.
-    """
-    # Query for mob instances that might roam
-    mobs_to_check_for_roaming = (
+def _roaming_mob_candidates(db: Session) -> List[models.RoomMobInstance]:
+    """Mob instances that might roam, with the rooms needed to pick and check an exit."""
+    return (
         db.query(models.RoomMobInstance)
         .options(
             joinedload(models.RoomMobInstance.mob_template),
@@ -50,6 +47,15 @@ async def process_roaming_mobs_task(db: Session):
         .all()
     )
 
+
+async def process_roaming_mobs_task(db: Session):
+    """
+    Handles random movement for mobs with 'random_adjacent' roaming behavior.
+    Ensures mobs do not move through locked doors.
+    """
+    # Queries run on the DB thread pool so the tick doesn't stall the event loop.
+    mobs_to_check_for_roaming = await run_db(_roaming_mob_candidates, db)
+
     for mob in mobs_to_check_for_roaming:
         # Skip if mob is in combat.
         if (
@@ -107,7 +113,9 @@ async def process_roaming_mobs_task(db: Session):
 
         chosen_direction, next_room_target_id = random.choice(available_unlocked_exits)
 
-        next_room_orm = crud.crud_room.get_room_by_id(db, room_id=next_room_target_id)
+        next_room_orm = await run_db(
+            crud.crud_room.get_room_by_id, db, room_id=next_room_target_id
+        )
         if not next_room_orm:
             logger.warning(
                 f"Mob AI: Roaming mob {mob.id} chose exit to non-existent room ID {next_room_target_id}."
@@ -172,13 +180,9 @@ async def process_roaming_mobs_task(db: Session):
             )
 
 
-async def process_aggressive_mobs_task(db: Session):
-    """
-    Handles mobs initiating combat based on their aggression type.
-    This task currently assumes all mobs are aggressive on sight.
-    """
+def _aggressive_mob_candidates(db: Session) -> List[models.RoomMobInstance]:
     # A more optimized query would filter by aggression_type, but this is fine for now
-    mobs_to_check_for_aggression = (
+    return (
         db.query(models.RoomMobInstance)
         .options(
             joinedload(models.RoomMobInstance.mob_template),
@@ -188,12 +192,26 @@ async def process_aggressive_mobs_task(db: Session):
         .all()
     )
 
+
+async def process_aggressive_mobs_task(db: Session):
+    """
+    Handles mobs initiating combat based on their aggression type.
+    This task currently assumes all mobs are aggressive on sight.
+    """
+    mobs_to_check_for_aggression = await run_db(_aggressive_mob_candidates, db)
+
+    # Only rooms with someone online can start a fight; each is queried once per tick.
+    occupied_room_ids = set(ws_manager.character_locations.values())
+    characters_by_room: Dict[uuid.UUID, List[models.Character]] = {}
+
     for mob in mobs_to_check_for_aggression:
         if not mob.room or not mob.mob_template:
             logger.warning(
                 f"Mob AI (Aggro): Skipping mob {mob.id} due to missing room or template."
             )
             continue
+        if mob.room_id not in occupied_room_ids:
+            continue
 
         if (
             mob.id in combat_state_manager.mob_targets
@@ -201,9 +219,11 @@ async def process_aggressive_mobs_task(db: Session):
         ):
             continue
 
-        characters_in_room = crud.crud_character.get_characters_in_room(
-            db, room_id=mob.room_id
-        )
+        characters_in_room = characters_by_room.get(mob.room_id)
+        if characters_in_room is None:
+            characters_in_room = characters_by_room[mob.room_id] = await run_db(
+                crud.crud_character.get_characters_in_room, db, room_id=mob.room_id
+            )
         living_characters = [
             char
             for char in characters_in_room
@@ -1,76 +1,78 @@
-# backend/app/game_logic/mob_respawner.py (REWRITTEN TO NOT BE A DUMBASS)
-from datetime import datetime, timedelta, timezone
+# backend/app/game_logic/mob_respawner.py
+import logging
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, List
 
-from app import crud, models
-from app.game_state import mob_group_death_timestamps
+from app.crud import crud_mob
+from app.game_logic.respawn_scheduler import respawn_scheduler
 from app.websocket_manager import connection_manager
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger(__name__)
+
+
+def _format_spawn_announcement(mob_name_counts: Counter) -> str:
+    parts = [
+        f"<span class='mob-name'>{name}</span>" + (f" (x{count})" if count > 1 else "")
+        for name, count in mob_name_counts.items()
+    ]
+    total = sum(mob_name_counts.values())
+    verb = "emerges" if total == 1 else "emerge"
+    return f"{', '.join(parts)} {verb} from the shadows!"
+
 
 async def manage_mob_populations_task(db: Session):
     """
-    Checks the in-memory dictionary of depleted mob groups and respawns them
-    if their delay has passed.
+    Pops only the respawn timers that are due from the scheduler heap, tops each
+    group back up to its max in one bulk INSERT, and announces once per room.
     """
-    now = datetime.now(timezone.utc)
+    respawn_scheduler.ensure_loaded(db)
 
-    # Iterate over a copy of the items, so we can safely remove from the original dict
-    for def_id, death_timestamp in list(mob_group_death_timestamps.items()):
+    due_definitions = respawn_scheduler.pop_due()
+    if not due_definitions:
+        return
 
-        spawn_def = crud.crud_mob_spawn_definition.get_definition(
-            db, definition_id=def_id
+    spawn_requests: List[crud_mob.MobSpawnRequest] = []
+
+    for spawn_def in due_definitions:
+        num_to_spawn = spawn_def.quantity_max - respawn_scheduler.get_alive_count(
+            spawn_def.id
         )
-        if not spawn_def:
-            # Clean up if the definition was deleted from the DB for some reason
-            del mob_group_death_timestamps[def_id]
+        if num_to_spawn <= 0:
             continue
 
-        # Check if enough time has passed since the group was depleted
-        if now >= death_timestamp + timedelta(seconds=spawn_def.respawn_delay_seconds):
-
-            # How many are currently alive?
-            living_children_count = (
-                db.query(models.RoomMobInstance.id)
-                .filter(
-                    models.RoomMobInstance.spawn_definition_id == def_id,
-                    models.RoomMobInstance.current_health > 0,
-                )
-                .count()
+        logger.info(
+            f"RESPAWNER: Timer up for '{spawn_def.definition_name}'. Spawning {num_to_spawn} mobs."
+        )
+        spawn_requests.append(
+            crud_mob.MobSpawnRequest(
+                mob_template_id=spawn_def.mob_template_id,
+                room_id=spawn_def.room_id,
+                spawn_definition_id=spawn_def.id,
+                count=num_to_spawn,
             )
+        )
 
-            # How many do we want? Let's aim for the max.
-            num_to_spawn = spawn_def.quantity_max - living_children_count
+    # The timers have been acted upon. If a group gets depleted again, a new timer is set.
+    respawn_scheduler.clear_persisted_timers(db, (d.id for d in due_definitions))
 
-            if num_to_spawn > 0:
-                print(
-                    f"RESPAWNER: Timer up for '{spawn_def.definition_name}'. Spawning {num_to_spawn} mobs."
-                )
-                for _ in range(num_to_spawn):
-                    # No need to check spawn chance here, as the timer itself is the gate
-                    new_mob = crud.crud_mob.spawn_mob_in_room(
-                        db,
-                        room_id=spawn_def.room_id,
-                        mob_template_id=spawn_def.mob_template_id,
-                        originating_spawn_definition_id=spawn_def.id,
-                    )
-                    # Broadcast spawn event (optional, but cool)
-                    if new_mob and new_mob.mob_template:
-                        spawn_message_payload = {
-                            "type": "game_event",
-                            "message": f"<span class='mob-name'>{new_mob.mob_template.name}</span> emerges from the shadows!",
-                        }
-                        player_ids_in_spawn_room = [
-                            char.player_id
-                            for char in crud.crud_character.get_characters_in_room(
-                                db, room_id=spawn_def.room_id
-                            )
-                            if connection_manager.is_player_connected(char.player_id)
-                        ]
-                        if player_ids_in_spawn_room:
-                            await connection_manager.broadcast_to_players(
-                                spawn_message_payload, player_ids_in_spawn_room
-                            )
+    # One INSERT ... RETURNING for every due group; also bumps the scheduler's alive counts.
+    new_instances = crud_mob.spawn_mobs_bulk(db, spawn_requests)
 
-            # The timer has been acted upon, remove it from the book.
-            # If the group gets depleted again, a new timestamp will be set.
-            del mob_group_death_timestamps[def_id]
+    spawned_names_by_room: Dict[uuid.UUID, Counter] = defaultdict(Counter)
+    for instance in new_instances:
+        mob_name = (
+            crud_mob.get_cached_mob_template_name(instance.mob_template_id)
+            or "Something"
+        )
+        spawned_names_by_room[instance.room_id][mob_name] += 1
+
+    for room_id, mob_name_counts in spawned_names_by_room.items():
+        await connection_manager.broadcast_to_room(
+            {
+                "type": "game_event",
+                "message": _format_spawn_announcement(mob_name_counts),
+            },
+            room_id,
+        )
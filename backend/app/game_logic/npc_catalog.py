@@ -0,0 +1,127 @@
+# backend/app/game_logic/npc_catalog.py
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+
+class NpcCatalog:
+    """
+    In-memory catalog of NPC templates by unique_name_tag, plus a precomputed
+    room_id -> [NpcTemplate] index built from Room.npc_placements.
+
+    Templates are detached from any session. Their static fields (name, type,
+    shop inventory, dialogue, prompt) are safe to read. Token counters are a
+    snapshot from load time; re-fetch the row when the live value matters.
+    """
+
+    def __init__(self):
+        self._by_tag: Dict[str, models.NpcTemplate] = {}
+        # room_id -> (placements the entry was built from, resolved templates)
+        self._room_index: Dict[
+            uuid.UUID, Tuple[Tuple[str, ...], List[models.NpcTemplate]]
+        ] = {}
+        self._loaded = False
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @staticmethod
+    def _query_detached_templates(db: Session, *criteria) -> List[models.NpcTemplate]:
+        # A private session keeps the caller's identity map untouched; closing it
+        # without a commit leaves the loaded attributes readable on the detached objects.
+        with Session(bind=db.get_bind()) as catalog_session:
+            return catalog_session.query(models.NpcTemplate).filter(*criteria).all()
+
+    def load(self, db: Session):
+        """Loads every NPC template and indexes every room's placements. Two queries."""
+        templates = self._query_detached_templates(db)
+        self._by_tag = {t.unique_name_tag: t for t in templates}
+
+        # Rooms without placements are indexed too, so a lookup by id never has to miss.
+        self._room_index = {}
+        for room_id, placements in db.query(models.Room.id, models.Room.npc_placements):
+            self._index_room(db, room_id, tuple(placements or ()))
+        self._loaded = True
+        logger.info(
+            f"NpcCatalog: Loaded {len(self._by_tag)} NPC templates, {len(self._room_index)} rooms indexed."
+        )
+
+    def invalidate(self):
+        """Forces a full reload on next use, e.g. after NPC templates are re-seeded."""
+        self._loaded = False
+
+    def invalidate_room(self, room_id: uuid.UUID):
+        """Drops one room's index entry; it is rebuilt from its placements on next lookup."""
+        self._room_index.pop(room_id, None)
+
+    def get_by_tag(self, db: Session, unique_name_tag: str) -> Optional[models.NpcTemplate]:
+        if not self._loaded:
+            self.load(db)
+        if unique_name_tag not in self._by_tag:
+            self._load_missing_tags(db, (unique_name_tag,))
+        return self._by_tag.get(unique_name_tag)
+
+    def get_npcs_in_room(self, db: Session, room: models.Room) -> List[models.NpcTemplate]:
+        if not self._loaded:
+            self.load(db)
+        placements = tuple(room.npc_placements or ())
+        entry = self._room_index.get(room.id)
+        # The entry is rebuilt whenever the room's placements differ from what it was built from.
+        if entry is None or entry[0] != placements:
+            entry = self._index_room(db, room.id, placements, room_name=room.name)
+        return list(entry[1])
+
+    def get_npcs_for_room_id(
+        self, db: Session, room_id: uuid.UUID
+    ) -> List[models.NpcTemplate]:
+        """Like get_npcs_in_room, but without needing the Room loaded. Trusts the index."""
+        if not self._loaded:
+            self.load(db)
+        entry = self._room_index.get(room_id)
+        if entry is None:
+            placements = db.query(models.Room.npc_placements).filter(
+                models.Room.id == room_id
+            ).scalar()
+            entry = self._index_room(db, room_id, tuple(placements or ()))
+        return list(entry[1])
+
+    def _index_room(
+        self,
+        db: Session,
+        room_id: uuid.UUID,
+        placements: Tuple[str, ...],
+        room_name: Optional[str] = None,
+    ) -> Tuple[Tuple[str, ...], List[models.NpcTemplate]]:
+        self._load_missing_tags(db, placements)
+        templates = []
+        for npc_tag in placements:
+            template = self._by_tag.get(npc_tag)
+            if template:
+                templates.append(template)
+            else:
+                logger.warning(
+                    f"Room '{room_name or room_id}' has placement for non-existent NPC with tag '{npc_tag}'."
+                )
+        entry = (placements, templates)
+        self._room_index[room_id] = entry
+        return entry
+
+    def _load_missing_tags(self, db: Session, tags: Iterable[str]):
+        missing = {tag for tag in tags if tag not in self._by_tag}
+        if not missing:
+            return
+        for template in self._query_detached_templates(
+            db, models.NpcTemplate.unique_name_tag.in_(missing)
+        ):
+            self._by_tag[template.unique_name_tag] = template
+
+
+# Global instance
+npc_catalog = NpcCatalog()
@@ -0,0 +1,148 @@
+# backend/app/game_logic/npc_dialogue_cache.py
+import hashlib
+import random
+import time
+from collections import OrderedDict, deque
+from datetime import date
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.game_logic.npc_dialogue_provider import NAME_SLOT, DialogueRequest
+
+DIALOGUE_CACHE_MAX_KEYS = 256
+DIALOGUE_CACHE_TTL_SECONDS = 15 * 60
+DIALOGUE_CACHE_LINES_PER_KEY = 8
+DIALOGUE_POOL_TARGET_SIZE = 3
+# Reserved against the budget before a call, until the real count is known.
+DEFAULT_TOKEN_ESTIMATE_PER_CALL = 200
+
+
+def prompt_cache_key(request: DialogueRequest) -> str:
+    """Generated lines don't depend on who is present (names go in NAME_SLOT), only on the personality."""
+    basis = request.personality_prompt or f"tag:{request.npc_tag}"
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def render_line(line: str, player_names: Sequence[str]) -> str:
+    """Fills the name slot of a generated line for the room it is spoken in."""
+    if NAME_SLOT not in line:
+        return line
+    if not player_names:
+        names = "everyone"
+    elif len(player_names) == 1:
+        names = player_names[0]
+    else:
+        names = f"{', '.join(player_names[:-1])} and {player_names[-1]}"
+    return line.replace(NAME_SLOT, names)
+
+
+class DialogueResponseCache:
+    """LRU of prompt key -> recently generated (templated) lines, each key expiring after a TTL."""
+
+    def __init__(
+        self,
+        max_keys: int = DIALOGUE_CACHE_MAX_KEYS,
+        ttl_seconds: float = DIALOGUE_CACHE_TTL_SECONDS,
+        lines_per_key: int = DIALOGUE_CACHE_LINES_PER_KEY,
+    ):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self.lines_per_key = lines_per_key
+        self._entries: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return random.choice(entry[1])
+        if entry:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, line: str):
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and now - entry[0] < self.ttl_seconds:
+            lines = entry[1]
+            if line not in lines:
+                lines.append(line)
+                del lines[: -self.lines_per_key]
+            # The TTL runs from the first line so a popular key still rotates its lines.
+            self._entries[key] = (entry[0], lines)
+        else:
+            self._entries[key] = (now, [line])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DialogueLinePool:
+    """Per-NPC queue of pre-generated, not-yet-spoken lines, filled in the background."""
+
+    def __init__(self, target_size: int = DIALOGUE_POOL_TARGET_SIZE):
+        self.target_size = target_size
+        self._lines: Dict[str, Deque[str]] = {}
+
+    def take(self, npc_tag: str) -> Optional[str]:
+        lines = self._lines.get(npc_tag)
+        return lines.popleft() if lines else None
+
+    def add(self, npc_tag: str, line: str):
+        self._lines.setdefault(npc_tag, deque(maxlen=self.target_size)).append(line)
+
+    def shortfall(self, npc_tag: str) -> int:
+        return self.target_size - len(self._lines.get(npc_tag, ()))
+
+
+class DialogueTokenBudget:
+    """
+    Daily per-NPC token budget, checked before a provider call. Calls reserve an
+    estimate up front and settle it with the real count once the call returns.
+    """
+
+    def __init__(self):
+        self._used_today: Dict[str, int] = {}
+        self._reserved: Dict[str, int] = {}
+        self._day = date.today()
+        self._calls = 0
+        self._tokens = 0
+
+    def _roll_day(self):
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._used_today.clear()
+
+    def observe(self, npc_tag: str, tokens_used_today: int, last_reset: Optional[date]):
+        """Seeds the ledger from the DB row; counts from an earlier day don't apply."""
+        self._roll_day()
+        persisted = tokens_used_today if last_reset == self._day else 0
+        self._used_today[npc_tag] = max(self._used_today.get(npc_tag, 0), persisted)
+
+    def estimate(self) -> int:
+        if not self._calls:
+            return DEFAULT_TOKEN_ESTIMATE_PER_CALL
+        return max(1, self._tokens // self._calls)
+
+    def try_reserve(self, npc_tag: str, daily_budget: int) -> Optional[int]:
+        """Returns the reserved amount, or None if the call would exceed the budget (0 = unlimited)."""
+        self._roll_day()
+        reservation = self.estimate()
+        committed = self._used_today.get(npc_tag, 0) + self._reserved.get(npc_tag, 0)
+        if daily_budget and committed + reservation > daily_budget:
+            return None
+        self._reserved[npc_tag] = self._reserved.get(npc_tag, 0) + reservation
+        return reservation
+
+    def settle(self, npc_tag: str, reservation: int, tokens_used: int):
+        self._reserved[npc_tag] = max(0, self._reserved.get(npc_tag, 0) - reservation)
+        self._used_today[npc_tag] = self._used_today.get(npc_tag, 0) + tokens_used
+        if tokens_used > 0:
+            self._calls += 1
+            self._tokens += tokens_used
@@ -0,0 +1,163 @@
+# backend/app/game_logic/npc_dialogue_provider.py
+import asyncio
+import logging
+import random
+from typing import NamedTuple, Optional, Protocol, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GEMINI_DIALOGUE_MODEL = "models/gemini-2.5-flash-preview-05-20"
+# Generated lines refer to the people present through this slot, so one line can be
+# cached and spoken in any room (see npc_dialogue_cache.render_line).
+NAME_SLOT = "{players}"
+
+
+class DialogueRequest(NamedTuple):
+    """Everything a provider needs, detached from the DB session so it can cross threads."""
+
+    npc_tag: str
+    npc_name: str
+    personality_prompt: Optional[str]
+    static_lines: Tuple[str, ...]
+    player_names: Tuple[str, ...]
+
+
+class DialogueResult(NamedTuple):
+    text: Optional[str]  # None means the NPC stays silent this cycle
+    tokens_used: int = 0
+    cacheable: bool = True  # False for static fallbacks, which must not fill the cache
+
+
+class DialogueProvider(Protocol):
+    name: str
+
+    async def generate(self, request: DialogueRequest) -> DialogueResult: ...
+
+
+def static_dialogue(request: DialogueRequest) -> DialogueResult:
+    """Fallback used whenever a provider can't produce a line. Costs no tokens."""
+    if request.static_lines:
+        return DialogueResult(random.choice(request.static_lines), 0, cacheable=False)
+    return DialogueResult(None, 0, cacheable=False)
+
+
+class StaticDialogueProvider:
+    """
+    Picks from the NPC's dialogue_lines_static. Stands in for the LLM in tests
+    and benchmarks; `latency_seconds` and `tokens_per_call` simulate a real backend.
+    """
+
+    name = "static"
+
+    def __init__(self, latency_seconds: float = 0.0, tokens_per_call: int = 0):
+        self.latency_seconds = latency_seconds
+        self.tokens_per_call = tokens_per_call
+
+    async def generate(self, request: DialogueRequest) -> DialogueResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        result = static_dialogue(request)
+        if result.text is None:
+            return result
+        # Behaves like a generating backend: its lines are cacheable and cost tokens.
+        return DialogueResult(result.text, self.tokens_per_call)
+
+
+class GeminiDialogueProvider:
+    """Generates dialogue with the Gemini API. The blocking SDK call runs in a worker thread."""
+
+    name = "gemini"
+
+    def __init__(self, client, model: str = GEMINI_DIALOGUE_MODEL):
+        self.client = client
+        self.model = model
+
+    @staticmethod
+    def build_prompt(request: DialogueRequest) -> str:
+        # Deliberately independent of who is present so the result can be cached.
+        return f"""
+        {request.personality_prompt}
+
+        You are in a room with one or more adventurers.
+        Based on your personality, say something appropriate to them or the situation.
+        If you address them by name, write exactly {NAME_SLOT} in place of their names.
+        Do not use asterisks or action descriptions. Just provide the line of dialogue.
+        Keep your dialogue to one or two sentences.
+        """
+
+    def _generate_sync(self, request: DialogueRequest) -> DialogueResult:
+        prompt = self.build_prompt(request)
+        logger.debug(f"Calling Gemini API for NPC {request.npc_name} with prompt: {prompt}")
+        response = self.client.models.generate_content(model=self.model, contents=prompt)
+
+        token_count = 0
+        usage = getattr(response, "usage_metadata", None)
+        if usage and getattr(usage, "total_token_count", None):
+            token_count = usage.total_token_count
+            logger.info(
+                f"Gemini API usage for NPC '{request.npc_name}': {token_count} tokens."
+            )
+        else:
+            logger.warning(
+                f"Could not retrieve token count from Gemini API response for NPC '{request.npc_name}'."
+            )
+
+        if response and getattr(response, "text", None):
+            dialogue = response.text.strip().replace('"', "")
+            logger.info(f"Generated dialogue for {request.npc_name}: '{dialogue}'")
+            return DialogueResult(dialogue, token_count)
+
+        logger.warning(
+            f"Gemini API returned a response with no text for {request.npc_name}. Using fallback."
+        )
+        # The tokens were still spent even though we fall back to a static line.
+        return DialogueResult(
+            static_dialogue(request).text, token_count, cacheable=False
+        )
+
+    async def generate(self, request: DialogueRequest) -> DialogueResult:
+        return await asyncio.to_thread(self._generate_sync, request)
+
+
+# --- Provider Registry ---
+_provider: Optional[DialogueProvider] = None
+_provider_resolved = False
+
+
+def _build_default_provider() -> Optional[DialogueProvider]:
+    if not settings.GEMINI_API_KEY:
+        logger.warning(
+            "GEMINI_API_KEY not found in settings. NPC AI dialogue will be disabled."
+        )
+        return None
+    try:
+        from google import genai
+
+        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        logger.info("Gemini AI Client initialized successfully.")
+        return GeminiDialogueProvider(client)
+    except ImportError:
+        logger.warning(
+            "google-genai library not found. Please ensure it is in requirements.txt and the container is rebuilt."
+        )
+    except Exception as e:
+        logger.error(f"Failed to initialize Gemini AI Client: {e}", exc_info=True)
+    return None
+
+
+def get_dialogue_provider() -> Optional[DialogueProvider]:
+    """Returns the active provider, building the Gemini one on first use. None disables NPC dialogue."""
+    global _provider, _provider_resolved
+    if not _provider_resolved:
+        _provider = _build_default_provider()
+        _provider_resolved = True
+    return _provider
+
+
+def set_dialogue_provider(provider: Optional[DialogueProvider]):
+    """Swaps the dialogue backend, e.g. a StaticDialogueProvider in tests and benchmarks."""
+    global _provider, _provider_resolved
+    _provider = provider
+    _provider_resolved = True
@@ -1,338 +1,376 @@
 # backend/app/game_logic/npc_dialogue_ticker.py
 import asyncio
 import logging
-import random
 import uuid
 from datetime import date
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-from app import crud, models
+from app import models
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.async_db import run_game_logic, run_in_session
 
 # --- IMPORT THE ONE TRUE DB GETTER ---
 from app.db.session import get_db
+from app.db.session_stats import set_db_tag
+from app.game_logic.npc_catalog import npc_catalog
+from app.game_logic.npc_dialogue_cache import (
+    DialogueLinePool,
+    DialogueResponseCache,
+    DialogueTokenBudget,
+    prompt_cache_key,
+    render_line,
+)
+from app.game_logic.npc_dialogue_provider import (
+    DialogueProvider,
+    DialogueRequest,
+    DialogueResult,
+    get_dialogue_provider,
+    static_dialogue,
+)
 from app.services.world_service import broadcast_say_to_room
 from app.websocket_manager import connection_manager
 
 logger = logging.getLogger(__name__)
 
-# --- Gemini API Configuration ---
-client = None
-try:
-    from google import genai
-
-    if settings.GEMINI_API_KEY:
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        logger.info("Gemini AI Client initialized successfully.")
-    else:
-        logger.warning(
-            "GEMINI_API_KEY not found in settings. NPC AI dialogue will be disabled."
-        )
-except ImportError:
-    logger.warning(
-        "google-genai library not found. Please ensure it is in requirements.txt and the container is rebuilt."
-    )
-except Exception as e:
-    logger.error(f"Failed to initialize Gemini AI Client: {e}", exc_info=True)
-
 
 # --- Ticker State ---
 _dialogue_ticker_task: Optional[asyncio.Task] = None
 _last_spoken_times: dict[str, float] = {}
+DIALOGUE_CYCLE_SECONDS = 15
 DIALOGUE_COOLDOWN_SECONDS = 60
 
+_cycle_seconds = metrics.histogram(
+    "llmud_dialogue_cycle_seconds",
+    "Wall time of an NPC dialogue cycle, provider calls included.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0),
+)
+_provider_calls = metrics.counter(
+    "llmud_dialogue_provider_calls_total", "NPC lines that needed a dialogue provider call."
+)
+_lines_spoken = metrics.counter("llmud_dialogue_lines_total", "NPC lines broadcast to rooms.")
+
+# Only NPCs that had an audience this recently get their line pools refilled.
+DIALOGUE_REFILL_DEMAND_WINDOW_SECONDS = 10 * 60
+
+# npc unique_name_tag -> tokens spent since the last flush
+_pending_token_usage: Dict[str, int] = {}
+
+dialogue_cache = DialogueResponseCache()
+dialogue_pool = DialogueLinePool()
+token_budget = DialogueTokenBudget()
+# npc unique_name_tag -> (last request seen for it, loop time it was seen)
+_recent_demand: Dict[str, Tuple[DialogueRequest, float]] = {}
+_refill_task: Optional[asyncio.Task] = None
+_provider_semaphore: Optional[asyncio.Semaphore] = None
+_provider_semaphore_key: Optional[Tuple[asyncio.AbstractEventLoop, int]] = None
+
+
+class DialogueJob(NamedTuple):
+    room_id: Optional[uuid.UUID]  # None for background pool refills
+    request: DialogueRequest
+
+
+async def _load_audience(
+    characters_by_room: Dict[uuid.UUID, List[uuid.UUID]]
+) -> Tuple[Dict[uuid.UUID, str], Dict[uuid.UUID, List[models.NpcTemplate]]]:
+    """Online characters' names and each room's NPCs. Runs on the game logic thread."""
+    with next(get_db()) as db:
+        # Names for every online character in one query instead of one per character.
+        all_char_ids = [c for ids in characters_by_room.values() for c in ids]
+        names_by_char_id = dict(
+            db.query(models.Character.id, models.Character.name)
+            .filter(models.Character.id.in_(all_char_ids))
+            .all()
+        )
+        npcs_by_room = {
+            room_id: npc_catalog.get_npcs_for_room_id(db, room_id)
+            for room_id in characters_by_room
+        }
+    return names_by_char_id, npcs_by_room
+
+
+async def collect_dialogue_jobs(now: float) -> List[DialogueJob]:
+    """One job per off-cooldown NPC that shares a room with at least one online character."""
+    characters_by_room: Dict[uuid.UUID, List[uuid.UUID]] = {}
+    for char_id, room_id in connection_manager.get_all_character_locations().items():
+        characters_by_room.setdefault(room_id, []).append(char_id)
+    if not characters_by_room:
+        return []
+
+    names_by_char_id, npcs_by_room = await run_game_logic(_load_audience, characters_by_room)
+
+    jobs: List[DialogueJob] = []
+    for room_id, char_ids in characters_by_room.items():
+        npcs_in_room = npcs_by_room[room_id]
+        if not npcs_in_room:
+            continue
+        player_names = tuple(
+            names_by_char_id[c] for c in char_ids if c in names_by_char_id
+        )
+        if not player_names:
+            continue
 
-def get_gemini_dialogue(
-    npc: models.NpcTemplate, players_in_room: list
-) -> Tuple[str, Optional[int]]:
-    """Calls the Gemini API to generate dialogue for an NPC. Returns (dialogue, token_count)."""
-    logger.debug(
-        f"get_gemini_dialogue: Called for NPC '{npc.name}'. Players in room: {[p.name for p in players_in_room]}"
-    )
-    token_count: Optional[int] = None  # Initialize token_count
-
-    if not client:
-        logger.debug(f"get_gemini_dialogue: Gemini client is None. NPC: '{npc.name}'.")
-        if npc.dialogue_lines_static:
-            selected_line = random.choice(npc.dialogue_lines_static)
-            logger.debug(
-                f"get_gemini_dialogue: Using static dialogue for '{npc.name}': '{selected_line}'"
+        for npc in npcs_in_room:
+            token_budget.observe(
+                npc.unique_name_tag, npc.tokens_used_today, npc.last_token_reset_date
             )
-            return selected_line, 0  # 0 tokens for static lines
-        logger.debug(
-            f"get_gemini_dialogue: No static dialogue for '{npc.name}', returning silent message."
-        )
-        return f"{npc.name} stands here silently.", 0  # 0 tokens for silent
+            request = DialogueRequest(
+                npc_tag=npc.unique_name_tag,
+                npc_name=npc.name,
+                personality_prompt=npc.personality_prompt,
+                static_lines=tuple(npc.dialogue_lines_static or ()),
+                player_names=player_names,
+            )
+            _recent_demand[npc.unique_name_tag] = (request, now)
+            last_spoken = _last_spoken_times.get(npc.unique_name_tag, 0)
+            if now - last_spoken < DIALOGUE_COOLDOWN_SECONDS:
+                continue
+            jobs.append(DialogueJob(room_id=room_id, request=request))
+    return jobs
+
+
+def _get_provider_semaphore() -> asyncio.Semaphore:
+    """
+    The one permit pool for dialogue cycles and pool refills alike, so calls still
+    running after a timeout count against the next cycle too. Created on the
+    serving loop (a Semaphore binds to the loop it first waits on).
+    """
+    global _provider_semaphore, _provider_semaphore_key
+    key = (asyncio.get_running_loop(), settings.NPC_DIALOGUE_MAX_CONCURRENCY)
+    if _provider_semaphore is None or _provider_semaphore_key != key:
+        _provider_semaphore = asyncio.Semaphore(settings.NPC_DIALOGUE_MAX_CONCURRENCY)
+        _provider_semaphore_key = key
+    return _provider_semaphore
+
+
+async def _generate_with_limits(
+    provider: DialogueProvider, request: DialogueRequest, semaphore: asyncio.Semaphore
+) -> DialogueResult:
+    await semaphore.acquire()
+    # A timeout can't stop a provider call running in a thread, so the call is
+    # shielded and keeps its permit until it really finishes (see _finish_late_call).
+    call = asyncio.ensure_future(provider.generate(request))
     try:
-        player_names = ", ".join([p.name for p in players_in_room])
-        logger.debug(
-            f"get_gemini_dialogue: Player names for prompt: '{player_names}' for NPC '{npc.name}'."
+        return await asyncio.wait_for(
+            asyncio.shield(call), timeout=settings.NPC_DIALOGUE_TIMEOUT_SECONDS
         )
-        prompt = f"""
-        {npc.personality_prompt}
-
-        You are in a room with the following people: {player_names}.
-        Based on your personality, say something appropriate to them or the situation.
-        Do not use asterisks or action descriptions. Just provide the line of dialogue.
-        Keep your dialogue to one or two sentences.
-        """
-        logger.debug(f"Calling Gemini API for NPC {npc.name} with prompt: {prompt}")
-        response = (
-            client.models.generate_content(  # Assuming this is the correct client usage
-                model="models/gemini-2.5-flash-preview-05-20", contents=prompt
-            )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Dialogue Ticker: '{provider.name}' timed out after {settings.NPC_DIALOGUE_TIMEOUT_SECONDS}s for NPC '{request.npc_name}'. Using fallback."
         )
-        logger.debug(
-            f"get_gemini_dialogue: Raw response from Gemini for NPC '{npc.name}': {response}"
+    except Exception as e:
+        logger.error(
+            f"Dialogue Ticker: '{provider.name}' failed for NPC '{request.npc_name}': {e}",
+            exc_info=True,
         )
-
-        # Attempt to get token count
-        if (
-            hasattr(response, "usage_metadata")
-            and response.usage_metadata
-            and hasattr(response.usage_metadata, "total_token_count")
-        ):
-            token_count = response.usage_metadata.total_token_count
-            logger.info(f"Gemini API usage for NPC '{npc.name}': {token_count} tokens.")
+    finally:
+        if call.done():
+            semaphore.release()
         else:
-            logger.warning(
-                f"Could not retrieve token count from Gemini API response for NPC '{npc.name}'. Will not update token stats for this call."
-            )
-            # You could estimate here if desired, e.g., token_count = len(prompt.split()) + len(response.text.split())
+            call.add_done_callback(lambda done: _finish_late_call(done, request, semaphore))
+    return static_dialogue(request)
+
+
+def _finish_late_call(
+    call: "asyncio.Future[DialogueResult]", request: DialogueRequest, semaphore: asyncio.Semaphore
+):
+    """
+    Runs when a timed-out provider call finally returns: frees its permit and
+    charges the tokens it spent, which the fallback line settled as zero.
+    """
+    semaphore.release()
+    if call.cancelled():
+        return
+    if call.exception() is not None:
+        logger.debug(f"Dialogue Ticker: Late call for NPC '{request.npc_name}' failed: {call.exception()}")
+        return
+    tokens_used = call.result().tokens_used
+    token_budget.settle(request.npc_tag, 0, tokens_used)
+    record_token_usage(request.npc_tag, tokens_used)
+
+
+async def run_dialogue_jobs(
+    provider: DialogueProvider, jobs: List[DialogueJob]
+) -> List[Tuple[DialogueJob, DialogueResult]]:
+    """Dispatches every job at once; the shared semaphore bounds how many hit the provider concurrently."""
+    semaphore = _get_provider_semaphore()
+    results = await asyncio.gather(
+        *(_generate_with_limits(provider, job.request, semaphore) for job in jobs)
+    )
+    return list(zip(jobs, results))
 
-        if response and hasattr(response, "text") and response.text:
-            dialogue = response.text.strip().replace('"', "")
-            logger.info(f"Generated dialogue for {npc.name}: '{dialogue}'")
-            return dialogue, token_count
-        else:
-            logger.warning(
-                f"Gemini API returned a response with no text for {npc.name}. Using fallback."
+
+def _line_without_provider_call(request: DialogueRequest) -> Optional[str]:
+    """A pre-generated line from the NPC's pool, else a cached line for the same prompt."""
+    return dialogue_pool.take(request.npc_tag) or dialogue_cache.get(
+        prompt_cache_key(request)
+    )
+
+
+async def _run_budgeted_jobs(
+    provider: DialogueProvider, jobs: List[DialogueJob]
+) -> List[Tuple[DialogueJob, DialogueResult]]:
+    """
+    Reserves each job against its NPC's daily token budget before any call is
+    made; over-budget NPCs fall back to their static lines.
+    """
+    budget = settings.NPC_DIALOGUE_DAILY_TOKEN_BUDGET
+    allowed: List[Tuple[DialogueJob, int]] = []
+    results: List[Tuple[DialogueJob, DialogueResult]] = []
+    for job in jobs:
+        reservation = token_budget.try_reserve(job.request.npc_tag, budget)
+        if reservation is None:
+            logger.info(
+                f"Dialogue Ticker: NPC '{job.request.npc_name}' is over its daily token budget ({budget}). Using static lines."
             )
-            if npc.dialogue_lines_static:
-                selected_line = random.choice(npc.dialogue_lines_static)
-                logger.debug(
-                    f"get_gemini_dialogue: Fallback to static dialogue for '{npc.name}': '{selected_line}'"
-                )
-                return selected_line, 0  # 0 tokens for static fallback
-            logger.debug(
-                f"get_gemini_dialogue: No static dialogue for '{npc.name}' on fallback, returning thinking message."
+            results.append((job, static_dialogue(job.request)))
+        else:
+            allowed.append((job, reservation))
+
+    generated = await run_dialogue_jobs(provider, [job for job, _ in allowed])
+    for (job, result), (_, reservation) in zip(generated, allowed):
+        token_budget.settle(job.request.npc_tag, reservation, result.tokens_used)
+        record_token_usage(job.request.npc_tag, result.tokens_used)
+        if result.text and result.cacheable:
+            dialogue_cache.put(prompt_cache_key(job.request), result.text)
+        results.append((job, result))
+    return results
+
+
+async def refill_dialogue_pools(provider: DialogueProvider, now: float):
+    """Tops up the line pools of NPCs that recently had an audience. Runs while the ticker is idle."""
+    jobs: List[DialogueJob] = []
+    for npc_tag, (request, seen_at) in list(_recent_demand.items()):
+        if now - seen_at > DIALOGUE_REFILL_DEMAND_WINDOW_SECONDS:
+            del _recent_demand[npc_tag]
+            continue
+        if dialogue_pool.shortfall(npc_tag) > 0:
+            jobs.append(DialogueJob(room_id=None, request=request))
+    if not jobs:
+        return
+
+    results = await _run_budgeted_jobs(provider, jobs)
+    refilled = 0
+    for job, result in results:
+        if result.text and result.cacheable:
+            dialogue_pool.add(job.request.npc_tag, result.text)
+            refilled += 1
+    await flush_token_usage()
+    logger.debug(f"Dialogue Ticker: Refilled {refilled} pooled lines.")
+
+
+def _start_refill_if_idle(provider: DialogueProvider, now: float):
+    global _refill_task
+    if _refill_task is None or _refill_task.done():
+        _refill_task = asyncio.create_task(refill_dialogue_pools(provider, now))
+
+
+def record_token_usage(npc_tag: str, tokens: int):
+    if tokens > 0:
+        _pending_token_usage[npc_tag] = _pending_token_usage.get(npc_tag, 0) + tokens
+
+
+async def flush_token_usage():
+    """Applies all token usage accumulated this cycle in a single commit, on a DB thread."""
+    if not _pending_token_usage:
+        return
+    pending = dict(_pending_token_usage)
+    _pending_token_usage.clear()
+    if not await run_in_session(_write_token_usage, pending):
+        # Keep the counts so the next cycle retries them.
+        for tag, tokens in pending.items():
+            record_token_usage(tag, tokens)
+
+
+def _write_token_usage(db, pending: Dict[str, int]) -> bool:
+    today = date.today()
+    npc_templates = (
+        db.query(models.NpcTemplate)
+        .filter(models.NpcTemplate.unique_name_tag.in_(pending.keys()))
+        .all()
+    )
+    for npc_template in npc_templates:
+        if npc_template.last_token_reset_date != today:
+            logger.info(
+                f"Resetting 'tokens_used_today' for NPC '{npc_template.name}' (was {npc_template.tokens_used_today} on {npc_template.last_token_reset_date})."
             )
-            return f"{npc.name} seems to be thinking, but says nothing.", 0  # 0 tokens
-    except Exception as e:
-        logger.error(f"Error calling Gemini API for NPC {npc.name}: {e}", exc_info=True)
-        if npc.dialogue_lines_static:
-            selected_line = random.choice(npc.dialogue_lines_static)
-            logger.debug(
-                f"get_gemini_dialogue: Exception, fallback to static dialogue for '{npc.name}': '{selected_line}'"
+            npc_template.tokens_used_today = 0
+            npc_template.last_token_reset_date = today
+        tokens = pending[npc_template.unique_name_tag]
+        npc_template.total_tokens_used += tokens
+        npc_template.tokens_used_today += tokens
+    try:
+        db.commit()
+    except Exception as e_commit:
+        logger.error(f"Dialogue Ticker: Error committing token usage: {e_commit}")
+        db.rollback()
+        return False
+    return True
+
+
+async def _speak_lines(lines: List[Tuple[DialogueJob, Optional[str]]], now: float):
+    """Says each line to its room. Runs on the game logic thread."""
+    with next(get_db()) as db:
+        for job, line in lines:
+            if not line:
+                continue
+            await broadcast_say_to_room(
+                db=db,
+                speaker_name=job.request.npc_name,
+                room_id=job.room_id,
+                message=render_line(line, job.request.player_names),
             )
-            return selected_line, 0  # 0 tokens for static fallback
-        logger.debug(
-            f"get_gemini_dialogue: Exception, no static dialogue for '{npc.name}', returning clears throat message."
-        )
-        return f"{npc.name} clears their throat but says nothing.", 0  # 0 tokens
+            _last_spoken_times[job.request.npc_tag] = now
+            _lines_spoken.inc()
+
+
+async def run_dialogue_cycle(provider: DialogueProvider):
+    now = asyncio.get_running_loop().time()
+    jobs = await collect_dialogue_jobs(now)
+
+    lines: List[Tuple[DialogueJob, Optional[str]]] = []
+    needs_provider: List[DialogueJob] = []
+    for job in jobs:
+        line = _line_without_provider_call(job.request)
+        if line:
+            lines.append((job, line))
+        else:
+            needs_provider.append(job)
+
+    if needs_provider:
+        _provider_calls.inc(len(needs_provider))
+        # No DB session is held while the provider calls are in flight.
+        for job, result in await _run_budgeted_jobs(provider, needs_provider):
+            lines.append((job, result.text))
+    else:
+        # Nothing had to wait on the provider this cycle: use the slack to pre-generate.
+        _start_refill_if_idle(provider, now)
+
+    if not lines:
+        logger.debug("Dialogue Ticker: No NPCs eligible to speak this cycle.")
+        return
+
+    await run_game_logic(_speak_lines, lines, now)
+    await flush_token_usage()
+    logger.debug(
+        f"Dialogue Ticker: Cycle finished. {len(jobs)} lines, {len(needs_provider)} provider calls via '{provider.name}'."
+    )
 
 
 async def dialogue_ticker_loop():
     """The main loop for the NPC dialogue ticker."""
     logger.info("Dialogue Ticker: Loop starting.")
+    set_db_tag("ticker:dialogue")  # Also inherited by the pool refill tasks it starts
     while True:
         try:
-            await asyncio.sleep(15)
-            logger.debug("Dialogue Ticker: Loop cycle initiated.")
-            if not client:
-                logger.debug("Dialogue Ticker: Gemini client is None, skipping cycle.")
+            await asyncio.sleep(DIALOGUE_CYCLE_SECONDS)
+            provider = get_dialogue_provider()
+            if not provider:
+                logger.debug("Dialogue Ticker: No dialogue provider, skipping cycle.")
                 continue
-
-            logger.debug("Dialogue Ticker: Checking for NPCs to speak...")
-
-            online_character_locations = connection_manager.get_all_player_locations()
-            if not online_character_locations:
-                logger.debug(
-                    "Dialogue Ticker: No online characters found. Skipping this cycle."
-                )
-                continue
-            logger.debug(
-                f"Dialogue Ticker: Online character locations: {online_character_locations}"
-            )
-
-            rooms_with_players: Dict[uuid.UUID, List[uuid.UUID]] = {}
-            for char_id, room_id in online_character_locations.items():
-                if room_id not in rooms_with_players:
-                    rooms_with_players[room_id] = []
-                rooms_with_players[room_id].append(char_id)
-            logger.debug(f"Dialogue Ticker: Rooms with players: {rooms_with_players}")
-
-            # --- THE FIX IS HERE ---
-            # Use the correct, bound session from our get_db generator.
-            with next(get_db()) as db:
-                logger.debug("Dialogue Ticker: Acquired DB session.")
-                for (
-                    room_id,
-                    player_ids_in_room,
-                ) in (
-                    rooms_with_players.items()
-                ):  # Renamed char_ids_in_room to player_ids_in_room for clarity
-                    logger.debug(
-                        f"Dialogue Ticker: Processing room_id: {room_id} with player_ids: {player_ids_in_room}"
-                    )
-                    room = crud.crud_room.get_room_by_id(db, room_id=room_id)
-                    if not room:
-                        logger.debug(
-                            f"Dialogue Ticker: Room {room_id} not found in DB. Skipping."
-                        )
-                        continue
-                    if not room.npc_placements:
-                        logger.debug(
-                            f"Dialogue Ticker: Room {room_id} ('{room.name}') has no NPC placements. Skipping."
-                        )
-                        continue
-                    logger.debug(
-                        f"Dialogue Ticker: Room {room_id} ('{room.name}') found with NPC placements."
-                    )
-
-                    # Convert player_ids to character_ids
-                    actual_character_ids_for_room = []
-                    for p_id in player_ids_in_room:
-                        c_id = connection_manager.get_character_id(p_id)
-                        if c_id:
-                            actual_character_ids_for_room.append(c_id)
-                        else:
-                            logger.warning(
-                                f"Dialogue Ticker: Player ID {p_id} in room {room_id} has no active character mapping. Skipping this player."
-                            )
-
-                    if not actual_character_ids_for_room:
-                        logger.debug(
-                            f"Dialogue Ticker: No character objects could be resolved for players in room {room_id}. Skipping."
-                        )
-                        continue
-
-                    logger.debug(
-                        f"Dialogue Ticker: Resolved character_ids for room {room_id}: {actual_character_ids_for_room}"
-                    )
-
-                    player_character_objects = [
-                        crud.crud_character.get_character(db, char_id_val)
-                        for char_id_val in actual_character_ids_for_room
-                    ]
-                    logger.debug(
-                        f"Dialogue Ticker: Player character objects for room {room_id}: {player_character_objects}"
-                    )
-                    valid_players_in_room = [p for p in player_character_objects if p]
-                    logger.debug(
-                        f"Dialogue Ticker: Valid players in room {room_id}: {[p.name for p in valid_players_in_room]}"
-                    )
-
-                    if not valid_players_in_room:
-                        logger.debug(
-                            f"No valid players in room {room_id}. Skipping dialogue generation for this room."
-                        )
-                        continue
-
-                    npcs_in_room = crud.crud_room.get_npcs_in_room(db, room=room)
-                    logger.debug(
-                        f"Dialogue Ticker: NPCs found in room {room_id} ('{room.name}'): {[npc.name for npc in npcs_in_room]}"
-                    )
-                    for (
-                        npc_template_obj
-                    ) in npcs_in_room:  # Iterate over NpcTemplate objects
-                        logger.debug(
-                            f"Dialogue Ticker: Processing NPC '{npc_template_obj.name}' (tag: {npc_template_obj.unique_name_tag}) in room {room_id}."
-                        )
-                        last_spoken = _last_spoken_times.get(
-                            npc_template_obj.unique_name_tag, 0
-                        )
-                        current_time_loop = (
-                            asyncio.get_event_loop().time()
-                        )  # Renamed to avoid conflict
-                        logger.debug(
-                            f"Dialogue Ticker: NPC '{npc_template_obj.name}': last_spoken={last_spoken}, current_time={current_time_loop}, cooldown={DIALOGUE_COOLDOWN_SECONDS}"
-                        )
-
-                        if current_time_loop - last_spoken < DIALOGUE_COOLDOWN_SECONDS:
-                            logger.debug(
-                                f"Dialogue Ticker: NPC '{npc_template_obj.name}' is on cooldown. Skipping."
-                            )
-                            continue
-                        logger.debug(
-                            f"Dialogue Ticker: NPC '{npc_template_obj.name}' is NOT on cooldown. Attempting to get dialogue."
-                        )
-
-                        loop = asyncio.get_running_loop()
-                        dialogue_line, tokens_this_call = await loop.run_in_executor(
-                            None,
-                            get_gemini_dialogue,
-                            npc_template_obj,  # Pass the NpcTemplate object
-                            valid_players_in_room,
-                        )
-                        logger.debug(
-                            f"Dialogue Ticker: Dialogue line received for NPC '{npc_template_obj.name}': '{dialogue_line}', Tokens: {tokens_this_call}"
-                        )
-
-                        if tokens_this_call is not None and tokens_this_call > 0:
-                            # Fetch the specific NPC template instance to update
-                            # This ensures we're working with a fresh object from the current session
-                            db_npc_template = crud.crud_npc.get_npc_template_by_tag(
-                                db, unique_name_tag=npc_template_obj.unique_name_tag
-                            )
-                            if db_npc_template:
-                                today = date.today()
-                                if db_npc_template.last_token_reset_date != today:
-                                    logger.info(
-                                        f"Resetting 'tokens_used_today' for NPC '{db_npc_template.name}' (was {db_npc_template.tokens_used_today} on {db_npc_template.last_token_reset_date})."
-                                    )
-                                    db_npc_template.tokens_used_today = 0
-                                    db_npc_template.last_token_reset_date = today
-
-                                db_npc_template.total_tokens_used += tokens_this_call
-                                db_npc_template.tokens_used_today += tokens_this_call
-                                db.add(db_npc_template)
-                                # Consider committing less frequently if performance becomes an issue
-                                # For now, commit after each update.
-                                try:
-                                    db.commit()
-                                    db.refresh(db_npc_template)
-                                    logger.debug(
-                                        f"Updated token counts for NPC '{db_npc_template.name}': Total={db_npc_template.total_tokens_used}, Today={db_npc_template.tokens_used_today}"
-                                    )
-                                except Exception as e_commit:
-                                    logger.error(
-                                        f"Error committing token updates for NPC {db_npc_template.name}: {e_commit}"
-                                    )
-                                    db.rollback()
-                            else:
-                                logger.warning(
-                                    f"Could not find NPC template with tag '{npc_template_obj.unique_name_tag}' in DB to update token counts."
-                                )
-
-                        if (
-                            dialogue_line
-                            and dialogue_line
-                            != f"{npc_template_obj.name} stands here silently."
-                            and dialogue_line
-                            != f"{npc_template_obj.name} seems to be thinking, but says nothing."
-                            and dialogue_line
-                            != f"{npc_template_obj.name} clears their throat but says nothing."
-                        ):
-                            logger.debug(
-                                f"Dialogue Ticker: Broadcasting for NPC '{npc_template_obj.name}': '{dialogue_line}' to room {room.id}"
-                            )
-                            await broadcast_say_to_room(
-                                db=db,  # db session is available here
-                                speaker_name=npc_template_obj.name,
-                                room_id=room.id,
-                                message=dialogue_line,
-                            )
-                            _last_spoken_times[npc_template_obj.unique_name_tag] = (
-                                current_time_loop
-                            )
-                            logger.debug(
-                                f"Dialogue Ticker: Updated last_spoken_time for NPC '{npc_template_obj.name}' to {current_time_loop}"
-                            )
-                        else:
-                            logger.debug(
-                                f"Dialogue Ticker: NPC '{npc_template_obj.name}' produced no speakable dialogue or a silent message. Not broadcasting."
-                            )
+            with _cycle_seconds.time():
+                await run_dialogue_cycle(provider)
 
         except asyncio.CancelledError:
             logger.info("Dialogue Ticker: Task cancelled.")
@@ -345,7 +383,6 @@ async def dialogue_ticker_loop():
 
 
 def start_dialogue_ticker_task():
-    # ... (this function is unchanged) ...
     global _dialogue_ticker_task
     if _dialogue_ticker_task is None or _dialogue_ticker_task.done():
         logger.info("Dialogue Ticker: Attempting to start task...")
@@ -354,9 +391,12 @@ def start_dialogue_ticker_task():
 
 
 def stop_dialogue_ticker_task():
-    # ... (this function is unchanged) ...
     global _dialogue_ticker_task
+    global _refill_task
     if _dialogue_ticker_task and not _dialogue_ticker_task.done():
         _dialogue_ticker_task.cancel()
         logger.info("Dialogue Ticker: Task cancellation requested.")
     _dialogue_ticker_task = None
+    if _refill_task and not _refill_task.done():
+        _refill_task.cancel()
+    _refill_task = None
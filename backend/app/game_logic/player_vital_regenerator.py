@@ -1,105 +1,121 @@
 # backend/app/game_logic/player_vital_regenerator.py (NEW FILE)
 import math
+import uuid
+from typing import Any, Dict, List
 
-from app import crud
+from app import models
+from app.db.async_db import run_db
 from app.game_logic import combat  # To check if player is in combat
 from app.game_state import is_character_resting, set_character_resting_status
+from app.services.character_state import character_state
 from app.websocket_manager import connection_manager as ws_manager
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 
 async def regenerate_player_vitals_task(db: Session):
     """
-    Handles natural and resting HP/MP regeneration for all connected players.
+    Handles natural and resting HP/MP regeneration for all connected players
+    in one pass: a single SELECT of the online, out-of-combat characters' maxima
+    and stats, HP/MP applied to the write-behind store, and vitals frames only
+    for players whose values changed.
     """
-    connected_player_ids = ws_manager.get_all_active_player_ids()
-
-    for player_id in connected_player_ids:
-        character_id = ws_manager.get_character_id(player_id)
-        if not character_id:
+    character_to_player: Dict[uuid.UUID, uuid.UUID] = {
+        character_id: player_id
+        for player_id, character_id in ws_manager.player_active_characters.items()
+        if character_id and character_id not in combat.active_combats
+    }
+    if not character_to_player:
+        return
+
+    # Current HP/MP of online characters live in character_state, not in the row,
+    # so only the (cold) maxima and stats come from the DB.
+    regen_candidates = select(
+        models.Character.id,
+        models.Character.current_health,
+        models.Character.max_health,
+        models.Character.current_mana,
+        models.Character.max_mana,
+        models.Character.constitution,
+        models.Character.wisdom,
+    ).where(models.Character.id.in_(character_to_player.keys()))
+    # Runs on the DB thread pool so the tick doesn't stall the event loop.
+    rows = await run_db(lambda: db.execute(regen_candidates).all())
+    if not rows:
+        return
+
+    updates: List[Dict[str, Any]] = []
+    for char_id, hp, max_hp, mp, max_mp, constitution, wisdom in rows:
+        held = character_state.get(char_id)
+        if held is not None:
+            hp, mp = held["current_health"], held["current_mana"]
+        if hp <= 0:  # Dead characters don't regenerate
             continue
-
-        character = crud.crud_character.get_character(db, character_id=character_id)
-        if not character or character.current_health <= 0:  # Dead or invalid
+        if hp >= max_hp and mp >= max_mp:
             continue
-
-        # Skip regeneration if character is in combat
-        if character.id in combat.active_combats:
-            continue
-
-        hp_to_regen = 0
-        mp_to_regen = 0
-
-        # Store pre-regen values to check if an update is needed
-        old_hp = character.current_health
-        old_mp = character.current_mana
-
-        if is_character_resting(character.id):
+        if is_character_resting(char_id):
             # Resting regeneration: full HP/MP in ~3 minutes (180s). Tick interval 10s -> 18 ticks.
-            hp_to_regen = math.ceil(character.max_health / 18)
-            mp_to_regen = math.ceil(character.max_mana / 18)
+            hp_to_regen = math.ceil(max_hp / 18)
+            mp_to_regen = math.ceil(max_mp / 18)
         else:
-            # Natural passive regeneration
-            con_mod = character.get_attribute_modifier("constitution")
-            wis_mod = character.get_attribute_modifier("wisdom")
-
-            # Regenerate ~1% of max + stat modifier, min 1.
-            hp_to_regen = max(1, math.floor(character.max_health * 0.01) + con_mod)
-            mp_to_regen = max(1, math.floor(character.max_mana * 0.01) + wis_mod)
-
-        # Apply HP regeneration
-        if character.current_health < character.max_health:
-            character.current_health = min(
-                character.max_health, character.current_health + hp_to_regen
-            )
+            # Natural passive regeneration: ~1% of max + stat modifier, min 1.
+            modifier = models.Character.attribute_modifier_for_score
+            hp_to_regen = max(1, math.floor(max_hp * 0.01) + modifier(constitution))
+            mp_to_regen = max(1, math.floor(max_mp * 0.01) + modifier(wisdom))
+
+        new_hp = min(max_hp, hp + hp_to_regen) if hp < max_hp else hp
+        new_mp = min(max_mp, mp + mp_to_regen) if mp < max_mp else mp
+        if new_hp == hp and new_mp == mp:
+            continue
+        updates.append(
+            {
+                "id": char_id,
+                "current_health": new_hp,
+                "current_mana": new_mp,
+                "max_health": max_hp,
+                "max_mana": max_mp,
+            }
+        )
 
-        # Apply MP regeneration
-        if character.current_mana < character.max_mana:
-            character.current_mana = min(
-                character.max_mana, character.current_mana + mp_to_regen
-            )
+    if not updates:
+        return
 
-        vitals_changed = (character.current_health != old_hp) or (
-            character.current_mana != old_mp
+    # Online characters are written behind by the flusher; anything not (yet) tracked,
+    # e.g. mid-connect, goes straight to the DB in one bulk UPDATE by primary key.
+    untracked = [
+        {"id": u["id"], "current_health": u["current_health"], "current_mana": u["current_mana"]}
+        for u in updates
+        if not character_state.update(
+            u["id"], current_health=u["current_health"], current_mana=u["current_mana"]
+        )
+    ]
+    if untracked:
+        await run_db(db.execute, update(models.Character), untracked)
+
+    for u in updates:
+        player_id = character_to_player[u["id"]]
+        # Only the regen fields can have changed; send_vitals drops anything the client already has.
+        await ws_manager.send_vitals(
+            player_id,
+            {
+                "current_hp": u["current_health"],
+                "max_hp": u["max_health"],
+                "current_mp": u["current_mana"],
+                "max_mp": u["max_mana"],
+            },
         )
 
         if (
-            vitals_changed
-        ):  # Or always send vitals even if only XP changed if we separate XP updates
-            db.add(character)
-
-            xp_for_next_level = crud.crud_character.get_xp_for_level(
-                character.level + 1
+            is_character_resting(u["id"])
+            and u["current_health"] == u["max_health"]
+            and u["current_mana"] == u["max_mana"]
+        ):
+            set_character_resting_status(u["id"], False)
+            await ws_manager.send_personal_message(
+                {
+                    "type": "game_event",
+                    "message": "You feel fully rested and refreshed.",
+                },
+                player_id,
             )
-
-            vitals_payload = {
-                "type": "vitals_update",
-                "current_hp": character.current_health,
-                "max_hp": character.max_health,
-                "current_mp": character.current_mana,
-                "max_mp": character.max_mana,
-                "current_xp": character.experience_points,  # <<< ADDED
-                "next_level_xp": (
-                    int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
-                ),  # <<< ADDED (-1 for max level)
-                "platinum": character.platinum_coins,  # <<< NEW
-                "gold": character.gold_coins,  # <<< NEW
-                "silver": character.silver_coins,  # <<< NEW
-                "copper": character.copper_coins,  # <<< NEW
-            }
-            await ws_manager.send_personal_message(vitals_payload, player_id)
-
-            if (
-                is_character_resting(character.id)
-                and character.current_health == character.max_health
-                and character.current_mana == character.max_mana
-            ):
-                set_character_resting_status(character.id, False)
-                await ws_manager.send_personal_message(
-                    {
-                        "type": "game_event",
-                        "message": "You feel fully rested and refreshed.",
-                    },
-                    player_id,
-                )
     # DB commit is handled by the world_ticker_loop.
@@ -0,0 +1,198 @@
+# backend/app/game_logic/respawn_scheduler.py
+import heapq
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, joinedload
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# How often the in-memory alive counts are reconciled against the DB with a single
+# GROUP BY. Guards against drift from rolled-back transactions.
+ALIVE_COUNT_RESYNC_INTERVAL_SECONDS = 300.0
+
+
+class SpawnDefinitionSnapshot(NamedTuple):
+    """The handful of spawn definition fields the respawner needs, detached from any session."""
+
+    id: uuid.UUID
+    definition_name: str
+    room_id: uuid.UUID
+    mob_template_id: uuid.UUID
+    mob_template_name: str
+    quantity_min: int
+    quantity_max: int
+    respawn_delay_seconds: int
+    is_active: bool
+
+
+class RespawnScheduler:
+    """
+    Min-heap of pending respawn timers keyed by due time, plus in-memory alive
+    counts per spawn definition.
+
+    Timers are persisted in MobSpawnDefinition.next_respawn_check_at so they
+    survive a restart; load() rebuilds the heap from that column.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, uuid.UUID]] = []
+        # def_id -> due timestamp. The heap may hold stale entries; this dict is authoritative.
+        self._due_at: Dict[uuid.UUID, float] = {}
+        self._alive_counts: Dict[uuid.UUID, int] = {}
+        self._definitions: Dict[uuid.UUID, SpawnDefinitionSnapshot] = {}
+        self._loaded = False
+        self._last_resync_at = 0.0
+
+    # --- Loading / Reconciliation ---
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, db: Session):
+        """(Re)builds definitions, alive counts and pending timers from the DB."""
+        definitions = (
+            db.query(models.MobSpawnDefinition)
+            .options(joinedload(models.MobSpawnDefinition.mob_template))
+            .all()
+        )
+        self._definitions = {}
+        self._heap = []
+        self._due_at = {}
+        for definition in definitions:
+            if not definition.mob_template:
+                logger.warning(
+                    f"RespawnScheduler: Definition '{definition.definition_name}' has no mob template. Ignoring."
+                )
+                continue
+            self._definitions[definition.id] = SpawnDefinitionSnapshot(
+                id=definition.id,
+                definition_name=definition.definition_name,
+                room_id=definition.room_id,
+                mob_template_id=definition.mob_template_id,
+                mob_template_name=definition.mob_template.name,
+                quantity_min=definition.quantity_min,
+                quantity_max=definition.quantity_max,
+                respawn_delay_seconds=definition.respawn_delay_seconds,
+                is_active=definition.is_active,
+            )
+            if definition.next_respawn_check_at is not None:
+                due_at = definition.next_respawn_check_at
+                if due_at.tzinfo is None:
+                    due_at = due_at.replace(tzinfo=timezone.utc)
+                self._push(definition.id, due_at.timestamp())
+
+        self.resync_alive_counts(db)
+        self._loaded = True
+        logger.info(
+            f"RespawnScheduler: Loaded {len(self._definitions)} spawn definitions, {len(self._due_at)} pending timers."
+        )
+
+    def ensure_loaded(self, db: Session):
+        if not self._loaded:
+            self.load(db)
+        elif time.time() - self._last_resync_at >= ALIVE_COUNT_RESYNC_INTERVAL_SECONDS:
+            self.resync_alive_counts(db)
+
+    def resync_alive_counts(self, db: Session):
+        rows = (
+            db.query(
+                models.RoomMobInstance.spawn_definition_id,
+                func.count(models.RoomMobInstance.id),
+            )
+            .filter(
+                models.RoomMobInstance.spawn_definition_id != None,
+                models.RoomMobInstance.current_health > 0,
+            )
+            .group_by(models.RoomMobInstance.spawn_definition_id)
+            .all()
+        )
+        self._alive_counts = {def_id: count for def_id, count in rows}
+        self._last_resync_at = time.time()
+
+    # --- Alive Count Bookkeeping ---
+
+    def get_definition(self, definition_id: uuid.UUID) -> Optional[SpawnDefinitionSnapshot]:
+        return self._definitions.get(definition_id)
+
+    def get_alive_count(self, definition_id: uuid.UUID) -> int:
+        return self._alive_counts.get(definition_id, 0)
+
+    def note_spawned(self, definition_id: uuid.UUID, count: int = 1):
+        if not self._loaded:
+            return  # load() will pick these up from the DB
+        self._alive_counts[definition_id] = self.get_alive_count(definition_id) + count
+
+    def note_removed(self, db: Session, definition_id: uuid.UUID):
+        """
+        Called whenever a spawned mob leaves the world. Starts a respawn timer if
+        the group has dropped below its minimum and no timer is pending.
+        The persisted timer is staged on `db`; the caller commits.
+        """
+        if not self._loaded:
+            self.load(db)
+        alive = max(0, self.get_alive_count(definition_id) - 1)
+        self._alive_counts[definition_id] = alive
+
+        spawn_def = self._definitions.get(definition_id)
+        if not spawn_def or alive >= spawn_def.quantity_min:
+            return
+        if definition_id in self._due_at:
+            logger.debug(
+                f"RespawnScheduler: Group '{spawn_def.definition_name}' already has a respawn timer pending."
+            )
+            return
+
+        due_at = time.time() + spawn_def.respawn_delay_seconds
+        logger.info(
+            f"RespawnScheduler: Group '{spawn_def.definition_name}' dropped below min ({alive} < {spawn_def.quantity_min}). Respawn due in {spawn_def.respawn_delay_seconds}s."
+        )
+        self._push(definition_id, due_at)
+        db.execute(
+            update(models.MobSpawnDefinition)
+            .where(models.MobSpawnDefinition.id == definition_id)
+            .values(
+                next_respawn_check_at=datetime.fromtimestamp(due_at, tz=timezone.utc)
+            )
+        )
+
+    # --- Timers ---
+
+    def _push(self, definition_id: uuid.UUID, due_at: float):
+        self._due_at[definition_id] = due_at
+        heapq.heappush(self._heap, (due_at, definition_id))
+
+    def pop_due(self, now: Optional[float] = None) -> List[SpawnDefinitionSnapshot]:
+        """Removes and returns every definition whose timer is due. Only touches the heap head."""
+        now = time.time() if now is None else now
+        due: List[SpawnDefinitionSnapshot] = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, definition_id = heapq.heappop(self._heap)
+            if self._due_at.get(definition_id) != due_at:
+                continue  # Stale entry, superseded or cancelled
+            del self._due_at[definition_id]
+            spawn_def = self._definitions.get(definition_id)
+            if spawn_def and spawn_def.is_active:
+                due.append(spawn_def)
+        return due
+
+    def clear_persisted_timers(self, db: Session, definition_ids: Iterable[uuid.UUID]):
+        ids = list(definition_ids)
+        if not ids:
+            return
+        db.execute(
+            update(models.MobSpawnDefinition)
+            .where(models.MobSpawnDefinition.id.in_(ids))
+            .values(next_respawn_check_at=None)
+        )
+
+
+# Global instance
+respawn_scheduler = RespawnScheduler()
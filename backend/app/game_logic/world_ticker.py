@@ -6,7 +6,11 @@ from contextlib import contextmanager
 from typing import Awaitable, Callable, Dict, Iterator, Optional
 
 # Import the session module itself to get access to the global engine
+from app.core.metrics import metrics
 from app.db import session as db_session
+from app.db.async_db import run_db, run_game_logic
+from app.db.query_budget import sample_query_budget
+from app.db.session_stats import set_db_tag
 from app.game_logic.mob_ai_ticker import (
     process_aggressive_mobs_task,
     process_roaming_mobs_task,
@@ -25,7 +29,23 @@ logger = logging.getLogger(__name__)
 WORLD_TICK_INTERVAL_SECONDS = 10.0
 PLAYER_AFK_TIMEOUT_SECONDS = 900.0  # 15 minutes
 
+_tick_seconds = metrics.histogram(
+    "llmud_world_tick_seconds", "Wall time of a whole world tick, commit included."
+)
+_task_seconds = metrics.histogram(
+    "llmud_world_tick_task_seconds", "Wall time of one world tick task.", ["task"]
+)
+_task_errors = metrics.counter(
+    "llmud_world_tick_task_errors_total", "World tick tasks that raised.", ["task"]
+)
+_tick_overruns = metrics.counter(
+    "llmud_world_tick_overruns_total", "World ticks that took longer than the tick interval."
+)
+
 # --- Task Registry ---
+# Tasks share the tick's session and run on the game logic thread (run_game_logic),
+# in turn with the WS command handlers and combat rounds whose state they update,
+# so their sync queries don't block the event loop.
 world_tick_tasks: Dict[str, Callable[[Session], Awaitable[None]]] = {}
 
 
@@ -119,20 +139,31 @@ async def world_ticker_loop():
                     )
                     await asyncio.sleep(WORLD_TICK_INTERVAL_SECONDS)
                     continue
+                # The connection is held for the whole tick; queries are tagged per task below.
+                db.info["db_tag"] = "ticker:world"
 
                 # Create a list of tasks to run to avoid issues if tasks modify the registry
                 tasks_to_run = list(world_tick_tasks.items())
                 for task_name, task_func in tasks_to_run:
+                    db_tag = f"ticker:world:{task_name}"
+                    set_db_tag(db_tag)
+                    task_started = time.perf_counter()
                     try:
-                        await task_func(db)
+                        with sample_query_budget(db_tag):
+                            await run_game_logic(task_func, db)
                     except Exception as e:
+                        _task_errors.labels(task=task_name).inc()
                         logger.error(
                             f"ERROR in world_tick task '{task_name}': {e}",
                             exc_info=True,
                         )
+                    _task_seconds.labels(task=task_name).observe(
+                        time.perf_counter() - task_started
+                    )
 
                 # Commit the transaction after all tasks in the tick have run.
-                db.commit()
+                set_db_tag("ticker:world")
+                await run_db(db.commit)
         except Exception as e:
             logger.critical(
                 f"CRITICAL ERROR in world_ticker_loop's DB session management: {e}",
@@ -141,9 +172,11 @@ async def world_ticker_loop():
 
         end_time = time.time()
         processing_time = end_time - start_time
+        _tick_seconds.observe(processing_time)
 
         sleep_duration = WORLD_TICK_INTERVAL_SECONDS - processing_time
         if sleep_duration < 0:
+            _tick_overruns.inc()
             logger.warning(
                 f"World tick processing time ({processing_time:.2f}s) exceeded interval ({WORLD_TICK_INTERVAL_SECONDS}s)."
             )
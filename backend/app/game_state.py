@@ -1,5 +1,4 @@
 # backend/app/game_state.py
-import datetime
 import uuid
 from typing import Dict
 
@@ -8,7 +7,6 @@ active_game_sessions: Dict[uuid.UUID, uuid.UUID] = {}
 
 # Character ID -> Resting Status (True if resting)
 character_resting_status: Dict[uuid.UUID, bool] = {}
-mob_group_death_timestamps: Dict[uuid.UUID, datetime.datetime] = {}
 
 
 def is_character_resting(character_id: uuid.UUID) -> bool:
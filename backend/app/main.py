@@ -6,6 +6,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 # --- Setup Logging First ---
 # This is correctly placed at the top.
@@ -24,30 +25,82 @@ except ImportError as e_log_setup:
 logger = logging.getLogger(__name__)
 
 from app.api.v1.api_router import api_router as v1_api_router
+from app.api.v1.endpoints.command import get_command_registry
 
 # --- Module Imports ---
 # These are now just declarations; they don't *do* anything on import anymore.
 from app.core.config import settings
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import CONTENT_TYPE_LATEST, metrics
+from app.core.security import password_hash_pool, warm_auth_libraries
+from app.core.warmup import WarmupStep, warmup
 from app.crud.crud_character_class import seed_initial_character_class_templates
 from app.crud.crud_item import seed_initial_items
-from app.crud.crud_mob import seed_initial_mob_templates
-from app.crud.crud_mob_spawn_definition import seed_initial_mob_spawn_definitions
+from app.crud.crud_mob import seed_initial_mob_templates, warm_spawn_caches
+from app.crud.crud_mob_spawn_definition import (
+    bootstrap_mob_populations,
+    seed_initial_mob_spawn_definitions,
+)
 from app.crud.crud_npc import seed_initial_npc_templates
-from app.crud.crud_room import seed_initial_world
+from app.crud.crud_room import preload_world, seed_initial_world
 from app.crud.crud_skill import seed_initial_skill_templates
 from app.crud.crud_trait import seed_initial_trait_templates
 from app.db import base_class
 from app.db import session as db_session  # <-- Import the session module itself
+from app.db.async_db import shutdown_db_executor, shutdown_game_thread
+from app.db.seeding import Seeder, run_seeders
+from app.db.session_stats import DbTagMiddleware, set_db_tag
 from app.game_logic.combat.combat_ticker import (
     start_combat_ticker_task,
     stop_combat_ticker_task,
 )
+from app.game_logic.combat.combat_utils import get_loot_tables
+from app.game_logic.npc_catalog import npc_catalog
 from app.game_logic.npc_dialogue_ticker import (
     start_dialogue_ticker_task,
     stop_dialogue_ticker_task,
 )
+from app.game_logic.respawn_scheduler import respawn_scheduler
 from app.game_logic.world_ticker import start_world_ticker_task, stop_world_ticker_task
+from app.services.character_state import character_state
+from app.services.chat_manager import chat_manager
+from app.services.chat_history import chat_history
+from app.websocket_manager import WHO_LIST_VERSION_HEADER
 from app.websocket_router import router as ws_router
+from app.websocket_router import warm_connect_path
+
+
+# Startup seeders, each with the seed files it reads and the seeders whose rows it uses.
+# Those without a dependency between them may run at the same time. Only the seed files
+# are hashed: bump a seeder's version when its code changes how it applies them.
+SEEDERS = (
+    Seeder("items", seed_initial_items, ("items.json",)),
+    Seeder("world", seed_initial_world, ("rooms_z0.json", "exits_z0.json"), after=("items",)),
+    Seeder("mob_templates", seed_initial_mob_templates, ("mob_templates.json",)),
+    Seeder("npc_templates", seed_initial_npc_templates, ("npcs.json",)),
+    Seeder("character_classes", seed_initial_character_class_templates, ("character_classes.json",)),
+    Seeder("skills", seed_initial_skill_templates, ("skills.json",)),
+    Seeder("traits", seed_initial_trait_templates, ("traits.json",)),
+    Seeder(
+        "mob_spawn_definitions",
+        seed_initial_mob_spawn_definitions,
+        ("mob_spawn_definitions.json",),
+        after=("world", "mob_templates"),
+    ),
+)
+
+# Warm-up after startup, in order. Each step fills what its first use would fill anyway.
+WARMUP_STEPS = (
+    WarmupStep("db_pool", lambda db: db_session.prime_pool(db.get_bind())),
+    WarmupStep("auth_libraries", lambda db: warm_auth_libraries()),
+    WarmupStep("command_registry", lambda db: len(get_command_registry())),
+    WarmupStep("chat_channels", lambda db: len(chat_manager.channels)),
+    WarmupStep("loot_tables", lambda db: len(get_loot_tables())),
+    WarmupStep("npc_catalog", npc_catalog.load),
+    WarmupStep("mob_catalog", warm_spawn_caches),
+    WarmupStep("world", preload_world),
+    WarmupStep("connect_path", warm_connect_path),
+)
 
 
 # --- THE NEW LIFESPAN MANAGER ---
@@ -55,6 +108,8 @@ from app.websocket_router import router as ws_router
 async def lifespan(app: FastAPI):
     # --- STARTUP ---
     logger.info("--- Application Startup Initiated ---")
+    set_db_tag("startup")
+    loop_monitor.start()  # First, so slow startup work (seeding) is attributed too
 
     # 1. Initialize Database Engine
     logger.info("Initializing database engine...")
@@ -76,23 +131,25 @@ async def lifespan(app: FastAPI):
         logger.critical(f"Error creating database tables: {e}", exc_info=True)
         sys.exit(1)
 
-    # 3. Seed Initial Data
+    # 3. Seed Initial Data (only the seeders whose files changed since they last ran)
     logger.info("Seeding initial data...")
+    try:
+        outcome = run_seeders(SEEDERS, force=settings.SEED_FORCE)
+        logger.info(f"All data seeding completed: {outcome}")
+    except Exception as e:
+        logger.error(f"Error during data seeding: {e}", exc_info=True)
+        # Decide if this is a critical failure that should stop startup
     with db_session.SessionLocal() as db:
         try:
-            # The order of seeding matters!
-            seed_initial_items(db)
-            seed_initial_world(db)
-            seed_initial_mob_templates(db)
-            seed_initial_npc_templates(db)
-            seed_initial_character_class_templates(db)
-            seed_initial_skill_templates(db)
-            seed_initial_trait_templates(db)
-            seed_initial_mob_spawn_definitions(db)
-            logger.info("All data seeding completed successfully.")
+            bootstrap_mob_populations(db)
+        except Exception as e:
+            logger.error(f"Error bootstrapping mob populations: {e}", exc_info=True)
+            db.rollback()
+        try:
+            # Rebuild pending respawn timers and alive counts from the seeded DB state.
+            respawn_scheduler.load(db)
         except Exception as e:
-            logger.error(f"Error during data seeding: {e}", exc_info=True)
-            # Decide if this is a critical failure that should stop startup
+            logger.error(f"Error loading respawn scheduler: {e}", exc_info=True)
         finally:
             db.close()  # Ensure the session from get_db is closed
 
@@ -101,17 +158,29 @@ async def lifespan(app: FastAPI):
     start_world_ticker_task()
     start_combat_ticker_task()
     start_dialogue_ticker_task()
+    chat_history.start_archiver_task()
+    character_state.start_flusher_task()
     logger.info("All background tasks started.")
 
+    # 5. Warm caches and pools in the background; /readyz reports it and answers 200 when done.
+    warmup.start(WARMUP_STEPS)
+
     logger.info("--- Application Startup Complete ---")
 
     yield  # The application is now running and accepting requests
 
     # --- SHUTDOWN ---
     logger.info("--- Application Shutdown Initiated ---")
+    await warmup.stop()
     stop_dialogue_ticker_task()
     stop_combat_ticker_task()
     stop_world_ticker_task()
+    await shutdown_game_thread()  # Lets a tick or command already handed over finish
+    await chat_history.stop_archiver_task()  # Flushes any chat lines not yet archived
+    await character_state.stop_flusher_task()  # Writes back online characters' hot state
+    password_hash_pool.shutdown()
+    shutdown_db_executor()
+    loop_monitor.stop()
     logger.info("Background tasks stopped.")
 
     if db_session.engine:
@@ -137,7 +206,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[WHO_LIST_VERSION_HEADER],
 )
+app.add_middleware(DbTagMiddleware)
 
 # --- ROUTERS ---
 app.include_router(v1_api_router, prefix=settings.API_V1_STR)
@@ -154,4 +225,31 @@ async def root():
     }
 
 
+
+# --- HEALTH ---
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and its event loop answers. 200 even while warming up."""
+    report = warmup.report()
+    return {
+        "status": "ok",
+        "warmup": report["status"],
+        "steps_done": report["steps_done"],
+        "steps_total": report["steps_total"],
+    }
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: 200 once the warm-up has finished, 503 with each step's progress until then."""
+    return JSONResponse(warmup.report(), status_code=200 if warmup.ready else 503)
+
+
+# --- METRICS ---
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Tick timings, combat, connection and message counters in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 logger.info("--- main.py configuration complete. Application is ready to run. ---")
@@ -11,6 +11,7 @@ from .player import Player
 from .room import Room, RoomTypeEnum
 from .room_item_instance import RoomItemInstance
 from .room_mob_instance import RoomMobInstance
+from .seed_checksum import SeedChecksum
 from .skill_template import SkillTemplate
 from .trait_template import TraitTemplate
 
@@ -27,6 +28,7 @@ __all__ = [
     "RoomItemInstance",
     "RoomMobInstance",
     "RoomTypeEnum",
+    "SeedChecksum",
     "SkillTemplate",
     "TraitTemplate",
 ]
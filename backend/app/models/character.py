@@ -135,12 +135,17 @@ class Character(Base):
         back_populates="character", cascade="all, delete-orphan"
     )
 
+    @staticmethod
+    def attribute_modifier_for_score(score: int) -> int:
+        """The D&D-style modifier for an attribute score; usable without a loaded Character."""
+        return (score - 10) // 2
+
     def get_attribute_modifier(self, attribute_name: str) -> int:
         """Calculates the D&D-style modifier for a given attribute."""
         score = getattr(
             self, attribute_name, 10
         )  # Default to 10 if attribute somehow not found
-        return (score - 10) // 2
+        return self.attribute_modifier_for_score(score)
 
     def get_equipped_items_by_slot(self, slot_key: str) -> List["CharacterInventoryItem"]:  # type: ignore
         """Returns a list of items equipped in the specified slot."""
@@ -0,0 +1,22 @@
+# backend/app/models/seed_checksum.py
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.base_class import Base
+
+
+class SeedChecksum(Base):
+    """The content hash each seeder last applied successfully (app.db.seeding)."""
+
+    __tablename__ = "seed_checksums"
+
+    seeder: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    applied_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<SeedChecksum(seeder='{self.seeder}', sha256='{self.sha256[:12]}')>"
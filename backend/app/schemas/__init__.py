@@ -42,6 +42,7 @@ from .player import Player, PlayerCreate
 from .room import RoomCreate, RoomInDB, RoomUpdate
 from .skill import SkillTemplate, SkillTemplateCreate, SkillTemplateUpdate
 from .trait import TraitTemplate, TraitTemplateCreate, TraitTemplateUpdate
+from .vitals import CharacterVitals, VitalsDelta
 from .who import WhoListEntry
 
 __all__ = [
@@ -58,6 +59,7 @@ __all__ = [
     "CharacterInventoryItemBase",
     "CharacterInventoryItemCreate",
     "CharacterInventoryItemUpdate",
+    "CharacterVitals",
     "ChatChannel",
     "CommandRequest",
     "CommandResponse",
@@ -92,5 +94,6 @@ __all__ = [
     "TraitTemplate",
     "TraitTemplateCreate",
     "TraitTemplateUpdate",
+    "VitalsDelta",
     "WhoListEntry",
 ]
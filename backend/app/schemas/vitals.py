@@ -0,0 +1,53 @@
+# backend/app/schemas/vitals.py
+"""
+Vitals wire contract between the backend and the frontend.
+
+Full snapshot (every field present):
+  - `welcome_package.character_vitals`
+  - `{"type": "vitals_update", ...CharacterVitals}`, sent as a periodic full
+    resync (at most every VITALS_FULL_RESYNC_INTERVAL_SECONDS per connection).
+
+Delta (only the fields that changed since the last frame sent to that connection):
+  - `{"type": "vitals_delta", ...VitalsDelta}`
+  - `combat_update.character_vitals` (null when nothing changed)
+
+The client merges both shapes into its vitals state field by field
+(`gameStore.setVitals`), so a delta never clears a field it omits.
+`next_level_xp` is -1 at max level.
+"""
+from typing import Optional
+
+from pydantic import BaseModel
+
+VITALS_FULL_RESYNC_INTERVAL_SECONDS = 60.0
+
+
+class CharacterVitals(BaseModel):
+    current_hp: int
+    max_hp: int
+    current_mp: int
+    max_mp: int
+    current_xp: int
+    next_level_xp: int
+    level: int
+    platinum: int
+    gold: int
+    silver: int
+    copper: int
+
+
+class VitalsDelta(BaseModel):
+    current_hp: Optional[int] = None
+    max_hp: Optional[int] = None
+    current_mp: Optional[int] = None
+    max_mp: Optional[int] = None
+    current_xp: Optional[int] = None
+    next_level_xp: Optional[int] = None
+    level: Optional[int] = None
+    platinum: Optional[int] = None
+    gold: Optional[int] = None
+    silver: Optional[int] = None
+    copper: Optional[int] = None
+
+
+VITALS_FIELDS = tuple(CharacterVitals.model_fields.keys())
@@ -0,0 +1,366 @@
+# backend/app/services/character_state.py
+"""
+Write-behind persistence for online characters' hot state: HP, MP, XP, coins and room.
+
+These columns change on nearly every command, combat round and regen tick. While a
+character is online the copy held here is authoritative, and the database catches up
+in one batched UPDATE every CHARACTER_FLUSH_INTERVAL_SECONDS.
+
+Nothing on the command path has to know about it. Two ORM hooks do the work:
+
+- load/refresh: a Character row read from the database gets the in-memory values
+  laid over it, so every query that goes through the ORM sees current state.
+- before_flush: hot-field changes to tracked characters are taken out of the
+  flush and recorded here when the transaction commits (dropped if it rolls back).
+
+Crash-safety guarantees:
+
+1. A crash loses at most the last CHARACTER_FLUSH_INTERVAL_SECONDS (plus one flush)
+   of hot-field changes. Nothing else is written behind.
+2. No torn state. When a transaction also creates or deletes rows, changes
+   inventory or ground items, or changes any other column of the character, its
+   hot-field changes are written in that same transaction. So coins are never
+   saved without the item they bought, and XP never without the level it earned.
+3. Leaving the game (full_player_disconnect) flushes that character before it
+   stops being tracked. A clean shutdown flushes everything before the DB pool
+   closes.
+4. A failed flush keeps its rows dirty and retries on the next interval. Flushes
+   run one at a time, so an older snapshot never overwrites a newer one.
+
+Core statements (select()/update() on columns) bypass the ORM hooks. Code that reads
+or writes hot columns of online characters that way must use this store instead
+(see player_vital_regenerator and crud_character.get_characters_in_room).
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import models
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db import session as db_session
+from app.db.async_db import run_db
+
+logger = logging.getLogger(__name__)
+
+HOT_FIELDS = frozenset(
+    {
+        "current_health",
+        "current_mana",
+        "experience_points",
+        "platinum_coins",
+        "gold_coins",
+        "silver_coins",
+        "copper_coins",
+        "current_room_id",
+    }
+)
+# Changes to these rows in the same flush must land together with the hot fields.
+_WRITTEN_WITH_HOT_STATE = (models.CharacterInventoryItem, models.RoomItemInstance)
+_PENDING_KEY = "_character_state_pending"
+
+_flush_seconds = metrics.histogram(
+    "llmud_character_state_flush_seconds", "Wall time of one write-behind flush of character state."
+)
+_rows_flushed = metrics.counter(
+    "llmud_character_state_rows_flushed_total", "Character rows written by the write-behind flusher."
+)
+_flush_errors = metrics.counter(
+    "llmud_character_state_flush_errors_total", "Write-behind flushes that failed and will be retried."
+)
+
+
+@dataclass
+class _Entry:
+    values: Dict[str, Any]
+    dirty: Set[str] = field(default_factory=set)
+    # Set on disconnect; the entry is dropped once nothing is left to write.
+    released: bool = False
+
+
+def _changed_keys(character: models.Character) -> Set[str]:
+    state = inspect(character)
+    return {key for key in state.committed_state if state.attrs[key].history.has_changes()}
+
+
+class CharacterStateStore:
+    def __init__(self):
+        self._entries: Dict[uuid.UUID, _Entry] = {}
+        # Session hooks run on DB threads; the flusher and regen run on the loop.
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None  # Created on the serving loop
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flush_count = 0
+        self.rows_written = 0
+        self.last_flush_ms = 0.0
+
+    # --- Tracking ---
+
+    def track(self, character: models.Character):
+        """Starts holding this character's hot state. Values already held win over the row."""
+        # Read before locking: an expired attribute reloads, and the refresh hook takes the lock.
+        values = {key: getattr(character, key) for key in HOT_FIELDS}
+        with self._lock:
+            entry = self._entries.get(character.id)
+            if entry is None:
+                self._entries[character.id] = _Entry(values)
+            else:
+                entry.released = False
+                for key, value in values.items():
+                    entry.values.setdefault(key, value)
+
+    async def release(self, character_id: uuid.UUID):
+        """Flushes the character now and stops tracking it (once nothing is left to write)."""
+        with self._lock:
+            entry = self._entries.get(character_id)
+            if entry is None:
+                return
+            entry.released = True
+        await self.flush([character_id])
+        with self._lock:
+            entry = self._entries.get(character_id)
+            if entry is not None and entry.released and not entry.dirty:
+                del self._entries[character_id]
+
+    def is_tracked(self, character_id: uuid.UUID) -> bool:
+        return character_id in self._entries
+
+    def get(self, character_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(character_id)
+            return dict(entry.values) if entry else None
+
+    def update(self, character_id: uuid.UUID, **values: Any) -> bool:
+        """Changes hot fields directly (no ORM object needed). False if the character isn't tracked."""
+        with self._lock:
+            entry = self._entries.get(character_id)
+            if entry is None:
+                return False
+            for key, value in values.items():
+                if key not in HOT_FIELDS:
+                    raise ValueError(f"{key} is not a write-behind field")
+                entry.values[key] = value
+                entry.dirty.add(key)
+            return True
+
+    def character_ids_in_room(self, room_id: uuid.UUID) -> List[uuid.UUID]:
+        with self._lock:
+            return [
+                character_id
+                for character_id, entry in self._entries.items()
+                if not entry.released and entry.values.get("current_room_id") == room_id
+            ]
+
+    def dirty_count(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if entry.dirty)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracked": len(self._entries),
+            "dirty": self.dirty_count(),
+            "flushes": self.flush_count,
+            "rows_written": self.rows_written,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "flush_interval_s": settings.CHARACTER_FLUSH_INTERVAL_SECONDS,
+        }
+
+    # --- ORM hooks ---
+
+    def install_events(self, session_factory):
+        event.listen(models.Character, "load", self._on_load)
+        event.listen(models.Character, "refresh", self._on_refresh)
+        event.listen(session_factory, "before_flush", self._on_before_flush)
+        event.listen(session_factory, "after_commit", self._on_after_commit)
+        event.listen(session_factory, "after_transaction_end", self._on_transaction_end)
+
+    def _overlay(self, character: models.Character, keys: Iterable[str], session):
+        with self._lock:
+            entry = self._entries.get(character.id)
+            if entry is None:
+                return
+            values = dict(entry.values)
+        # Changes this session staged (flushed, not yet committed) are newer still.
+        for character_id, hot, _ in session.info.get(_PENDING_KEY, ()):
+            if character_id == character.id:
+                values.update(hot)
+        for key in keys:
+            if key in values:
+                set_committed_value(character, key, values[key])
+
+    def _on_load(self, character, context):
+        self._overlay(character, HOT_FIELDS, context.session)
+
+    def _on_refresh(self, character, context, attrs):
+        keys = HOT_FIELDS if attrs is None else HOT_FIELDS.intersection(attrs)
+        self._overlay(character, keys, context.session)
+
+    def _on_before_flush(self, session, flush_context, instances):
+        changes: List[Tuple[models.Character, Dict[str, Any]]] = []
+        write_through = (
+            bool(session.new or session.deleted) or settings.CHARACTER_FLUSH_INTERVAL_SECONDS <= 0
+        )
+        for obj in session.dirty:
+            if isinstance(obj, models.Character):
+                if obj.id not in self._entries:
+                    continue
+                changed = _changed_keys(obj)
+                if changed - HOT_FIELDS:
+                    write_through = True
+                hot = {key: getattr(obj, key) for key in changed & HOT_FIELDS}
+                if hot:
+                    changes.append((obj, hot))
+            elif isinstance(obj, _WRITTEN_WITH_HOT_STATE) and session.is_modified(obj):
+                write_through = True
+        if not changes:
+            return
+
+        pending = session.info.setdefault(_PENDING_KEY, [])
+        for character, hot in changes:
+            if not write_through:
+                # Marks the new values as already persisted, so this flush leaves them out.
+                for key, value in hot.items():
+                    set_committed_value(character, key, value)
+            pending.append((character.id, hot, write_through))
+
+    def _on_after_commit(self, session):
+        pending = session.info.pop(_PENDING_KEY, None)
+        if not pending:
+            return
+        with self._lock:
+            for character_id, hot, written in pending:
+                entry = self._entries.get(character_id)
+                if entry is None:
+                    if written:
+                        continue
+                    # Released between flush and commit: keep the change until the flusher writes it.
+                    entry = self._entries[character_id] = _Entry({}, released=True)
+                entry.values.update(hot)
+                if written:
+                    entry.dirty.difference_update(hot)
+                else:
+                    entry.dirty.update(hot)
+
+    def _on_transaction_end(self, session, transaction):
+        if transaction.parent is None:
+            # Rolled back (or closed) without committing: the staged changes never happened.
+            session.info.pop(_PENDING_KEY, None)
+
+    # --- Flushing ---
+
+    def _snapshot_dirty(self, character_ids: Optional[Iterable[uuid.UUID]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = self._entries.keys() if character_ids is None else character_ids
+            rows = []
+            for character_id in ids:
+                entry = self._entries.get(character_id)
+                if entry is not None and entry.dirty:
+                    # Only the dirty keys: the rest may be written through meanwhile.
+                    rows.append(
+                        {"id": character_id, **{key: entry.values[key] for key in entry.dirty}}
+                    )
+            return rows
+
+    @staticmethod
+    def _write_rows(rows: List[Dict[str, Any]]):
+        with db_session.SessionLocal(bind=db_session.engine) as db:
+            db.info["db_tag"] = "character_state:flush"
+            # ORM bulk UPDATE by primary key: one executemany for the whole batch.
+            db.execute(update(models.Character), rows)
+            db.commit()
+
+    def _mark_written(self, rows: List[Dict[str, Any]]):
+        with self._lock:
+            for row in rows:
+                entry = self._entries.get(row["id"])
+                if entry is None:
+                    continue
+                for key, value in row.items():
+                    if key == "id":
+                        continue
+                    # Anything changed since the snapshot -- including a newer value a
+                    # write-through commit put in the row before this write landed over
+                    # it -- is (again) dirty, so the next flush writes the current value.
+                    if entry.values.get(key) == value:
+                        entry.dirty.discard(key)
+                    else:
+                        entry.dirty.add(key)
+                if entry.released and not entry.dirty:
+                    del self._entries[row["id"]]
+
+    async def flush(self, character_ids: Optional[Iterable[uuid.UUID]] = None) -> int:
+        """Writes dirty hot state (all characters, or just these) in one batch. Returns rows written."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            rows = self._snapshot_dirty(character_ids)
+            if not rows:
+                return 0
+            started = time.perf_counter()
+            try:
+                await run_db(self._write_rows, rows)
+            except Exception as e:
+                _flush_errors.inc()
+                logger.error(f"CharacterState: Flush of {len(rows)} characters failed, will retry: {e}")
+                return 0
+            elapsed = time.perf_counter() - started
+            self._mark_written(rows)
+            self.flush_count += 1
+            self.rows_written += len(rows)
+            self.last_flush_ms = elapsed * 1000
+            _flush_seconds.observe(elapsed)
+            _rows_flushed.inc(len(rows))
+            return len(rows)
+
+    async def _flush_loop(self):
+        logger.info(
+            f"CharacterState: Flusher running every {settings.CHARACTER_FLUSH_INTERVAL_SECONDS}s."
+        )
+        try:
+            while True:
+                await asyncio.sleep(settings.CHARACTER_FLUSH_INTERVAL_SECONDS)
+                await self.flush()
+        except asyncio.CancelledError:
+            # Final flush so a clean shutdown loses nothing.
+            written = await self.flush()
+            logger.info(f"CharacterState: Flusher stopped after writing {written} final rows.")
+            raise
+
+    def start_flusher_task(self):
+        if settings.CHARACTER_FLUSH_INTERVAL_SECONDS <= 0:
+            logger.info("CharacterState: Write-behind disabled; character changes are written through.")
+            return
+        if (
+            self._flush_task is None
+            or self._flush_task.done()
+            # Left behind by an app instance on another loop (test clients)
+            or self._flush_task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop_flusher_task(self):
+        task, self._flush_task = self._flush_task, None
+        if task and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()  # Covers a flusher that never started or died
+
+
+# Global instance
+character_state = CharacterStateStore()
+character_state.install_events(db_session.SessionLocal)
+metrics.gauge(
+    "llmud_character_state_dirty",
+    "Online characters with hot state not yet written to the database.",
+    callback=character_state.dirty_count,
+)
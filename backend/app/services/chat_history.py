@@ -0,0 +1,207 @@
+# backend/app/services/chat_history.py
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.chat_manager import chat_manager
+
+logger = logging.getLogger(__name__)
+
+# Caps the memory a ring buffer can hold regardless of what players type.
+MAX_STORED_MESSAGE_LENGTH = 500
+ARCHIVE_FLUSH_INTERVAL_SECONDS = 5.0
+ARCHIVE_BATCH_SIZE = 200
+# If the disk can't keep up, the oldest unarchived lines are dropped rather than growing without bound.
+ARCHIVE_QUEUE_LIMIT = 5000
+
+
+class ChatHistoryEntry(NamedTuple):
+    ts: float
+    sender_name: str
+    message: str
+
+
+class ChatHistory:
+    """
+    Per-channel ring buffers of the last N chat messages, plus a batched
+    append-only JSONL archive written off the event loop.
+    """
+
+    def __init__(self, per_channel: int = 50):
+        self.per_channel = per_channel
+        self._buffers: Dict[str, Deque[ChatHistoryEntry]] = {}
+        self._archive_queue: Deque[Dict[str, Any]] = deque(maxlen=ARCHIVE_QUEUE_LIMIT)
+        self._archive_task: Optional[asyncio.Task] = None
+        self.archived_count = 0
+        self.archive_dropped_count = 0
+
+    # --- Recording ---
+
+    def record(self, channel_tag: str, sender_name: str, message: str):
+        entry = ChatHistoryEntry(
+            time.time(), sender_name, message[:MAX_STORED_MESSAGE_LENGTH]
+        )
+        buffer = self._buffers.get(channel_tag)
+        if buffer is None:
+            buffer = self._buffers[channel_tag] = deque(maxlen=self.per_channel)
+        buffer.append(entry)
+
+        if settings.CHAT_ARCHIVE_DIR:
+            if len(self._archive_queue) == self._archive_queue.maxlen:
+                self.archive_dropped_count += 1
+            self._archive_queue.append(
+                {"ts": entry.ts, "channel": channel_tag, "sender": sender_name, "message": entry.message}
+            )
+
+    def get_recent(self, channel_tag: str) -> List[ChatHistoryEntry]:
+        return list(self._buffers.get(channel_tag, ()))
+
+    # --- Catch-up ---
+
+    def build_catch_up_frame(
+        self, player_id: uuid.UUID, character_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        One compact frame with recent history for every channel the player is subscribed
+        to. Channel metadata is sent once per channel; each message is [ts, sender, text, is_self].
+        """
+        channels = []
+        for channel_tag in sorted(chat_manager.get_player_channels(player_id)):
+            entries = self._buffers.get(channel_tag)
+            channel = chat_manager.get_channel(channel_tag)
+            if not entries or not channel:
+                continue
+            channels.append(
+                {
+                    "channel_tag": channel_tag,
+                    "channel_display": channel.display_name,
+                    "style": channel.style,
+                    "messages": [
+                        [int(e.ts), e.sender_name, e.message, int(e.sender_name == character_name)]
+                        for e in entries
+                    ],
+                }
+            )
+        if not channels:
+            return None
+        return {"type": "chat_history", "channels": channels}
+
+    # --- Stats ---
+
+    def memory_usage_bytes(self) -> int:
+        """Approximate bytes held by the ring buffers (entries plus their strings)."""
+        total = 0
+        for buffer in self._buffers.values():
+            total += sys.getsizeof(buffer)
+            for entry in buffer:
+                total += (
+                    sys.getsizeof(entry)
+                    + sys.getsizeof(entry.sender_name)
+                    + sys.getsizeof(entry.message)
+                )
+        return total
+
+    def max_memory_bytes(self) -> int:
+        """Upper bound for the text held: channels x N x max message length (UCS-4 worst case)."""
+        return len(chat_manager.channels) * self.per_channel * MAX_STORED_MESSAGE_LENGTH * 4
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "messages_buffered": {tag: len(b) for tag, b in self._buffers.items()},
+            "per_channel_capacity": self.per_channel,
+            "memory_bytes": self.memory_usage_bytes(),
+            "memory_cap_bytes": self.max_memory_bytes(),
+            "archive_pending": len(self._archive_queue),
+            "archived": self.archived_count,
+            "archive_dropped": self.archive_dropped_count,
+        }
+
+    # --- Archiver ---
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        os.makedirs(settings.CHAT_ARCHIVE_DIR, exist_ok=True)
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        path = os.path.join(settings.CHAT_ARCHIVE_DIR, f"chat-{day}.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(line, ensure_ascii=False) + "\n" for line in batch)
+
+    async def flush_archive(self):
+        while self._archive_queue:
+            count = min(ARCHIVE_BATCH_SIZE, len(self._archive_queue))
+            batch = [self._archive_queue.popleft() for _ in range(count)]
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.archived_count += len(batch)
+            except Exception as e:
+                # Put the batch back for the next flush. Lines queued meanwhile may have
+                # filled the queue; the oldest that no longer fit are dropped, as in record.
+                room = self._archive_queue.maxlen - len(self._archive_queue)
+                keep = batch[-room:] if room > 0 else []
+                self._archive_queue.extendleft(reversed(keep))
+                self.archive_dropped_count += len(batch) - len(keep)
+                logger.error(
+                    f"ChatHistory: Failed to archive {len(batch)} messages, "
+                    f"{len(keep)} requeued: {e}"
+                )
+                return
+
+    async def _archive_loop(self):
+        logger.info("ChatHistory: Archiver loop starting.")
+        try:
+            while True:
+                await asyncio.sleep(ARCHIVE_FLUSH_INTERVAL_SECONDS)
+                if self._archive_queue:
+                    await self.flush_archive()
+                    logger.debug(
+                        f"ChatHistory: {self.archived_count} archived, {self.archive_dropped_count} dropped. "
+                        f"Buffers hold ~{self.memory_usage_bytes()} bytes (cap ~{self.max_memory_bytes()})."
+                    )
+        except asyncio.CancelledError:
+            # Final flush so a clean shutdown loses nothing.
+            await self.flush_archive()
+            logger.info("ChatHistory: Archiver task cancelled.")
+            raise
+
+    def start_archiver_task(self):
+        if not settings.CHAT_ARCHIVE_DIR:
+            logger.info("ChatHistory: CHAT_ARCHIVE_DIR not set. Chat archiving disabled.")
+            return
+        if self._archive_task is None or self._archive_task.done():
+            self._archive_task = asyncio.create_task(self._archive_loop())
+
+    async def stop_archiver_task(self):
+        if self._archive_task and not self._archive_task.done():
+            self._archive_task.cancel()
+            try:
+                await self._archive_task
+            except asyncio.CancelledError:
+                pass
+        self._archive_task = None
+
+
+# Global instance
+chat_history = ChatHistory(per_channel=settings.CHAT_HISTORY_PER_CHANNEL)
+metrics.gauge(
+    "llmud_chat_history_bytes",
+    "Approximate bytes held by the chat history ring buffers.",
+    callback=chat_history.memory_usage_bytes,
+)
+metrics.gauge(
+    "llmud_chat_archive_pending",
+    "Chat lines queued for the archive but not yet written.",
+    callback=lambda: len(chat_history._archive_queue),
+)
+metrics.gauge(
+    "llmud_chat_archive_dropped",
+    "Chat lines dropped because the archive queue was full or a write failed.",
+    callback=lambda: chat_history.archive_dropped_count,
+)
@@ -2,8 +2,11 @@
 import json
 import logging
 import os
+import threading
+import time
 import uuid
-from typing import Dict, Optional, Set
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
 
 # <<< IMPORT THE NEW SCHEMA >>>
 from app.schemas.chat import ChatChannel
@@ -12,6 +15,44 @@ from pydantic import ValidationError
 logger = logging.getLogger(__name__)
 SEEDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "seeds")
 
+# Rate limits for subscription channels. A single sender gets a small burst; the
+# channel as a whole is capped so many senders together can't flood the event loop.
+SENDER_MESSAGES_PER_WINDOW = 5
+SENDER_WINDOW_SECONDS = 5.0
+CHANNEL_MESSAGES_PER_SECOND = 20
+RATE_WINDOW_SECONDS = 1.0
+
+
+class ChannelStats:
+    """Per-channel counters, plus a rolling one-second window for messages/sec."""
+
+    def __init__(self):
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.deliveries = 0
+        self._recent: Deque[float] = deque()
+
+    def _trim(self, now: float):
+        while self._recent and now - self._recent[0] > RATE_WINDOW_SECONDS:
+            self._recent.popleft()
+
+    def messages_per_second(self, now: Optional[float] = None) -> int:
+        self._trim(time.monotonic() if now is None else now)
+        return len(self._recent)
+
+    def record_sent(self, now: float, recipients: int):
+        self._recent.append(now)
+        self.messages_sent += 1
+        self.deliveries += recipients
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "deliveries": self.deliveries,
+            "messages_per_second": self.messages_per_second(),
+        }
+
 
 class ChatManager:
     _instance = None
@@ -27,12 +68,49 @@ class ChatManager:
             return
         logger.info("Initializing ChatManager singleton...")
         # <<< THE TYPE HINT IS NOW OUR BEAUTIFUL PYDANTIC MODEL >>>
-        self.channels: Dict[str, ChatChannel] = {}
-        self.command_to_channel_map: Dict[str, str] = {}
-        self.subscriptions: Dict[str, Set[uuid.UUID]] = {}
-        self._load_channels()
+        self._channels: Dict[str, ChatChannel] = {}
+        self._command_to_channel_map: Dict[str, str] = {}
+        self._subscriptions: Dict[str, Set[uuid.UUID]] = {}
+        # player_id -> channel tags, so disconnect cleanup only touches the player's own channels
+        self.player_channels: Dict[uuid.UUID, Set[str]] = {}
+        self._channel_stats: Dict[str, ChannelStats] = {}
+        # (player_id, channel_tag) -> timestamps of that sender's recent messages
+        self._sender_history: Dict[Tuple[uuid.UUID, str], Deque[float]] = {}
+        # chat_channels.json is read by load_channels (main.lifespan), not on import.
+        self._channels_loaded = False
+        self._load_lock = threading.Lock()
         self._initialized = True
 
+    # Everything keyed by channel comes from chat_channels.json; the first access loads it.
+    @property
+    def channels(self) -> Dict[str, ChatChannel]:
+        self.load_channels()
+        return self._channels
+
+    @property
+    def command_to_channel_map(self) -> Dict[str, str]:
+        self.load_channels()
+        return self._command_to_channel_map
+
+    @property
+    def subscriptions(self) -> Dict[str, Set[uuid.UUID]]:
+        self.load_channels()
+        return self._subscriptions
+
+    @property
+    def channel_stats(self) -> Dict[str, ChannelStats]:
+        self.load_channels()
+        return self._channel_stats
+
+    def load_channels(self):
+        """Reads chat_channels.json once. Later calls return immediately."""
+        if self._channels_loaded:
+            return
+        with self._load_lock:
+            if not self._channels_loaded:
+                self._load_channels()
+                self._channels_loaded = True
+
     def _load_channels(self):
         filepath = os.path.join(SEEDS_DIR, "chat_channels.json")
         try:
@@ -45,10 +123,11 @@ class ChatManager:
                         channel = ChatChannel(**channel_data)
 
                         tag = channel.channel_id_tag
-                        self.channels[tag] = channel
-                        self.subscriptions[tag] = set()
+                        self._channels[tag] = channel
+                        self._subscriptions[tag] = set()
+                        self._channel_stats[tag] = ChannelStats()
                         for alias in channel.command_aliases:
-                            self.command_to_channel_map[alias.lower()] = tag
+                            self._command_to_channel_map[alias.lower()] = tag
 
                     except ValidationError as e:
                         logger.error(
@@ -56,7 +135,7 @@ class ChatManager:
                         )
                         continue  # Skip the malformed channel
 
-                logger.info(f"ChatManager: Loaded {len(self.channels)} valid channels.")
+                logger.info(f"ChatManager: Loaded {len(self._channels)} valid channels.")
         except Exception as e:
             logger.error(
                 f"ChatManager: FATAL error loading or parsing chat_channels.json: {e}",
@@ -67,26 +146,99 @@ class ChatManager:
         tag = self.command_to_channel_map.get(command.lower())
         return self.channels.get(tag) if tag else None
 
+    def get_channel(self, channel_tag: str) -> Optional[ChatChannel]:
+        return self.channels.get(channel_tag)
+
+    def find_channel(self, name: str) -> Optional[ChatChannel]:
+        """Resolves a channel by tag, display name or any of its command aliases."""
+        name = name.lower()
+        if name in self.channels:
+            return self.channels[name]
+        for channel in self.channels.values():
+            if channel.display_name.lower() == name:
+                return channel
+        return self.get_channel_by_command(name)
+
+    @staticmethod
+    def is_subscribable(channel: ChatChannel) -> bool:
+        # Private channels (tells) are addressed directly and have no subscribers.
+        return channel.access_type in ("public", "permissioned")
+
+    @staticmethod
+    def player_can_access(channel: ChatChannel, player: Any) -> bool:
+        if channel.access_type != "permissioned":
+            return True
+        required_perm = channel.required_permission
+        return bool(required_perm and getattr(player, required_perm, False))
+
     def subscribe_player(self, player_id: uuid.UUID, channel_tag: str):
         if channel_tag in self.subscriptions:
             self.subscriptions[channel_tag].add(player_id)
+            self.player_channels.setdefault(player_id, set()).add(channel_tag)
             logger.debug(f"Player {player_id} subscribed to channel '{channel_tag}'.")
 
     def unsubscribe_player(self, player_id: uuid.UUID, channel_tag: str):
         if channel_tag in self.subscriptions:
             self.subscriptions[channel_tag].discard(player_id)
+            self.player_channels.get(player_id, set()).discard(channel_tag)
             logger.debug(
                 f"Player {player_id} unsubscribed from channel '{channel_tag}'."
             )
 
+    def subscribe_player_to_default_channels(self, player_id: uuid.UUID, player: Any):
+        """On connect: every subscription channel the player is allowed on."""
+        for tag, channel in self.channels.items():
+            if self.is_subscribable(channel) and self.player_can_access(channel, player):
+                self.subscribe_player(player_id, tag)
+
     def unsubscribe_player_from_all(self, player_id: uuid.UUID):
-        for channel_tag in self.subscriptions:
+        for channel_tag in self.player_channels.pop(player_id, set()):
             self.subscriptions[channel_tag].discard(player_id)
+            self._sender_history.pop((player_id, channel_tag), None)
         logger.info(f"Player {player_id} unsubscribed from all chat channels.")
 
     def get_subscribers(self, channel_tag: str) -> Set[uuid.UUID]:
         return self.subscriptions.get(channel_tag, set())
 
+    def is_subscribed(self, player_id: uuid.UUID, channel_tag: str) -> bool:
+        return channel_tag in self.player_channels.get(player_id, ())
+
+    def get_player_channels(self, player_id: uuid.UUID) -> Set[str]:
+        return self.player_channels.get(player_id, set())
+
+    # --- Rate Limiting & Stats ---
+
+    def check_rate_limit(self, player_id: uuid.UUID, channel_tag: str) -> Optional[str]:
+        """
+        Returns None if the message may be sent (and records it against the sender),
+        otherwise a reason for the sender. Counts drops in the channel stats.
+        """
+        now = time.monotonic()
+        stats = self.channel_stats.setdefault(channel_tag, ChannelStats())
+        if stats.messages_per_second(now) >= CHANNEL_MESSAGES_PER_SECOND:
+            stats.messages_dropped += 1
+            return "The channel is too busy right now. Try again in a moment."
+
+        history = self._sender_history.setdefault((player_id, channel_tag), deque())
+        while history and now - history[0] > SENDER_WINDOW_SECONDS:
+            history.popleft()
+        if len(history) >= SENDER_MESSAGES_PER_WINDOW:
+            stats.messages_dropped += 1
+            return "You are sending messages too quickly. Slow down."
+        history.append(now)
+        return None
+
+    def record_message(self, channel_tag: str, recipients: int):
+        self.channel_stats.setdefault(channel_tag, ChannelStats()).record_sent(
+            time.monotonic(), recipients
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            tag: {**stats.as_dict(), "subscribers": len(self.subscriptions.get(tag, ()))}
+            for tag, stats in self.channel_stats.items()
+        }
+
 
 # Global singleton instance of the Chat Manager
 chat_manager = ChatManager()
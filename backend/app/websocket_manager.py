@@ -1,23 +1,76 @@
 # backend/app/websocket_manager.py
+import asyncio
+import bisect
+import json
 import logging
 import time
 import uuid
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
 
 from fastapi import WebSocket
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
 from app import crud
+from app.core.metrics import metrics
 
 # We need access to the database to find out where characters are.
-from app.db.session import SessionLocal
+from app.db import session as db_session
+from app.db.async_db import (
+    on_game_thread,
+    run_game_logic,
+    run_in_session,
+    run_on_serving_loop,
+    serving_loop,
+)
+from app.db.unit_of_work import current_unit_of_work
 from app.game_state import is_character_resting, set_character_resting_status
+from app.schemas.vitals import VITALS_FIELDS, VITALS_FULL_RESYNC_INTERVAL_SECONDS
+from app.services.character_state import character_state
+from app.services.chat_manager import chat_manager
 
 # Import combat_state_manager locally to avoid circular import
 # from app.game_logic.combat.combat_state_manager import end_combat_for_character
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Who-list changes within this window go out as one versioned diff.
+WHO_LIST_DEBOUNCE_SECONDS = 0.5
+WHO_LIST_VERSION_HEADER = "X-Who-List-Version"
+# Session.info key for who-list entries waiting on that session's commit
+_WHO_INDEX_PENDING_KEY = "_who_index_pending"
+
+
+class OnlineCharacter(NamedTuple):
+    """What the who list, tells and name lookups need about an online character."""
+
+    character_id: uuid.UUID
+    player_id: uuid.UUID
+    name: str
+    class_name: Optional[str]
+    level: int
+    experience_points: int
+
+    def as_who_entry(self) -> Dict[str, Any]:
+        """The WhoListEntry fields, as sent by /who_list and in who_list_updated diffs."""
+        return {
+            "name": self.name,
+            "class_name": self.class_name,
+            "level": self.level,
+            "experience_points": self.experience_points,
+        }
+
+
+_messages_sent = metrics.counter(
+    "llmud_ws_messages_sent_total", "WebSocket frames sent to players.", ["kind"]
+)
+_send_errors = metrics.counter(
+    "llmud_ws_send_errors_total", "WebSocket sends that raised.", ["kind"]
+)
+
 
 class ConnectionManager:
     def __init__(self):
@@ -28,26 +81,49 @@ class ConnectionManager:
         # character_id -> room_id mapping (CACHE)
         self.character_locations: Dict[uuid.UUID, uuid.UUID] = {}
         self.player_last_seen: Dict[uuid.UUID, float] = {}
+        # player_id -> vitals as last sent to that connection, for delta frames
+        self.last_sent_vitals: Dict[uuid.UUID, Dict[str, Any]] = {}
+        self.last_full_vitals_at: Dict[uuid.UUID, float] = {}
+        # lowercased name -> online character, kept in step with connect/disconnect
+        self.online_characters_by_name: Dict[str, OnlineCharacter] = {}
+        # The same keys, sorted, for prefix lookups
+        self._sorted_online_names: List[str] = []
+        self._online_name_keys: Dict[uuid.UUID, str] = {}  # character_id -> key
+        # Who list as of the last who_list_updated broadcast, and its version
+        self.who_list_version = 0
+        self._who_list_published: Dict[str, OnlineCharacter] = {}
+        self._who_list_flush_task: Optional[asyncio.Task] = None
+        # The serving loop, for index updates from commits made on DB threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def connect(
         self, websocket: WebSocket, player_id: uuid.UUID, character_id: uuid.UUID
     ):
         await websocket.accept()
+        self._loop = asyncio.get_running_loop()
         self.active_player_connections[player_id] = websocket
+        previous_character_id = self.player_active_characters.get(player_id)
+        if previous_character_id:
+            self._unindex_online_character(previous_character_id)
         self.player_active_characters[player_id] = character_id
         self.player_last_seen[player_id] = time.time()
 
-        # Initialize character_location cache on connect
-        with SessionLocal() as db:  # Use context manager for session
-            character = crud.crud_character.get_character(db, character_id=character_id)
-            if character:
-                self.character_locations[character_id] = character.current_room_id
-
-        # Broadcast that the who list might have changed
-        await self.broadcast({"type": "who_list_updated"})
-        logger.info(
-            f"Player {player_id} (Char: {character_id}) connected. Broadcasted who_list_updated."
+        # Initialize character_location cache on connect (owner is eager-loaded with the character)
+        character = await run_in_session(
+            crud.crud_character.get_character, character_id=character_id
         )
+        if character:
+            # From here on the character's HP/MP/XP/coins/room are held in memory (write-behind)
+            character_state.track(character)
+            self.character_locations[character_id] = character.current_room_id
+            self.index_online_character(character)
+            chat_manager.subscribe_player_to_default_channels(
+                player_id, character.owner
+            )
+
+        # The who list changed; clients hear about it in the next coalesced diff
+        self.schedule_who_list_update()
+        logger.info(f"Player {player_id} (Char: {character_id}) connected.")
 
     def update_last_seen(self, player_id: uuid.UUID):
         self.player_last_seen[player_id] = time.time()
@@ -60,7 +136,11 @@ class ConnectionManager:
         )
         if character_id_to_remove_from_locations:
             self.character_locations.pop(character_id_to_remove_from_locations, None)
+            self._unindex_online_character(character_id_to_remove_from_locations)
         self.player_last_seen.pop(player_id, None)
+        chat_manager.unsubscribe_player_from_all(player_id)
+        self.last_sent_vitals.pop(player_id, None)
+        self.last_full_vitals_at.pop(player_id, None)
         logger.info(f"Player {player_id} shallow disconnected.")
 
     def get_character_id(self, player_id: uuid.UUID) -> Optional[uuid.UUID]:
@@ -102,14 +182,133 @@ class ConnectionManager:
     def is_player_connected(self, player_id: uuid.UUID) -> bool:
         return player_id in self.active_player_connections
 
+    # --- Online Character Index ---
+
+    @staticmethod
+    def _online_entry(character) -> OnlineCharacter:
+        return OnlineCharacter(
+            character_id=character.id,
+            player_id=character.player_id,
+            name=character.name,
+            class_name=character.class_name,
+            level=character.level,
+            experience_points=character.experience_points,
+        )
+
+    def index_online_character(self, character):
+        """Adds or refreshes a character's entry from a committed (or freshly loaded) row."""
+        self._index_entry(self._online_entry(character))
+
+    def index_online_character_on_commit(self, db: Session, character):
+        """
+        Like index_online_character, for level/XP changes staged on db: the entry is
+        refreshed once db's transaction commits, and never if it rolls back.
+        """
+        db.info.setdefault(_WHO_INDEX_PENDING_KEY, {})[character.id] = self._online_entry(character)
+
+    def _index_entry(self, entry: OnlineCharacter):
+        if self.player_active_characters.get(entry.player_id) != entry.character_id:
+            return  # Not this player's active character, so not online
+        key = entry.name.lower()
+        if key not in self.online_characters_by_name:
+            bisect.insort(self._sorted_online_names, key)
+        self._online_name_keys[entry.character_id] = key
+        self.online_characters_by_name[key] = entry
+
+    def install_events(self, session_factory):
+        event.listen(session_factory, "after_commit", self._on_after_commit)
+        event.listen(session_factory, "after_transaction_end", self._on_transaction_end)
+
+    def _on_after_commit(self, session):
+        pending = session.info.pop(_WHO_INDEX_PENDING_KEY, None)
+        if not pending:
+            return
+        entries = list(pending.values())
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False  # Committed on a DB thread
+        if on_loop or self._loop is None or not self._loop.is_running():
+            for entry in entries:
+                self._index_entry(entry)
+        else:
+            # The index belongs to the serving loop. Committed on a DB thread, the
+            # caller resumes after this runs; on the game logic thread, it runs next.
+            for entry in entries:
+                self._loop.call_soon_threadsafe(self._index_entry, entry)
+
+    @staticmethod
+    def _on_transaction_end(session, transaction):
+        if transaction.parent is None:
+            # Rolled back (or closed) without committing: the staged changes never happened.
+            session.info.pop(_WHO_INDEX_PENDING_KEY, None)
+
+    def _unindex_online_character(self, character_id: uuid.UUID):
+        key = self._online_name_keys.pop(character_id, None)
+        if key is None:
+            return
+        del self.online_characters_by_name[key]
+        del self._sorted_online_names[bisect.bisect_left(self._sorted_online_names, key)]
+
+    def get_online_character_by_name(self, name: str) -> Optional[OnlineCharacter]:
+        """Case-insensitive exact match among online characters."""
+        return self.online_characters_by_name.get(name.lower())
+
+    def find_online_characters_by_prefix(
+        self, prefix: str, limit: int = 10
+    ) -> List[OnlineCharacter]:
+        """Online characters whose name starts with `prefix` (case-insensitive), in name order."""
+        prefix = prefix.lower()
+        matches: List[OnlineCharacter] = []
+        index = bisect.bisect_left(self._sorted_online_names, prefix)
+        while index < len(self._sorted_online_names) and len(matches) < limit:
+            key = self._sorted_online_names[index]
+            if not key.startswith(prefix):
+                break
+            matches.append(self.online_characters_by_name[key])
+            index += 1
+        return matches
+
+    def resolve_online_character(self, name: str) -> Optional[OnlineCharacter]:
+        """Exact name first, then a prefix that matches exactly one online character."""
+        online = self.get_online_character_by_name(name)
+        if online or not name:
+            return online
+        matches = self.find_online_characters_by_prefix(name, limit=2)
+        return matches[0] if len(matches) == 1 else None
+
+    def get_online_characters(self) -> List[OnlineCharacter]:
+        """All online characters, sorted by name."""
+        return [self.online_characters_by_name[key] for key in self._sorted_online_names]
+
+    @staticmethod
+    async def _send_elsewhere(send, *args) -> bool:
+        """
+        Inside a WS command's unit of work, frames wait for its commit (see
+        app.db.unit_of_work) so nothing is acknowledged that didn't persist. Frames
+        from the game logic thread are sent by the serving loop, which owns the
+        sockets. Returns False when the caller should send right here.
+        """
+        uow = current_unit_of_work()
+        if uow is not None and uow.hold(send, *args):
+            return True
+        if not on_game_thread():
+            return False
+        await run_on_serving_loop(send, *args)
+        return True
+
     async def send_personal_message(self, message_payload: dict, player_id: uuid.UUID):
+        if await self._send_elsewhere(self.send_personal_message, message_payload, player_id):
+            return
         if player_id in self.active_player_connections:
             websocket = self.active_player_connections[player_id]
             try:
                 # Ensure the payload is JSON serializable (Pydantic models are via .model_dump())
                 encoded_payload = jsonable_encoder(message_payload)
                 await websocket.send_json(encoded_payload)
+                _messages_sent.labels(kind="personal").inc()
             except Exception as e:
+                _send_errors.labels(kind="personal").inc()
                 logger.error(
                     f"Error sending personal WS message to {player_id}: {e}",
                     exc_info=True,
@@ -119,8 +318,60 @@ class ConnectionManager:
                 f"Attempted to send personal message to disconnected player {player_id}"
             )
 
+    # --- Vitals Delta Tracking (see schemas/vitals.py) ---
+
+    def remember_full_vitals(self, player_id: uuid.UUID, vitals: Dict[str, Any]):
+        """Records a full snapshot that was sent by other means (e.g. the welcome package)."""
+        self.last_sent_vitals[player_id] = dict(vitals)
+        self.last_full_vitals_at[player_id] = time.time()
+
+    def diff_vitals(
+        self, player_id: uuid.UUID, vitals: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Returns the fields of `vitals` that differ from what this connection last
+        received, and records them as sent. `vitals` may be partial. A complete
+        snapshot is returned whole when the connection has no baseline yet or its
+        periodic full resync is due.
+        """
+        is_full_snapshot = all(field in vitals for field in VITALS_FIELDS)
+        last_sent = self.last_sent_vitals.get(player_id)
+        if is_full_snapshot and (
+            last_sent is None
+            or time.time() - self.last_full_vitals_at.get(player_id, 0.0)
+            >= VITALS_FULL_RESYNC_INTERVAL_SECONDS
+        ):
+            self.remember_full_vitals(player_id, vitals)
+            return dict(vitals)
+
+        if last_sent is None:
+            last_sent = self.last_sent_vitals[player_id] = {}
+        changed = {
+            field: value
+            for field, value in vitals.items()
+            if field in VITALS_FIELDS and last_sent.get(field, _MISSING) != value
+        }
+        last_sent.update(changed)
+        return changed
+
+    async def send_vitals(self, player_id: uuid.UUID, vitals: Dict[str, Any]):
+        """Sends a vitals_update (full resync) or vitals_delta frame, or nothing if unchanged."""
+        if await self._send_elsewhere(self.send_vitals, player_id, vitals):
+            return
+        if player_id not in self.active_player_connections:
+            return
+        changed = self.diff_vitals(player_id, vitals)
+        if not changed:
+            return
+        frame_type = (
+            "vitals_update" if len(changed) == len(VITALS_FIELDS) else "vitals_delta"
+        )
+        await self.send_personal_message({"type": frame_type, **changed}, player_id)
+
     async def broadcast(self, message_payload: dict):
         """Sends a message to every single connected WebSocket client."""
+        if await self._send_elsewhere(self.broadcast, message_payload):
+            return
         logger.info(
             f"Broadcasting global message: {message_payload.get('message', 'No message content')}"
         )
@@ -129,13 +380,17 @@ class ConnectionManager:
         for connection in self.active_player_connections.values():
             try:
                 await connection.send_json(encoded_payload)
+                _messages_sent.labels(kind="broadcast").inc()
             except Exception as e:
+                _send_errors.labels(kind="broadcast").inc()
                 # Log the error but continue trying to send to others. One bad client shouldn't stop a broadcast.
                 logger.warning(f"Failed to broadcast to a client: {e}")
 
     async def broadcast_to_players(
         self, message_payload: dict, player_ids: List[uuid.UUID]
     ):
+        if await self._send_elsewhere(self.broadcast_to_players, message_payload, player_ids):
+            return
         if not player_ids:
             return
         encoded_payload = jsonable_encoder(message_payload)
@@ -144,7 +399,9 @@ class ConnectionManager:
                 websocket = self.active_player_connections[player_id]
                 try:
                     await websocket.send_json(encoded_payload)
+                    _messages_sent.labels(kind="group").inc()
                 except Exception as e:
+                    _send_errors.labels(kind="group").inc()
                     logger.error(
                         f"Error broadcasting WS message to {player_id}: {e}",
                         exc_info=True,
@@ -152,12 +409,48 @@ class ConnectionManager:
             # else:
             #     logger.debug(f"Broadcast: Player {player_id} not in active_player_connections. Skipping.")
 
+    @staticmethod
+    def encode_payload(message_payload: dict) -> str:
+        """Serializes once, the same way WebSocket.send_json would, for fan-out via send_encoded."""
+        return json.dumps(
+            jsonable_encoder(message_payload), separators=(",", ":"), ensure_ascii=False
+        )
+
+    async def send_encoded_to_players(
+        self, encoded_payload: str, player_ids: Iterable[uuid.UUID]
+    ) -> int:
+        """Fans a pre-encoded payload out to many players. Returns how many sends succeeded."""
+        if on_game_thread():
+            return await run_on_serving_loop(
+                self.send_encoded_to_players, encoded_payload, list(player_ids)
+            )
+        delivered = 0
+        for player_id in player_ids:
+            websocket = self.active_player_connections.get(player_id)
+            if websocket is None:
+                continue
+            try:
+                await websocket.send_text(encoded_payload)
+                delivered += 1
+            except Exception as e:
+                _send_errors.labels(kind="fanout").inc()
+                logger.error(
+                    f"Error sending encoded WS message to {player_id}: {e}",
+                    exc_info=True,
+                )
+        _messages_sent.labels(kind="fanout").inc(delivered)
+        return delivered
+
     async def broadcast_to_room(
         self,
         message_payload: dict,
         room_id: uuid.UUID,
         exclude_player_ids: Optional[List[uuid.UUID]] = None,
     ):
+        if await self._send_elsewhere(
+            self.broadcast_to_room, message_payload, room_id, exclude_player_ids
+        ):
+            return
         # This method now correctly finds players in the room using its own state
         player_ids_in_target_room = []
         for player_id, char_id in self.player_active_characters.items():
@@ -174,6 +467,11 @@ class ConnectionManager:
     ):
         from app.services.room_service import get_player_ids_in_room  # <<< LOCAL IMPORT
 
+        if on_game_thread():
+            # The socket and the write-back belong to the serving loop (e.g. the AFK check)
+            return await run_on_serving_loop(
+                self.full_player_disconnect, player_id, reason_key
+            )
         logger.info(
             f"Initiating full disconnect for player {player_id} due to: {reason_key}"
         )
@@ -184,55 +482,44 @@ class ConnectionManager:
                 f"Cannot perform full disconnect for player {player_id}: No active character found."
             )
             self.disconnect(player_id)  # Perform shallow disconnect anyway
-            # Broadcast who list update even if character details are murky, as a player did disconnect
-            await self.broadcast({"type": "who_list_updated"})
+            # Update the who list even if character details are murky, as a player did disconnect
+            self.schedule_who_list_update()
+            logger.info(f"Player {player_id} (no char_id found) disconnected.")
+            return
+
+        character = await run_in_session(
+            crud.crud_character.get_character, character_id=character_id
+        )
+        if not character:
+            logger.warning(
+                f"Cannot perform full disconnect for player {player_id}, char_id {character_id}: Character not found in DB."
+            )
+            self.disconnect(player_id)  # Perform shallow disconnect
+            self.schedule_who_list_update()
             logger.info(
-                f"Player {player_id} (no char_id found) disconnected. Broadcasted who_list_updated."
+                f"Player {player_id} (char_id {character_id} not in DB) disconnected."
             )
             return
 
-        with SessionLocal() as db:  # Use context manager for session
-            character = crud.crud_character.get_character(db, character_id=character_id)
-            if not character:
-                logger.warning(
-                    f"Cannot perform full disconnect for player {player_id}, char_id {character_id}: Character not found in DB."
-                )
-                self.disconnect(player_id)  # Perform shallow disconnect
-                # Broadcast who list update
-                await self.broadcast({"type": "who_list_updated"})
-                logger.info(
-                    f"Player {player_id} (char_id {character_id} not in DB) disconnected. Broadcasted who_list_updated."
-                )
-                return
+        # 1. Handle game state changes (combat, resting), in turn with the other game logic
+        await run_game_logic(self._leave_game_state, character.id, reason_key)
 
-            character.current_room_id
+        # 2. Announce departure to the room
+        reason_messages = {
+            "timeout": "fades away after a long period of inactivity.",
+            "logout": "has left the realm.",
+            "connection_lost": "has lost their connection.",
+        }
+        message = f"<span class='char-name'>{character.name}</span> {reason_messages.get(reason_key, 'vanishes.')}"
 
-            # 1. Handle game state changes (combat, resting)
-            # Local import to avoid circular dependency
-            from app.game_logic.combat.combat_state_manager import (
-                end_combat_for_character,
-            )
-
-            end_combat_for_character(character.id, reason=f"disconnect_{reason_key}")
-            if is_character_resting(character.id):
-                set_character_resting_status(character.id, False)
-
-            # 2. Announce departure to the room
-            reason_messages = {
-                "timeout": "fades away after a long period of inactivity.",
-                "logout": "has left the realm.",
-                "connection_lost": "has lost their connection.",
-            }
-            message = f"<span class='char-name'>{character.name}</span> {reason_messages.get(reason_key, 'vanishes.')}"
-
-            # Get players in the room (excluding the one disconnecting)
-            player_ids_in_room = get_player_ids_in_room(
-                db, character.current_room_id, exclude_player_ids=[player_id]
+        # Get players in the room (excluding the one disconnecting); served from the location cache
+        player_ids_in_room = get_player_ids_in_room(
+            None, character.current_room_id, exclude_player_ids=[player_id]
+        )
+        if player_ids_in_room:
+            await self.broadcast_to_players(
+                {"type": "game_event", "message": message}, player_ids_in_room
             )
-            if player_ids_in_room:
-                await self.broadcast_to_players(
-                    {"type": "game_event", "message": message}, player_ids_in_room
-                )
 
         # 3. Close the WebSocket connection if it's still open
         websocket = self.active_player_connections.get(player_id)
@@ -244,15 +531,87 @@ class ConnectionManager:
                     f"Exception while closing WebSocket for player {player_id}: {e}"
                 )
 
-        # 4. Perform the shallow disconnect to clean up manager state
+        # 4. Write back the character's hot state before it stops being tracked
+        await character_state.release(character.id)
+
+        # 5. Perform the shallow disconnect to clean up manager state
         self.disconnect(player_id)
 
-        # 5. Broadcast that the who list might have changed AFTER cleaning up internal state
-        await self.broadcast({"type": "who_list_updated"})
-        logger.info(
-            f"Full disconnect for player {player_id} complete. Broadcasted who_list_updated."
+        # 6. Schedule the who list diff AFTER cleaning up internal state
+        self.schedule_who_list_update()
+        logger.info(f"Full disconnect for player {player_id} complete.")
+
+    @staticmethod
+    async def _leave_game_state(character_id: uuid.UUID, reason_key: str):
+        # Local import to avoid circular dependency
+        from app.game_logic.combat.combat_state_manager import (
+            end_combat_for_character,
         )
 
+        end_combat_for_character(character_id, reason=f"disconnect_{reason_key}")
+        if is_character_resting(character_id):
+            set_character_resting_status(character_id, False)
+
+    # --- Who List Updates ---
+
+    def schedule_who_list_update(self):
+        """
+        Notes that the who list changed. All changes within WHO_LIST_DEBOUNCE_SECONDS
+        are broadcast together as one versioned who_list_updated diff.
+        """
+        if on_game_thread():
+            serving_loop().call_soon_threadsafe(self.schedule_who_list_update)
+            return
+        if self._who_list_flush_task is None or self._who_list_flush_task.done():
+            self._who_list_flush_task = asyncio.create_task(
+                self._flush_who_list_after_delay()
+            )
+
+    async def _flush_who_list_after_delay(self):
+        await asyncio.sleep(WHO_LIST_DEBOUNCE_SECONDS)
+        # Changes from here on schedule a new flush instead of being lost to this one.
+        self._who_list_flush_task = None
+        diff = self.build_who_list_diff()
+        if diff:
+            await self.broadcast(diff)
+            logger.debug(
+                f"Broadcasted who_list_updated v{diff['version']}: {len(diff['joined'])} joined, "
+                f"{len(diff['updated'])} updated, {len(diff['left'])} left."
+            )
+
+    def build_who_list_diff(self) -> Optional[Dict[str, Any]]:
+        """
+        Diffs the online index against the last published who list and bumps the version.
+        A client at version N can apply diff N+1 directly; on any gap it should refetch
+        /who_list, whose WHO_LIST_VERSION_HEADER gives the version it corresponds to.
+        Returns None if nothing visible changed (e.g. a quick reconnect).
+        """
+        current = dict(self.online_characters_by_name)
+        published = self._who_list_published
+        joined = [o for key, o in current.items() if key not in published]
+        updated = [
+            o for key, o in current.items() if key in published and published[key] != o
+        ]
+        left = [o.name for key, o in published.items() if key not in current]
+        if not (joined or updated or left):
+            return None
+        self._who_list_published = current
+        self.who_list_version += 1
+        return {
+            "type": "who_list_updated",
+            "version": self.who_list_version,
+            "joined": [o.as_who_entry() for o in joined],
+            "updated": [o.as_who_entry() for o in updated],
+            "left": left,
+        }
+
 
 # Global instance
 connection_manager = ConnectionManager()
+connection_manager.install_events(db_session.SessionLocal)
+
+metrics.gauge(
+    "llmud_ws_connections",
+    "Open player WebSocket connections.",
+    callback=lambda: len(connection_manager.active_player_connections),
+)
@@ -1,20 +1,29 @@
 # backend/app/websocket_router.py
 
 import logging
+import time
 import uuid
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.api.v1.endpoints.command import execute_command_logic
+from app.api.dependencies import get_principal_from_token
+from app.api.v1.endpoints.command import execute_command_logic, get_command_registry
 from app.commands.command_args import CommandContext
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.principal_cache import PlayerPrincipal, principal_cache
+from app.core.warmup import warmup
+from app.db.async_db import run_db, run_game_logic
+from app.db.query_budget import sample_query_budget
+from app.db.unit_of_work import unit_of_work
 from app.db.session import get_db  # <<< USE THE ONE TRUE DB GETTER
+from app.db.session_stats import set_db_tag
 from app.game_logic import combat
 from app.game_state import is_character_resting, set_character_resting_status
+from app.services.chat_history import chat_history
 from app.websocket_manager import connection_manager
 from app.ws_command_parsers import (
     handle_ws_attack,
@@ -35,23 +44,218 @@ from app.ws_command_parsers.ws_interaction_parser import (
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Verbs the WS loop handles itself; everything else goes to the command registry.
+COMBAT_VERBS = {"attack", "atk", "kill", "k", "flee"}
+MOVEMENT_VERBS = {
+    "n",
+    "north",
+    "s",
+    "south",
+    "e",
+    "east",
+    "w",
+    "west",
+    "u",
+    "up",
+    "d",
+    "down",
+    "go",
+}
+STATE_VERBS = {"rest"}
+SHOP_VERBS = {"list", "buy", "sell"}
+WS_NATIVE_VERBS = COMBAT_VERBS | MOVEMENT_VERBS | STATE_VERBS | SHOP_VERBS | {"use", "unlock"}
+
+_commands_total = metrics.counter(
+    "llmud_ws_commands_total", "Commands received over WebSockets.", ["verb"]
+)
+_command_seconds = metrics.histogram(
+    "llmud_ws_command_seconds", "Time from receiving a WS command to its commit.", ["verb"]
+)
+
+
+def _metric_verb(verb: str) -> str:
+    """Known verbs label their own series; typos and gibberish share one."""
+    return verb if verb in WS_NATIVE_VERBS or verb in get_command_registry() else "other"
+
 
 async def get_player_from_token(
     token: Optional[str], db: Session
-) -> Optional[models.Player]:
+) -> Optional[PlayerPrincipal]:
     if not token:
         return None
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    return await run_db(get_principal_from_token, token, db)  # Decodes and loads the player
+
+
+def _load_command_state(
+    db: Session, player_id: uuid.UUID, character_id: uuid.UUID
+) -> Tuple[
+    Optional[models.Player], Optional[models.Character], Optional[models.Room]
+]:
+    fresh_player = crud.crud_player.get_player(db, player_id=player_id)
+    character = crud.crud_character.get_character(db, character_id=character_id)
+    room = (
+        crud.crud_room.get_room_by_id(db, character.current_room_id)
+        if character
+        else None
+    )
+    return fresh_player, character, room
+
+
+def _load_welcome_room(
+    db: Session, room_id: uuid.UUID
+) -> Tuple[Optional[models.Room], Optional[schemas.RoomInDB]]:
+    room = crud.crud_room.get_room_by_id(db, room_id=room_id)
+    return room, schemas.RoomInDB.from_orm(room) if room else None
+
+
+async def _dispatch_command(
+    db: Session,
+    fresh_player: models.Player,
+    current_char_state: models.Character,
+    current_room_orm: models.Room,
+    command_text: str,
+) -> Optional[schemas.CommandResponse]:
+    """Runs one command's handler on the game logic thread; it only stages changes."""
+    verb = command_text.split(" ", 1)[0].lower()
+    args_list = command_text.split(" ", 1)[1].split() if " " in command_text else []
+    args_str = " ".join(args_list)
+    response: Optional[schemas.CommandResponse] = None
+
+    if (
+        verb
+        and verb not in ["rest", "look", "l"]
+        and is_character_resting(current_char_state.id)
+    ):
+        set_character_resting_status(current_char_state.id, False)
+        await combat.send_combat_log(fresh_player.id, ["You stop resting."])
+
+    if verb == "use":
+        # The 'use' command is special. Let a dedicated handler figure it out.
+        await handle_ws_use_item_or_skill(db, fresh_player, current_char_state, args_str)
+
+    elif verb in COMBAT_VERBS:
+        # Logic for other combat verbs remains
+        if verb in {"attack", "atk", "kill", "k"}:
+            await handle_ws_attack(
+                db,
+                fresh_player,
+                current_char_state,
+                current_room_orm,
+                args_str,
+            )
+        elif verb == "flee":
+            await handle_ws_flee(
+                db,
+                fresh_player,
+                current_char_state,
+                schemas.RoomInDB.from_orm(current_room_orm),
+                args_str,
+            )
+
+    elif verb in MOVEMENT_VERBS:
+        await handle_ws_movement(
+            db,
+            fresh_player,
+            current_char_state,
+            schemas.RoomInDB.from_orm(current_room_orm),
+            verb,
+            args_str,
         )
-        player_id_str: Optional[str] = payload.get("sub")
-        if not player_id_str:
-            return None
-        player_uuid = uuid.UUID(player_id_str)
-        return crud.crud_player.get_player(db, player_id=player_uuid)
-    except (JWTError, ValueError):
-        return None
+
+    elif verb in STATE_VERBS:
+        if verb == "rest":
+            await handle_ws_rest(db, fresh_player, current_char_state, current_room_orm)
+
+    elif verb in SHOP_VERBS:
+        if verb == "list":
+            await handle_ws_list(db, fresh_player, current_char_state, current_room_orm)
+        elif verb == "buy":
+            await handle_ws_buy(
+                db,
+                fresh_player,
+                current_char_state,
+                current_room_orm,
+                args_str,
+            )
+        elif verb == "sell":
+            await handle_ws_sell(
+                db,
+                fresh_player,
+                current_char_state,
+                current_room_orm,
+                args_str,
+            )
+
+    elif verb == "unlock":
+        # Handle the 'unlock' command
+        await handle_ws_unlock(
+            db,
+            fresh_player,
+            current_char_state,
+            current_room_orm,
+            args_list,
+        )
+
+    else:  # Fallback to the HTTP-style command processor for everything else (look, say, inv, etc.)
+        context = CommandContext(
+            db=db,
+            active_character=current_char_state,
+            current_room_orm=current_room_orm,
+            current_room_schema=schemas.RoomInDB.from_orm(current_room_orm),
+            original_command=command_text,
+            command_verb=verb,
+            args=args_list,
+        )
+        response = await execute_command_logic(context)
+        if response.special_payload:
+            await connection_manager.send_personal_message(
+                response.special_payload, fresh_player.id
+            )
+        if response.message_to_player:
+            log_payload = {
+                "type": "combat_update",
+                "log": [response.message_to_player],
+                "room_data": (
+                    response.room_data.model_dump(exclude_none=True)
+                    if response.room_data
+                    else None
+                ),
+                "combat_over": response.combat_over,
+            }
+            await connection_manager.send_personal_message(log_payload, fresh_player.id)
+    return response
+
+
+async def _push_inventory_update(db: Session, character_id: uuid.UUID):
+    refreshed_char_for_push = crud.crud_character.get_character(
+        db, character_id=character_id
+    )
+    if refreshed_char_for_push:
+        await _send_inventory_update_to_player(db, refreshed_char_for_push)
+
+
+def warm_connect_path(db: Session) -> int:
+    """
+    Warm-up: runs the reads of a connect and its first look once, for whichever
+    character comes first, so their statements are compiled and cached before a
+    real player's connect needs them. Returns how many characters it ran for.
+    """
+    first = db.query(models.Character.player_id, models.Character.id).first()
+    if first is None:
+        return 0
+    _, character, room = _load_command_state(db, first.player_id, first.id)
+    crud.crud_character.get_character_vitals(character)
+    if room is not None:
+        schemas.RoomInDB.from_orm(room).model_dump(exclude_none=True)
+        crud.crud_room_item.get_items_in_room(db, room_id=room.id)
+        crud.crud_mob.get_mobs_in_room(db, room_id=room.id)
+        crud.crud_character.get_characters_in_room(
+            db, room_id=room.id, exclude_character_id=character.id
+        )
+    return 1
 
 
 @router.websocket("/ws")
@@ -62,8 +266,13 @@ async def websocket_game_endpoint(
         ..., description="UUID of the character connecting"
     ),
 ):
-    player: Optional[models.Player] = None
+    player: Optional[PlayerPrincipal] = None
     character_orm: Optional[models.Character] = None
+    set_db_tag("ws:connect")
+
+    # Normally a load balancer holds players back until /readyz; this covers direct connects.
+    if not await warmup.wait_ready(settings.WARMUP_WS_WAIT_SECONDS):
+        logger.warning("WS Connect: Warm-up still running; serving this connection cold.")
 
     # Use the real get_db() dependency in a context manager
     with next(get_db()) as db_conn_init:
@@ -76,8 +285,8 @@ async def websocket_game_endpoint(
             )
             return
 
-        fetched_char = crud.crud_character.get_character(
-            db_conn_init, character_id=character_id
+        fetched_char = await run_db(
+            crud.crud_character.get_character, db_conn_init, character_id=character_id
         )
         if not fetched_char or fetched_char.player_id != player.id:
             logger.warning(
@@ -98,15 +307,12 @@ async def websocket_game_endpoint(
     initial_messages = [
         f"Welcome {character_orm.name}! You are connected via WebSocket."
     ]
-    initial_room_schema: Optional[schemas.RoomInDB] = None
     with next(get_db()) as db_welcome:
-        initial_room_orm = crud.crud_room.get_room_by_id(
-            db_welcome, room_id=character_orm.current_room_id
+        initial_room_orm, initial_room_schema = await run_db(
+            _load_welcome_room, db_welcome, character_orm.current_room_id
         )
-        if initial_room_orm:
-            initial_room_schema = schemas.RoomInDB.from_orm(initial_room_orm)
 
-    xp_for_next_level = crud.crud_character.get_xp_for_level(character_orm.level + 1)
+    welcome_vitals = crud.crud_character.get_character_vitals(character_orm)
     welcome_payload = {
         "type": "welcome_package",
         "log": initial_messages,
@@ -115,30 +321,22 @@ async def websocket_game_endpoint(
             if initial_room_schema
             else None
         ),
-        "character_vitals": {
-            "current_hp": character_orm.current_health,
-            "max_hp": character_orm.max_health,
-            "current_mp": character_orm.current_mana,
-            "max_mp": character_orm.max_mana,
-            "current_xp": character_orm.experience_points,
-            "next_level_xp": (
-                int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
-            ),
-            "level": character_orm.level,
-            "platinum": character_orm.platinum_coins,
-            "gold": character_orm.gold_coins,
-            "silver": character_orm.silver_coins,
-            "copper": character_orm.copper_coins,
-        },
+        "character_vitals": welcome_vitals,
         "hotbar": character_orm.hotbar or {str(i): None for i in range(1, 11)},
     }
     await connection_manager.send_personal_message(welcome_payload, player.id)
+    connection_manager.remember_full_vitals(player.id, welcome_vitals)
+
+    # Recent messages from every subscribed channel, in one frame.
+    chat_catch_up = chat_history.build_catch_up_frame(player.id, character_orm.name)
+    if chat_catch_up:
+        await connection_manager.send_personal_message(chat_catch_up, player.id)
 
     # Automatically send room description on initial connection
     with next(get_db()) as db_initial_look:
         if initial_room_orm:  # We already have this from earlier
-            await handle_ws_look(
-                db_initial_look, player, character_orm, initial_room_orm, ""
+            await run_game_logic(
+                handle_ws_look, db_initial_look, player, character_orm, initial_room_orm, ""
             )
 
     try:
@@ -149,13 +347,19 @@ async def websocket_game_endpoint(
 
             if not command_text:
                 continue
-
-            with next(get_db()) as db_loop:
-                fresh_player = crud.crud_player.get_player(db_loop, player_id=player.id)
-                current_char_state = crud.crud_character.get_character(
-                    db_loop, character_id=character_orm.id
+            command_started = time.perf_counter()
+            metric_verb = _metric_verb(command_text.split(" ", 1)[0].lower())
+            _commands_total.labels(verb=metric_verb).inc()
+            # From the bucketed verb: a tag per word the client types would grow without bound.
+            db_tag = f"ws:{metric_verb}"
+            set_db_tag(db_tag)
+
+            with next(get_db()) as db_loop, sample_query_budget(db_tag):
+                # The per-command state loads run on the DB thread pool, and the handler on
+                # the game logic thread: neither blocks the event loop.
+                fresh_player, current_char_state, current_room_orm = await run_db(
+                    _load_command_state, db_loop, player.id, character_orm.id
                 )
-                response: Optional[schemas.CommandResponse] = None
 
                 if not current_char_state or not fresh_player:
                     logger.error(
@@ -167,9 +371,6 @@ async def websocket_game_endpoint(
                     )
                     break
 
-                current_room_orm = crud.crud_room.get_room_by_id(
-                    db_loop, current_char_state.current_room_id
-                )
                 if not current_room_orm:
                     logger.error(
                         f"WS Loop: Character {current_char_state.name} in invalid room {current_char_state.current_room_id}."
@@ -179,194 +380,70 @@ async def websocket_game_endpoint(
                     )
                     continue
 
-                verb = command_text.split(" ", 1)[0].lower()
-                args_list = (
-                    command_text.split(" ", 1)[1].split() if " " in command_text else []
-                )
-                args_str = " ".join(args_list)
-
-                if (
-                    verb
-                    and verb not in ["rest", "look", "l"]
-                    and is_character_resting(current_char_state.id)
-                ):
-                    set_character_resting_status(current_char_state.id, False)
-                    await combat.send_combat_log(fresh_player.id, ["You stop resting."])
-
-                combat_verbs = {"attack", "atk", "kill", "k", "flee"}
-                movement_verbs = {
-                    "n",
-                    "north",
-                    "s",
-                    "south",
-                    "e",
-                    "east",
-                    "w",
-                    "west",
-                    "u",
-                    "up",
-                    "d",
-                    "down",
-                    "go",
-                }
-                state_verbs = {"rest"}
-                # interaction_verbs = {"use", "quaff", "drink"}
-                shop_verbs = {"list", "buy", "sell"}
-
-                if verb == "use":
-                    # The 'use' command is special. Let a dedicated handler figure it out.
-                    await handle_ws_use_item_or_skill(
-                        db_loop, fresh_player, current_char_state, args_str
-                    )
-
-                elif verb in combat_verbs:
-                    # Logic for other combat verbs remains
-                    if verb in {"attack", "atk", "kill", "k"}:
-                        await handle_ws_attack(
-                            db_loop,
-                            fresh_player,
-                            current_char_state,
-                            current_room_orm,
-                            args_str,
-                        )
-                    elif verb == "flee":
-                        await handle_ws_flee(
-                            db_loop,
-                            fresh_player,
-                            current_char_state,
-                            schemas.RoomInDB.from_orm(current_room_orm),
-                            args_str,
-                        )
-
-                elif verb in movement_verbs:
-                    await handle_ws_movement(
-                        db_loop,
-                        fresh_player,
-                        current_char_state,
-                        schemas.RoomInDB.from_orm(current_room_orm),
-                        verb,
-                        args_str,
-                    )
-
-                elif verb in state_verbs:
-                    if verb == "rest":
-                        await handle_ws_rest(
-                            db_loop, fresh_player, current_char_state, current_room_orm
-                        )
-
-                elif verb in shop_verbs:
-                    if verb == "list":
-                        await handle_ws_list(
-                            db_loop, fresh_player, current_char_state, current_room_orm
-                        )
-                    elif verb == "buy":
-                        await handle_ws_buy(
-                            db_loop,
-                            fresh_player,
-                            current_char_state,
-                            current_room_orm,
-                            args_str,
-                        )
-                    elif verb == "sell":
-                        await handle_ws_sell(
-                            db_loop,
-                            fresh_player,
-                            current_char_state,
-                            current_room_orm,
-                            args_str,
-                        )
-
-                elif verb == "unlock":
-                    # Handle the 'unlock' command
-                    await handle_ws_unlock(
+                # Handlers only stage changes; the one commit is here, and the frames
+                # they send are held until it succeeds (see app.db.unit_of_work).
+                with unit_of_work(db_loop) as uow:
+                    verb = command_text.split(" ", 1)[0].lower()
+                    response = await uow.run(
+                        _dispatch_command,
                         db_loop,
                         fresh_player,
                         current_char_state,
                         current_room_orm,
-                        args_list,
+                        command_text,
                     )
 
-                else:  # Fallback to the HTTP-style command processor for everything else (look, say, inv, etc.)
-                    context = CommandContext(
-                        db=db_loop,
-                        active_character=current_char_state,
-                        current_room_orm=current_room_orm,
-                        current_room_schema=schemas.RoomInDB.from_orm(current_room_orm),
-                        original_command=command_text,
-                        command_verb=verb,
-                        args=args_list,
-                    )
-                    response = await execute_command_logic(context)
-                    if response.special_payload:
-                        await connection_manager.send_personal_message(
-                            response.special_payload, fresh_player.id
-                        )
-                    if response.message_to_player:
-                        log_payload = {
-                            "type": "combat_update",
-                            "log": [response.message_to_player],
-                            "room_data": (
-                                response.room_data.model_dump(exclude_none=True)
-                                if response.room_data
-                                else None
-                            ),
-                            "combat_over": response.combat_over,
-                        }
-                        await connection_manager.send_personal_message(
-                            log_payload, fresh_player.id
+                    try:
+                        await uow.commit()
+                        logger.debug(
+                            f"WS Router: DB commit successful for command '{command_text}' by {character_orm.name}"
                         )
 
-                try:
-                    db_loop.commit()
-                    logger.debug(
-                        f"WS Router: DB commit successful for command '{command_text}' by {current_char_state.name}"
-                    )
+                        if response and response.location_update:
+                            update_info = response.location_update
+                            connection_manager.update_character_location(
+                                character_id=update_info.character_id,
+                                room_id=update_info.new_room_id,
+                            )
+                            logger.debug(
+                                f"Cache updated for {update_info.character_id} to room {update_info.new_room_id}"
+                            )
 
-                    if response and response.location_update:
-                        update_info = response.location_update
-                        connection_manager.update_character_location(
-                            character_id=update_info.character_id,
-                            room_id=update_info.new_room_id,
-                        )
-                        logger.debug(
-                            f"Cache updated for {update_info.character_id} to room {update_info.new_room_id}"
+                        # The rest of the post-commit logic
+                        inventory_modifying_verbs = [
+                            "giveme",
+                            "equip",
+                            "eq",
+                            "unequip",
+                            "uneq",
+                            "get",
+                            "take",
+                            "buy",
+                            "sell",
+                            "drop",
+                        ]
+                        if verb in inventory_modifying_verbs:
+                            await run_game_logic(
+                                _push_inventory_update, db_loop, character_orm.id
+                            )
+                    except Exception as e_commit:
+                        await uow.rollback()
+                        logger.error(
+                            f"WS Router: DB commit failed for command '{command_text}': {e_commit}",
+                            exc_info=True,
                         )
-
-                    # The rest of the post-commit logic
-                    inventory_modifying_verbs = [
-                        "giveme",
-                        "equip",
-                        "eq",
-                        "unequip",
-                        "uneq",
-                        "get",
-                        "take",
-                        "buy",
-                        "sell",
-                        "drop",
-                    ]
-                    if verb in inventory_modifying_verbs:
-                        refreshed_char_for_push = crud.crud_character.get_character(
-                            db_loop, character_id=current_char_state.id
+                        await combat.send_combat_log(
+                            fresh_player.id,
+                            [
+                                "A glitch in the matrix occurred. Your last action may not have saved."
+                            ],
                         )
-                        if refreshed_char_for_push:
-                            await _send_inventory_update_to_player(
-                                db_loop, refreshed_char_for_push
-                            )
-                except Exception as e_commit:
-                    db_loop.rollback()
-                    logger.error(
-                        f"WS Router: DB commit failed for command '{command_text}': {e_commit}",
-                        exc_info=True,
-                    )
-                    await combat.send_combat_log(
-                        fresh_player.id,
-                        [
-                            "A glitch in the matrix occurred. Your last action may not have saved."
-                        ],
-                    )
+            _command_seconds.labels(verb=metric_verb).observe(
+                time.perf_counter() - command_started
+            )
 
     except WebSocketDisconnect:
+        set_db_tag("ws:disconnect")
         logger.info(
             f"WebSocket disconnected for Player {player.id if player else 'N/A'}"
         )
@@ -119,8 +119,7 @@ async def handle_ws_brief(
     db: Session, player: models.Player, character: models.Character
 ):
     character.is_brief_mode = not character.is_brief_mode
-    db.add(character)
-    db.commit()  # Commit this simple change immediately
+    db.add(character)  # Staged; the WS loop commits
 
     mode = "ON" if character.is_brief_mode else "OFF"
     await combat.send_combat_log(player.id, [f"Brief mode is now {mode}."])
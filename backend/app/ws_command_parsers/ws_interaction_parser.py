@@ -234,33 +234,15 @@ async def _resolve_item_use(
         log_message = f"You drink the {item_template.name}. You feel a soothing warmth and regain {health_regained} health."
         await combat.send_combat_log(player.id, [log_message])
 
-        # The actions (healing, item removal) are staged. Now we commit.
-        db.commit()
-        # After commit, refresh the character object to get the latest state from the DB.
-        db.refresh(character)
+        # The actions (healing, item removal) are staged; the WS loop commits them.
+        db.flush()
 
         # Now, push the updates to the client.
         await _send_inventory_update_to_player(db, character)
 
-        xp_for_next_level = crud.crud_character.get_xp_for_level(character.level + 1)
-        vitals_payload = {
-            "type": "vitals_update",
-            "current_hp": character.current_health,
-            "max_hp": character.max_health,
-            "current_mp": character.current_mana,
-            "max_mp": character.max_mana,
-            "current_xp": character.experience_points,
-            "next_level_xp": (
-                int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
-            ),
-            "level": character.level,
-            "platinum": character.platinum_coins,
-            "gold": character.gold_coins,
-            "silver": character.silver_coins,
-            "copper": character.copper_coins,
-        }
-        await websocket_manager.connection_manager.send_personal_message(
-            vitals_payload, player.id
+        vitals_payload = crud.crud_character.get_character_vitals(character)
+        await websocket_manager.connection_manager.send_vitals(
+            player.id, vitals_payload
         )
 
     else:
@@ -380,7 +362,7 @@ async def handle_ws_get_take(
             return
 
         if anything_actually_picked_up:
-            db.commit()
+            db.flush()  # Staged; the WS loop commits
             await _send_inventory_update_to_player(
                 db, current_char_state
             )  # ### UPDATE PUSH ###
@@ -413,20 +395,7 @@ async def handle_ws_get_take(
         if not final_log_to_player:
             final_log_to_player.append("No items were picked up.")
 
-        xp_for_next = crud.crud_character.get_xp_for_level(current_char_state.level + 1)
-        vitals_payload = {
-            "current_hp": current_char_state.current_health,
-            "max_hp": current_char_state.max_health,
-            "current_mp": current_char_state.current_mana,
-            "max_mp": current_char_state.max_mana,
-            "current_xp": current_char_state.experience_points,
-            "next_level_xp": int(xp_for_next) if xp_for_next != float("inf") else -1,
-            "level": current_char_state.level,
-            "platinum": current_char_state.platinum_coins,
-            "gold": current_char_state.gold_coins,
-            "silver": current_char_state.silver_coins,
-            "copper": current_char_state.copper_coins,
-        }
+        vitals_payload = crud.crud_character.get_character_vitals(current_char_state)
         await combat.send_combat_log(
             player.id,
             final_log_to_player,
@@ -511,12 +480,11 @@ async def handle_ws_get_take(
     )
     final_pickup_message = add_message
 
-    db.commit()
+    db.flush()  # Staged; the WS loop commits
     await _send_inventory_update_to_player(
         db, current_char_state
     )  # ### UPDATE PUSH ###
 
-    db.refresh(current_char_state)
     refreshed_room_orm = crud.crud_room.get_room_by_id(db, current_room_orm.id)
 
     # ... (rest of the single 'get' response logic is unchanged) ...
@@ -529,20 +497,7 @@ async def handle_ws_get_take(
         updated_room_data_dict["description"] = updated_dynamic_desc
         updated_room_schema_for_response = schemas.RoomInDB(**updated_room_data_dict)
 
-    xp_for_next = crud.crud_character.get_xp_for_level(current_char_state.level + 1)
-    vitals_payload = {
-        "current_hp": current_char_state.current_health,
-        "max_hp": current_char_state.max_health,
-        "current_mp": current_char_state.current_mana,
-        "max_mp": current_char_state.max_mana,
-        "current_xp": current_char_state.experience_points,
-        "next_level_xp": int(xp_for_next) if xp_for_next != float("inf") else -1,
-        "level": current_char_state.level,
-        "platinum": current_char_state.platinum_coins,
-        "gold": current_char_state.gold_coins,
-        "silver": current_char_state.silver_coins,
-        "copper": current_char_state.copper_coins,
-    }
+    vitals_payload = crud.crud_character.get_character_vitals(current_char_state)
     await combat.send_combat_log(
         player.id,
         [final_pickup_message],
@@ -623,31 +578,14 @@ async def handle_ws_use_item(
         log_message = f"You drink the {item_template.name}. You feel a soothing warmth and regain {health_regained} health."
         await combat.send_combat_log(player.id, [log_message])
 
-        # The router will commit, then we need to send updates. We can do it here post-action.
-        db.commit()  # Commit the changes from healing and item removal
-        db.refresh(character)
+        # Healing and item removal are staged; the WS loop commits them.
+        db.flush()
 
         # Manually push updates since the router's generic post-commit hook might not cover this
         await _send_inventory_update_to_player(db, character)
-        xp_for_next_level = crud.crud_character.get_xp_for_level(character.level + 1)
-        vitals_payload = {
-            "type": "vitals_update",
-            "current_hp": character.current_health,
-            "max_hp": character.max_health,
-            "current_mp": character.current_mana,
-            "max_mp": character.max_mana,
-            "current_xp": character.experience_points,
-            "next_level_xp": (
-                int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
-            ),
-            "level": character.level,
-            "platinum": character.platinum_coins,
-            "gold": character.gold_coins,
-            "silver": character.silver_coins,
-            "copper": character.copper_coins,
-        }
-        await websocket_manager.connection_manager.send_personal_message(
-            vitals_payload, player.id
+        vitals_payload = crud.crud_character.get_character_vitals(character)
+        await websocket_manager.connection_manager.send_vitals(
+            player.id, vitals_payload
         )
 
     else:
@@ -871,11 +809,8 @@ async def handle_ws_use_ooc_skill(
     if action_taken_by_skill:
         if char_after_ooc_skill_attempt:
             db.add(char_after_ooc_skill_attempt)
-        db.commit()
-
-        if char_after_ooc_skill_attempt:
-            db.refresh(char_after_ooc_skill_attempt)
             current_char_state = char_after_ooc_skill_attempt
+        db.flush()  # Staged; the WS loop commits
 
         refreshed_room_orm = crud.crud_room.get_room_by_id(
             db, current_room_id_for_broadcast
@@ -892,20 +827,7 @@ async def handle_ws_use_ooc_skill(
             )
             # final_room_schema_for_response remains the initial one
 
-    xp_for_next = crud.crud_character.get_xp_for_level(current_char_state.level + 1)
-    vitals_payload = {
-        "current_hp": current_char_state.current_health,
-        "max_hp": current_char_state.max_health,
-        "current_mp": current_char_state.current_mana,
-        "max_mp": current_char_state.max_mana,
-        "current_xp": current_char_state.experience_points,
-        "next_level_xp": int(xp_for_next) if xp_for_next != float("inf") else -1,
-        "level": current_char_state.level,
-        "platinum": current_char_state.platinum_coins,
-        "gold": current_char_state.gold_coins,
-        "silver": current_char_state.silver_coins,
-        "copper": current_char_state.copper_coins,
-    }
+    vitals_payload = crud.crud_character.get_character_vitals(current_char_state)
     await combat.send_combat_log(
         player.id,
         skill_log_messages,
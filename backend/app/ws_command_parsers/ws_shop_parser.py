@@ -259,26 +259,11 @@ async def handle_ws_buy(
     price_str = _format_price(item_to_buy.value)
     success_message = f"You buy a {item_to_buy.name} for {price_str}."
 
-    db.commit()
+    db.flush()  # Staged; the WS loop commits
     await _send_inventory_update_to_player(db, updated_char)
 
-    # Now that we've committed and know updated_char is valid, build the vitals payload
-    xp_for_next_level = crud.crud_character.get_xp_for_level(updated_char.level + 1)
-    vitals_payload = {
-        "current_hp": updated_char.current_health,
-        "max_hp": updated_char.max_health,
-        "current_mp": updated_char.current_mana,
-        "max_mp": updated_char.max_mana,
-        "current_xp": updated_char.experience_points,
-        "next_level_xp": (
-            int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
-        ),
-        "level": updated_char.level,
-        "platinum": updated_char.platinum_coins,
-        "gold": updated_char.gold_coins,
-        "silver": updated_char.silver_coins,
-        "copper": updated_char.copper_coins,
-    }
+    # updated_char is valid, so build the vitals payload
+    vitals_payload = crud.crud_character.get_character_vitals(updated_char)
     await combat.send_combat_log(
         player.id, messages=[success_message], character_vitals=vitals_payload
     )
@@ -375,7 +360,7 @@ async def handle_ws_sell(
         db.rollback()
         return
 
-    db.commit()
+    db.flush()  # Staged; the WS loop commits
     await _send_inventory_update_to_player(db, updated_char)
 
     price_str = _format_price(total_payout_copper)
@@ -384,22 +369,7 @@ async def handle_ws_sell(
     )
     success_message = f"You sell {sold_details} for a total of {price_str}."
 
-    xp_for_next_level = crud.crud_character.get_xp_for_level(updated_char.level + 1)
-    vitals_payload = {
-        "current_hp": updated_char.current_health,
-        "max_hp": updated_char.max_health,
-        "current_mp": updated_char.current_mana,
-        "max_mp": updated_char.max_mana,
-        "current_xp": updated_char.experience_points,
-        "next_level_xp": (
-            int(xp_for_next_level) if xp_for_next_level != float("inf") else -1
-        ),
-        "level": updated_char.level,
-        "platinum": updated_char.platinum_coins,
-        "gold": updated_char.gold_coins,
-        "silver": updated_char.silver_coins,
-        "copper": updated_char.copper_coins,
-    }
+    vitals_payload = crud.crud_character.get_character_vitals(updated_char)
 
     await combat.send_combat_log(
         player.id, messages=[success_message], character_vitals=vitals_payload
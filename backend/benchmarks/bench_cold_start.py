@@ -0,0 +1,121 @@
+# backend/benchmarks/bench_cold_start.py
+"""
+Container restart to first accepted WebSocket.
+
+Boots uvicorn once on a throwaway SQLite file to seed the world and create a
+player, then restarts it --restarts times. Each restart is timed from process
+start to (a) the first successful TCP connect to the port and (b) the first
+welcome_package received on /ws, the way a reconnecting client sees it.
+
+Run from backend/:
+    python -m benchmarks.bench_cold_start --restarts 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import websockets
+
+from benchmarks.load_test import SimAccount, _prepare_account
+
+POLL_SECONDS = 0.005
+
+
+def _start_server(port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def _wait_for_port(port: int, deadline: float):
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return
+        except OSError:
+            await asyncio.sleep(POLL_SECONDS)
+    raise TimeoutError("server never bound its port")
+
+
+async def _first_welcome(port: int, account: SimAccount, deadline: float):
+    url = f"ws://127.0.0.1:{port}/ws?token={account.token}&character_id={account.character_id}"
+    while time.monotonic() < deadline:
+        try:
+            async with websockets.connect(url, open_timeout=5) as ws:
+                while True:
+                    if json.loads(await ws.recv()).get("type") == "welcome_package":
+                        return
+        except (OSError, websockets.exceptions.WebSocketException):
+            await asyncio.sleep(POLL_SECONDS)
+    raise TimeoutError("no welcome_package before the deadline")
+
+
+async def _restart(port: int, env: dict, account: SimAccount, timeout: float):
+    started = time.monotonic()
+    server = _start_server(port, env)
+    try:
+        deadline = started + timeout
+        await _wait_for_port(port, deadline)
+        bound = time.monotonic() - started
+        await _first_welcome(port, account, deadline)
+        return bound, time.monotonic() - started
+    finally:
+        _stop_server(server)
+
+
+async def _main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'world.db')}",
+            LOG_LEVEL="WARNING",
+            PASSWORD_BCRYPT_ROUNDS="4",
+        )
+        account = SimAccount("coldstart", "Coldstart")
+        server = _start_server(args.port, env)
+        try:
+            await _wait_for_port(args.port, time.monotonic() + args.timeout)
+            await _prepare_account(f"http://127.0.0.1:{args.port}", account)
+        finally:
+            _stop_server(server)
+
+        results = [await _restart(args.port, env, account, args.timeout) for _ in range(args.restarts)]
+
+    bound = [r[0] * 1000 for r in results]
+    welcomed = [r[1] * 1000 for r in results]
+    print(
+        f"port bound: median {statistics.median(bound):7.1f} ms (min {min(bound):7.1f})\n"
+        f"first WS:   median {statistics.median(welcomed):7.1f} ms (min {min(welcomed):7.1f})"
+        f"  over {len(results)} restarts"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--restarts", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per restart")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_db_loop_blocking.py
+"""
+Event-loop blocking from DB calls: the same queries issued inline from a coroutine,
+awaited one by one through app.db.async_db.run_db, or run inside a whole handler
+handed to the game logic thread with run_game_logic (how WS commands, combat rounds
+and world tick tasks run).
+
+Simulates `--players` concurrent command handlers, each running `--queries` slow
+queries, while a 10ms heartbeat measures how long the loop went unserved. Uses a
+throwaway SQLite file so it runs anywhere; against Postgres the inline stalls are
+network round trips instead of CPU, and the gap is larger.
+
+Run from backend/:
+    python -m benchmarks.bench_db_loop_blocking --players 20 --queries 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.async_db import run_db, run_game_logic, shutdown_db_executor, shutdown_game_thread
+
+HEARTBEAT_SECONDS = 0.01
+# A query with a few ms of real work, standing in for a round trip to the database.
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < :rows) SELECT count(*) FROM n"
+)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_SECONDS
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _handler(db, queries: int, rows: int):
+    for _ in range(queries):
+        db.execute(SLOW_QUERY, {"rows": rows}).scalar()
+        await asyncio.sleep(0)  # Yield like a handler sending its reply would
+
+
+async def _player(mode: str, queries: int, rows: int):
+    with db_session.SessionLocal(bind=db_session.engine) as db:
+        if mode == "inline":
+            await _handler(db, queries, rows)
+        elif mode == "game_logic":
+            await run_game_logic(_handler, db, queries, rows)
+        else:
+            for _ in range(queries):
+                await run_db(lambda: db.execute(SLOW_QUERY, {"rows": rows}).scalar())
+                await asyncio.sleep(0)
+
+
+async def _run(mode: str, players: int, queries: int, rows: int):
+    stop = asyncio.Event()
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(HEARTBEAT_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_player(mode, queries, rows) for _ in range(players)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    lags.sort()
+    print(
+        f"{mode:>10}: {elapsed:6.2f}s total | heartbeat lag p50 {statistics.median(lags) * 1000:6.1f} ms, "
+        f"p99 {lags[int(len(lags) * 0.99) - 1] * 1000:6.1f} ms, max {lags[-1] * 1000:6.1f} ms "
+        f"({len(lags)} beats)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=20000, help="work per query")
+    args = parser.parse_args()
+    settings.DB_SLOW_SESSION_HOLD_SECONDS = float("inf")  # Every session here is slow on purpose
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_session.engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False},
+            poolclass=NullPool,  # One connection per simulated player, like a sized Postgres pool
+        )
+        print(f"{args.players} players x {args.queries} queries")
+        for mode in ("inline", "run_db", "game_logic"):
+            asyncio.run(_run(mode, args.players, args.queries, args.rows))
+        asyncio.run(shutdown_game_thread())
+        shutdown_db_executor()
+        db_session.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
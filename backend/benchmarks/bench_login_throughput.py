@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_login_throughput.py
+"""
+Login throughput benchmark: password verification inline on the event loop vs. on
+the dedicated hashing pool (app.core.security.password_hash_pool).
+
+For each mode it fires N concurrent logins and reports logins/sec, p50/p99 login
+latency, and the worst event-loop stall seen by a 10ms heartbeat -- the delay every
+WebSocket on the same loop would feel during a login storm.
+
+Run from backend/:
+    python -m benchmarks.bench_login_throughput --logins 64 --rounds 12
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+from app.core.security import PasswordHashPool, PasswordHasherBusy
+
+HEARTBEAT_SECONDS = 0.01
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_SECONDS
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(mode: str, context: CryptContext, stored_hash: str, logins: int, pool: PasswordHashPool):
+    stop = asyncio.Event()
+    lags: list = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+    await asyncio.sleep(HEARTBEAT_SECONDS * 2)
+
+    latencies: list = []
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        started = time.perf_counter()
+        try:
+            if mode == "inline":
+                ok = context.verify("hunter22", stored_hash)
+            else:
+                ok = await pool.run(context.verify, "hunter22", stored_hash)
+            assert ok
+            latencies.append(time.perf_counter() - started)
+        except PasswordHasherBusy:
+            rejected += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    latencies.sort()
+    print(
+        f"{mode:>6}: {len(latencies) / elapsed:7.1f} logins/s | "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms | "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.1f} ms | "
+        f"max loop stall {max(lags, default=0) * 1000:7.1f} ms | rejected {rejected}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=1000)
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=args.rounds)
+    stored_hash = context.hash("hunter22")
+    pool = PasswordHashPool(max_workers=args.workers, max_pending=args.max_pending)
+    print(f"{args.logins} concurrent logins, bcrypt rounds={args.rounds}, pool workers={args.workers}")
+    for mode in ("inline", "pool"):
+        asyncio.run(_run(mode, context, stored_hash, args.logins, pool))
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
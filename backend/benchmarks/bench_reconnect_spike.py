@@ -0,0 +1,127 @@
+# backend/benchmarks/bench_reconnect_spike.py
+"""
+Latency a reconnecting player sees right after a restart, against a warm server.
+
+Prepares --players characters on a throwaway SQLite world, restarts uvicorn and,
+as soon as the server is ready (GET /readyz is 200, or the port is bound on a
+build without it), reconnects them all at once. Each player waits for its
+welcome_package and then sends a few commands. The same round is then repeated
+on the now-warm server, so the two rows compare a cold and a warm process.
+
+Run from backend/:
+    python -m benchmarks.bench_reconnect_spike --players 10 --restarts 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+import websockets
+
+from benchmarks.bench_cold_start import _start_server, _stop_server, _wait_for_port
+from benchmarks.load_test import UNSOLICITED_FRAMES, SimAccount, _prepare_account
+
+COMMANDS = ("look", "inventory", "score", "look")
+
+
+def _ready(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1) as response:
+            return response.status == 200
+    except urllib.error.HTTPError as e:
+        return e.code == 404  # A build without /readyz is ready once it serves at all
+    except OSError:
+        return False
+
+
+async def _wait_ready(port: int, deadline: float):
+    await _wait_for_port(port, deadline)
+    while not await asyncio.to_thread(_ready, port):
+        if time.monotonic() > deadline:
+            raise TimeoutError("server never became ready")
+        await asyncio.sleep(0.01)
+
+
+async def _session(port: int, account: SimAccount, timings: Dict[str, List[float]]):
+    url = f"ws://127.0.0.1:{port}/ws?token={account.token}&character_id={account.character_id}"
+    started = time.perf_counter()
+    async with websockets.connect(url, open_timeout=30) as ws:
+        while json.loads(await ws.recv()).get("type") != "welcome_package":
+            pass
+        timings["welcome"].append(time.perf_counter() - started)
+        for command in COMMANDS:
+            sent = time.perf_counter()
+            await ws.send(json.dumps({"command_text": command}))
+            while json.loads(await asyncio.wait_for(ws.recv(), 10)).get("type") in UNSOLICITED_FRAMES:
+                pass
+            timings["command"].append(time.perf_counter() - sent)
+
+
+async def _round(port: int, accounts: List[SimAccount]) -> Dict[str, List[float]]:
+    timings: Dict[str, List[float]] = {"welcome": [], "command": []}
+    await asyncio.gather(*(_session(port, account, timings) for account in accounts))
+    return timings
+
+
+def _summary(label: str, samples: List[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    return (
+        f"{label:8s} n={len(ms):4d}  p50 {statistics.median(ms):7.1f}"
+        f"  p95 {ms[int(0.95 * (len(ms) - 1))]:7.1f}  max {ms[-1]:7.1f} ms"
+    )
+
+
+async def _main(args):
+    cold: Dict[str, List[float]] = {"welcome": [], "command": []}
+    warm: Dict[str, List[float]] = {"welcome": [], "command": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'world.db')}",
+            LOG_LEVEL="WARNING",
+            PASSWORD_BCRYPT_ROUNDS="4",
+        )
+        accounts = [SimAccount(f"spike{i}", f"Spike{i}") for i in range(args.players)]
+        server = _start_server(args.port, env)
+        try:
+            await _wait_ready(args.port, time.monotonic() + args.timeout)
+            for account in accounts:
+                await _prepare_account(f"http://127.0.0.1:{args.port}", account)
+        finally:
+            _stop_server(server)
+
+        for _ in range(args.restarts):
+            server = _start_server(args.port, env)
+            try:
+                await _wait_ready(args.port, time.monotonic() + args.timeout)
+                for into in (cold, warm):
+                    for name, samples in (await _round(args.port, accounts)).items():
+                        into[name].extend(samples)
+                    # Let the server finish the disconnect cleanup before the same players return
+                    await asyncio.sleep(1.0)
+            finally:
+                _stop_server(server)
+
+    for label, timings in (("cold", cold), ("warm", warm)):
+        print(f"--- {label} process, {args.players} players x {args.restarts} restarts")
+        print(_summary("welcome", timings["welcome"]))
+        print(_summary("command", timings["command"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--restarts", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per restart")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
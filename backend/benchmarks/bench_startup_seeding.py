@@ -0,0 +1,107 @@
+# backend/benchmarks/bench_startup_seeding.py
+"""
+Boot time of the app lifespan: a first boot on an empty database, then restarts.
+
+Each boot is a fresh interpreter (like a container restart) that enters
+app.main.lifespan against the same throwaway SQLite file and reports how long
+startup took, split into the seeding phase and everything else. The first boot
+seeds everything; later boots find the seeds already applied.
+
+Run from backend/:
+    python -m benchmarks.bench_startup_seeding --boots 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _boot_once():
+    """Child process: one lifespan startup and shutdown, timings printed as JSON."""
+    import logging
+
+    from app import main
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    seeding = {"seconds": 0.0, "statements": 0}
+    seeding_started = {}
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        # Round trips are what a remote Postgres charges for; SQLite hides them.
+        if "at" in seeding_started:
+            seeding["statements"] += 1
+
+    class _SeedPhase(logging.Handler):
+        # The lifespan logs these two lines around the seeding phase.
+        def emit(self, record):
+            message = record.getMessage()
+            if message == "Seeding initial data...":
+                seeding_started["at"] = time.perf_counter()
+            elif "at" in seeding_started and "seeding completed" in message:
+                seeding["seconds"] = time.perf_counter() - seeding_started.pop("at")
+
+    main_logger = logging.getLogger("app.main")
+    main_logger.setLevel(logging.INFO)  # Children boot at WARNING; only these lines are wanted
+    main_logger.propagate = False
+    main_logger.addHandler(_SeedPhase())
+
+    async def run():
+        started = time.perf_counter()
+        async with main.lifespan(main.app):
+            startup = time.perf_counter() - started
+        return startup
+
+    startup = asyncio.run(run())
+    print(json.dumps({"startup": startup, **seeding}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--boots", type=int, default=3, help="boots after the first")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _boot_once()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'boot.db')}",
+            LOG_LEVEL="WARNING",
+        )
+        results = []
+        for _ in range(args.boots + 1):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup_seeding", "--child"],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    first, restarts = results[0], results[1:]
+    print(
+        f"first boot: startup {first['startup'] * 1000:7.1f} ms | seeding {first['seconds'] * 1000:7.1f} ms,"
+        f" {first['statements']:5d} statements"
+    )
+    if restarts:
+        print(
+            f"  restarts: startup {statistics.median(r['startup'] for r in restarts) * 1000:7.1f} ms"
+            f" | seeding {statistics.median(r['seconds'] for r in restarts) * 1000:7.1f} ms,"
+            f" {statistics.median(r['statements'] for r in restarts):5.0f} statements"
+            f" (median of {len(restarts)})"
+        )
+
+
+if __name__ == "__main__":
+    main()
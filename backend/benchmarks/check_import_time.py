@@ -0,0 +1,106 @@
+# backend/benchmarks/check_import_time.py
+"""
+Import-time regression check for `import app.main`.
+
+Imports the app in a fresh interpreter under `python -X importtime`, prints the
+slowest imports by cumulative time, and fails when importing the app pulls in a
+module that only some requests need (the Gemini client, JWT and password
+hashing libraries) or opens a seed file -- that work belongs in the lifespan or
+on first use, not on the path to binding the port. With --budget-ms it also
+fails when the median import of app.main over --runs takes longer than that.
+
+Run from backend/:
+    python -m benchmarks.check_import_time --runs 5 --budget-ms 2500
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Imported on first use by the requests that need them
+DEFERRED_MODULES = ("google.genai", "jose", "passlib", "cryptography")
+
+# Runs in the child: records seed files opened during the import, then reports
+# them and which deferred modules got imported on stdout (importtime is on stderr).
+_PROBE = """
+import json, os, sys
+seeds = os.path.join(os.getcwd(), "app", "seeds") + os.sep
+opened = []
+def _audit(event, args):
+    if event == "open" and isinstance(args[0], str) and os.path.abspath(args[0]).startswith(seeds):
+        opened.append(os.path.relpath(args[0], seeds))
+sys.addaudithook(_audit)
+import app.main
+deferred = %r
+print(json.dumps({
+    "seed_files": sorted(set(opened)),
+    "deferred": [m for m in deferred if m in sys.modules],
+}))
+"""
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def import_app(backend_dir: str) -> Tuple[Dict[str, int], dict]:
+    """Imports app.main in a fresh interpreter. Returns ({module: cumulative us}, probe report)."""
+    env = dict(os.environ, DATABASE_URL=os.environ.get("DATABASE_URL", "sqlite://"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE % (DEFERRED_MODULES,)],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{result.stderr[-2000:]}")
+    cumulative: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def problems(report: dict) -> List[str]:
+    found = []
+    if report["deferred"]:
+        found.append(f"import app.main imported deferred modules: {', '.join(report['deferred'])}")
+    if report["seed_files"]:
+        found.append(f"import app.main opened seed files: {', '.join(report['seed_files'])}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail above this median")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = [import_app(backend_dir) for _ in range(args.runs)]
+    totals = [cumulative["app.main"] / 1000 for cumulative, _ in runs]
+    median = statistics.median(totals)
+
+    slowest = sorted(runs[-1][0].items(), key=lambda item: item[1], reverse=True)[: args.top]
+    for module, micros in slowest:
+        print(f"{micros / 1000:8.1f} ms  {module}")
+    print(
+        f"import app.main: median {median:.1f} ms (min {min(totals):.1f}) over {len(totals)} runs,"
+        f" {len(runs[-1][0])} modules"
+    )
+
+    failures = problems(runs[-1][1])
+    if args.budget_ms is not None and median > args.budget_ms:
+        failures.append(f"median import time {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
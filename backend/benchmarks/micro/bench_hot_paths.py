@@ -0,0 +1,126 @@
+# backend/benchmarks/micro/bench_hot_paths.py
+"""
+Micro-benchmarks for the pure-Python functions on the command and combat paths.
+
+Runs on in-memory fixtures (see world_fixtures.py), no database. Needs
+pytest-benchmark (`pip install pytest-benchmark`). The file is deliberately not named
+test_*.py, so the regular test run never collects it; pass its path explicitly.
+
+From backend/:
+
+    # Record a baseline (on main, on the machine that will do the comparing)
+    python -m pytest benchmarks/micro/bench_hot_paths.py \\
+        --benchmark-storage=benchmarks/micro/baselines --benchmark-save=main
+
+    # Compare a branch against it; fails if any mean regressed by more than 20%
+    python -m pytest benchmarks/micro/bench_hot_paths.py \\
+        --benchmark-storage=benchmarks/micro/baselines \\
+        --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Baselines are only comparable on the machine that recorded them; re-save after
+changing runner hardware.
+"""
+import random
+import warnings
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app import schemas
+from app.commands.utils import (
+    format_inventory_for_player_message,
+    get_dynamic_room_description,
+    get_formatted_mob_name,
+    resolve_mob_target,
+    resolve_room_item_target,
+    roll_dice,
+)
+from benchmarks.micro.world_fixtures import (
+    build_character,
+    build_inventory_display,
+    build_items,
+    build_mob_templates,
+    build_room,
+)
+
+
+@pytest.fixture(scope="module")
+def world():
+    items = build_items()
+    room = build_room(items, build_mob_templates())
+    character = build_character(items, room)
+    return {
+        "room": room,
+        "character": character,
+        "inventory": build_inventory_display(character),
+    }
+
+
+@pytest.fixture(scope="module")
+def room_schema(world):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # from_orm is deprecated but is what the hot path calls
+        return schemas.RoomInDB.from_orm(world["room"])
+
+
+def test_roll_dice(benchmark):
+    random.seed(0)
+    benchmark(lambda: [roll_dice(spec) for spec in ("1d4", "2d6+3", "1d20", "d8-1", "5")])
+
+
+def test_calculate_combat_stats(benchmark, world):
+    benchmark(world["character"].calculate_combat_stats)
+
+
+def test_get_formatted_mob_name(benchmark, world):
+    mobs = world["room"].mobs_in_room
+    character = world["character"]
+    benchmark(lambda: [get_formatted_mob_name(mob, character) for mob in mobs])
+
+
+@pytest.mark.parametrize("target_ref", ["2", "rat", "gob"])
+def test_resolve_mob_target(benchmark, world, target_ref):
+    benchmark(resolve_mob_target, target_ref, world["room"].mobs_in_room)
+
+
+@pytest.mark.parametrize("target_ref", ["3", "sword", "pot"])
+def test_resolve_room_item_target(benchmark, world, target_ref):
+    benchmark(resolve_room_item_target, target_ref, world["room"].items_on_ground)
+
+
+def test_get_dynamic_room_description(benchmark, world):
+    benchmark(get_dynamic_room_description, world["room"])
+
+
+def test_format_inventory_for_player_message(benchmark, world):
+    benchmark(format_inventory_for_player_message, world["inventory"])
+
+
+def test_room_schema_from_orm(benchmark, world):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        benchmark(schemas.RoomInDB.from_orm, world["room"])
+
+
+def test_encode_look_payload(benchmark, world, room_schema):
+    payload = {
+        "type": "look_response",
+        "room_name": world["room"].name,
+        "description": get_dynamic_room_description(world["room"]),
+        "exits": list(world["room"].exits.keys()),
+        "ground_items": [item.model_dump() for item in room_schema.items_on_ground],
+        "mob_text": "1. A Giant Rat\n2. A Goblin",
+        "room_data": room_schema.model_dump(exclude_none=True),
+    }
+    benchmark(jsonable_encoder, payload)
+
+
+def test_encode_combat_update(benchmark, room_schema):
+    payload = {
+        "type": "combat_update",
+        "log": ["You hit the Giant Rat for 4 damage.", "The Giant Rat bites you for 2 damage."],
+        "room_data": room_schema,
+        "combat_over": False,
+        "character_vitals": {"current_hp": 38, "max_hp": 40, "current_mp": 10, "max_mp": 10},
+    }
+    benchmark(jsonable_encoder, payload)
@@ -0,0 +1,159 @@
+# backend/benchmarks/micro/world_fixtures.py
+"""
+In-memory game objects for the micro-benchmarks, built from the seed JSON.
+
+Everything is a transient ORM instance (never added to a session) with its
+relationships assigned directly, so the hot functions run exactly as they do on
+loaded rows, but without a database.
+"""
+import json
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app import models, schemas
+
+SEEDS_DIR = Path(__file__).resolve().parents[2] / "app" / "seeds"
+
+
+def _load_seed(name: str) -> List[Dict[str, Any]]:
+    with open(SEEDS_DIR / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_items() -> Dict[str, models.Item]:
+    items = {}
+    for data in _load_seed("items"):
+        # Column defaults only apply on INSERT; transient rows need them spelled out.
+        item = models.Item(id=uuid.uuid4(), **{"rarity": "common", **data})
+        items[item.name] = item
+    return items
+
+
+def build_mob_templates() -> List[models.MobTemplate]:
+    templates = []
+    for data in _load_seed("mob_templates"):
+        columns = models.MobTemplate.__table__.columns.keys()
+        templates.append(
+            models.MobTemplate(id=uuid.uuid4(), **{k: v for k, v in data.items() if k in columns})
+        )
+    return templates
+
+
+def build_room(items: Dict[str, models.Item], templates: List[models.MobTemplate]) -> models.Room:
+    """The hub room from the seeds, with four exits (one locked), six mobs and eight items."""
+    data = _load_seed("rooms_z0")[0]["data"]
+    room = models.Room(
+        id=uuid.uuid4(),
+        name=data["name"],
+        description=(data.get("description") or "")
+        + " [DYNAMIC_EXIT_NORTH] [DYNAMIC_EXIT_SOUTH]",
+        x=data["x"],
+        y=data["y"],
+        z=data["z"],
+        room_type=models.room.RoomTypeEnum(data.get("room_type", "standard")),
+        zone_name=data.get("zone_name"),
+        zone_level_range=data.get("zone_level_range"),
+        exits={
+            "north": {
+                "target_room_id": str(uuid.uuid4()),
+                "is_locked": True,
+                "description_when_locked": "A steel shutter blocks the way north.",
+            },
+            "south": {"target_room_id": str(uuid.uuid4())},
+            "east": {"target_room_id": str(uuid.uuid4())},
+            "west": {"target_room_id": str(uuid.uuid4())},
+        },
+        interactables=data.get("interactables") or [],
+        npc_placements=[],
+    )
+    now = datetime.now(timezone.utc)
+    room.mobs_in_room = [
+        models.RoomMobInstance(
+            id=uuid.uuid4(),
+            room_id=room.id,
+            mob_template_id=template.id,
+            mob_template=template,
+            current_health=template.base_health,
+            spawned_at=now,
+        )
+        for template in templates[:6]
+    ]
+    room.items_on_ground = [
+        models.RoomItemInstance(
+            id=uuid.uuid4(), room_id=room.id, item_id=item.id, item=item, quantity=1, dropped_at=now
+        )
+        for item in list(items.values())[:8]
+    ]
+    return room
+
+
+def build_character(items: Dict[str, models.Item], room: models.Room) -> models.Character:
+    """A level 5 character with armor on, a weapon in hand and a full-ish backpack."""
+    character = models.Character(
+        id=uuid.uuid4(),
+        player_id=uuid.uuid4(),
+        name="Benchy",
+        class_name="Warrior",
+        current_room_id=room.id,
+        level=5,
+        experience_points=1200,
+        strength=14,
+        dexterity=16,
+        constitution=12,
+        intelligence=10,
+        wisdom=10,
+        charisma=8,
+        luck=5,
+        current_health=40,
+        max_health=40,
+        current_mana=10,
+        max_mana=10,
+        base_ac=10,
+        base_attack_bonus=2,
+        base_damage_dice="1d2",
+        base_damage_bonus=0,
+        platinum_coins=0,
+        gold_coins=3,
+        silver_coins=12,
+        copper_coins=40,
+    )
+    inventory = []
+    equipped_slots = set()
+    for item in items.values():
+        slot = item.slot if item.item_type in ("weapon", "armor") else None
+        equip = bool(slot) and slot not in equipped_slots
+        if equip:
+            equipped_slots.add(slot)
+        inventory.append(
+            models.CharacterInventoryItem(
+                id=uuid.uuid4(),
+                character_id=character.id,
+                item_id=item.id,
+                item=item,
+                quantity=3 if item.stackable else 1,
+                equipped=equip,
+                equipped_slot=slot if equip else None,
+            )
+        )
+    character.inventory_items = inventory
+    return character
+
+
+def build_inventory_display(character: models.Character) -> schemas.CharacterInventoryDisplay:
+    equipped = {}
+    backpack = []
+    for inv_item in character.inventory_items:
+        entry = schemas.CharacterInventoryItem.model_validate(inv_item)
+        if inv_item.equipped:
+            equipped[inv_item.equipped_slot] = entry
+        else:
+            backpack.append(entry)
+    return schemas.CharacterInventoryDisplay(
+        equipped_items=equipped,
+        backpack_items=backpack,
+        gold=character.gold_coins,
+        silver=character.silver_coins,
+        copper=character.copper_coins,
+    )
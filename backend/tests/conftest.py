@@ -6,10 +6,13 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import os # <<< Import os
 
+from contextlib import contextmanager
+
 # We have to import the REAL app and settings to modify them
 from app.main import app
 from app.core.config import settings
 from app.db.base_class import Base
+from app.db.query_budget import count_queries
 
 # --- TEST DATABASE URL ---
 # This is the in-memory database we'll use for all tests.
@@ -46,4 +49,19 @@ def test_client_with_db():
         yield client
         
     # --- 5. Teardown (not strictly necessary for in-memory, but good practice) ---
-    Base.metadata.drop_all(bind=engine)
\ No newline at end of file
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    `with query_budget("ws:look"): ...` counts the SQL run inside the block and fails
+    the test if it exceeds the budget declared for that tag in app.db.query_budget.
+    """
+    @contextmanager
+    def check(tag: str):
+        with count_queries(tag, capture=True) as counter:
+            yield counter
+        assert not counter.over_budget, counter.summary()
+
+    return check
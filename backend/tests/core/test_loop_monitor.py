@@ -0,0 +1,24 @@
+# backend/tests/core/test_loop_monitor.py
+import asyncio
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopMonitor
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_loop_blocked_right_after_start_is_recorded_with_its_stack():
+    monitor = LoopMonitor(interval=0.05, threshold=0.2, history=10)
+    monitor.start()
+    try:
+        time.sleep(0.5)  # Like startup seeding: blocks before the heartbeat first runs
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    assert monitor.stalls_total == 1
+    [stall] = monitor.stalls
+    assert stall["lag_ms"] >= 300
+    assert "test_loop_blocked_right_after_start" in stall["where"]
@@ -0,0 +1,90 @@
+# backend/tests/db/test_query_budgets.py
+import time
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.websocket_router as websocket_router
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.query_budget import count_queries
+from app.game_logic.world_ticker import world_tick_tasks
+from app.main import app
+
+# Exercised in this order against the seeded world; the first player is a sysop, so giveme works.
+WS_COMMANDS = [
+    "look",
+    "n",
+    "s",
+    "inventory",
+    "score",
+    "skills",
+    "say hello",
+    "list",
+    "giveme Rusty Sword",
+    "equip Rusty Sword",
+    "unequip Rusty Sword",
+    "drop Rusty Sword",
+    "get Rusty Sword",
+    "attack 1",
+]
+
+
+@pytest.fixture(scope="module")
+def seeded_client(tmp_path_factory):
+    """The real app on a seeded SQLite file (the DB thread pool needs a shared database)."""
+    original_url = settings.DATABASE_URL
+    settings.DATABASE_URL = f"sqlite:///{tmp_path_factory.mktemp('budget') / 'world.db'}"
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/v1/users/register",
+                json={"username": "budgetkeeper", "password": "password123"},
+            )
+            assert response.status_code == 201, response.text
+            token = client.post(
+                "/api/v1/users/login",
+                data={"username": "budgetkeeper", "password": "password123"},
+            ).json()["access_token"]
+            character = client.post(
+                "/api/v1/character/create",
+                json={"name": "Budgeteer", "class_name": "Warrior"},
+                headers={"Authorization": f"Bearer {token}"},
+            ).json()
+            yield client, token, character["id"]
+    finally:
+        settings.DATABASE_URL = original_url
+
+
+def test_ws_commands_stay_within_query_budget(seeded_client, monkeypatch):
+    client, token, character_id = seeded_client
+    counters = []
+
+    @contextmanager
+    def record(tag):
+        with count_queries(tag, capture=True) as counter:
+            yield
+        counters.append(counter)
+
+    monkeypatch.setattr(websocket_router, "sample_query_budget", record)
+    with client.websocket_connect(f"/ws?token={token}&character_id={character_id}") as websocket:
+        # The server handles one command at a time; replies queue up unread.
+        for command_text in WS_COMMANDS:
+            websocket.send_json({"command_text": command_text})
+        deadline = time.monotonic() + 30
+        while len(counters) < len(WS_COMMANDS) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    assert [c.tag for c in counters] == [f"ws:{c.split()[0]}" for c in WS_COMMANDS]
+    offenders = [c.summary() for c in counters if c.over_budget]
+    assert not offenders, "\n".join(offenders)
+
+
+@pytest.mark.asyncio
+async def test_world_tick_tasks_stay_within_query_budget(seeded_client, query_budget):
+    with db_session.SessionLocal(bind=db_session.engine) as db:
+        for task_name, task_func in world_tick_tasks.items():
+            with query_budget(f"ticker:world:{task_name}"):
+                await task_func(db)
+            db.commit()
@@ -0,0 +1,103 @@
+# backend/tests/db/test_seeding.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.db import seeding
+from app.db import session as db_session
+from app.db.base_class import Base
+from app.db.seeding import Seeder, bulk_upsert, run_seeders
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    """A private in-memory DB behind the app's SessionLocal, reading seeds from tmp_path."""
+    test_engine = create_engine(
+        "sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=test_engine)
+    monkeypatch.setattr(db_session, "engine", test_engine)
+    monkeypatch.setattr(seeding, "SEEDS_DIR", str(tmp_path))
+    (tmp_path / "items.json").write_text("[]")
+    (tmp_path / "rooms.json").write_text("[]")
+    yield test_engine
+    test_engine.dispose()
+
+
+def _seeders(calls, fail=(), items_version=1):
+    def seed(name):
+        def apply(db):
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError(f"{name} is broken")
+
+        return apply
+
+    return [
+        Seeder("items", seed("items"), ("items.json",), version=items_version),
+        Seeder("world", seed("world"), ("rooms.json",), after=("items",)),
+    ]
+
+
+def test_bulk_upsert_inserts_new_and_updates_changed_rows(engine):
+    with db_session.SessionLocal(bind=engine) as db:
+        assert bulk_upsert(
+            db,
+            models.Item,
+            [{"name": "Torch", "item_type": "misc", "value": 2}, {"name": "Rope", "item_type": "misc"}],
+            key=("name",),
+        ) == (2, 0, 0)
+        db.commit()
+
+        assert bulk_upsert(
+            db,
+            models.Item,
+            [{"name": "Torch", "item_type": "misc", "value": 3}, {"name": "Rope", "item_type": "misc"}],
+            key=("name",),
+        ) == (0, 1, 1)
+        db.commit()
+
+        assert db.scalar(select(models.Item.value).where(models.Item.name == "Torch")) == 3
+
+
+def test_unchanged_seeds_are_skipped_and_changes_rerun_dependents(engine, tmp_path):
+    calls = []
+    assert set(run_seeders(_seeders(calls)).values()) == {"applied"}
+    assert calls == ["items", "world"]
+
+    calls.clear()
+    assert set(run_seeders(_seeders(calls)).values()) == {"unchanged"}
+    assert calls == []
+
+    # The world places an item, so an items change re-seeds the world too
+    (tmp_path / "items.json").write_text('[{"name": "Torch"}]')
+    assert run_seeders(_seeders(calls)) == {"items": "applied", "world": "applied"}
+    assert calls == ["items", "world"]
+
+
+def test_failed_seeder_is_retried_next_boot_and_blocks_dependents(engine):
+    calls = []
+    assert run_seeders(_seeders(calls, fail=("items",))) == {"items": "failed", "world": "blocked"}
+    assert calls == ["items"]
+
+    calls.clear()
+    assert set(run_seeders(_seeders(calls)).values()) == {"applied"}
+    assert calls == ["items", "world"]
+
+
+def test_version_bump_reruns_the_seeder_and_its_dependents(engine):
+    calls = []
+    run_seeders(_seeders(calls))
+    with db_session.SessionLocal(bind=engine) as db:
+        db.execute(update(models.SeedChecksum).values(applied_at=datetime(2000, 1, 1)))
+        db.commit()
+
+    calls.clear()
+    assert run_seeders(_seeders(calls, items_version=2)) == {"items": "applied", "world": "applied"}
+    assert calls == ["items", "world"]
+    with db_session.SessionLocal(bind=engine) as db:
+        applied = db.scalars(select(models.SeedChecksum.applied_at)).all()
+    assert all(applied_at.year > 2000 for applied_at in applied)
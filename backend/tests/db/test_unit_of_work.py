@@ -0,0 +1,179 @@
+# backend/tests/db/test_unit_of_work.py
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db.base_class import Base
+from app.db.unit_of_work import group_committer, unit_of_work
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+def _player_count(make_session) -> int:
+    with make_session() as db:
+        return db.scalar(select(func.count()).select_from(models.Player))
+
+
+async def test_frames_are_held_until_commit(make_session):
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    with make_session() as db, unit_of_work(db) as uow:
+        db.add(models.Player(username="held", hashed_password="x"))
+        assert uow.hold(send, "You buy a torch.")
+        assert sent == []
+        await uow.commit()
+
+    assert sent == ["You buy a torch."]
+    assert _player_count(make_session) == 1
+
+
+async def test_failed_commit_drops_held_frames(make_session):
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    with make_session() as db, unit_of_work(db) as uow:
+        db.add(models.Player(username=None, hashed_password="x"))  # NOT NULL violation
+        uow.hold(send, "You buy a torch.")
+        with pytest.raises(Exception):
+            await uow.commit()
+        await uow.rollback()
+
+    assert sent == []
+    assert _player_count(make_session) == 0
+
+
+async def test_concurrent_commits_share_a_batch(make_session):
+    sessions = [make_session() for _ in range(5)]
+    for i, db in enumerate(sessions):
+        db.add(models.Player(username=None if i == 2 else f"p{i}", hashed_password="x"))
+    batches_before = group_committer.batches_committed
+
+    results = await asyncio.gather(
+        *(group_committer.commit(db) for db in sessions), return_exceptions=True
+    )
+
+    assert group_committer.batches_committed == batches_before + 1
+    # One bad commit fails alone; the rest of its batch is acknowledged
+    assert [isinstance(r, Exception) for r in results] == [False, False, True, False, False]
+    assert _player_count(make_session) == 4
+    for db in sessions:
+        db.close()
+
+
+async def test_dropped_combat_log_leaves_the_vitals_baseline_alone(make_session):
+    from app.game_logic.combat.combat_utils import send_combat_log
+    from app.websocket_manager import connection_manager
+
+    sent = []
+
+    class _Socket:
+        async def send_json(self, payload):
+            sent.append(payload)
+
+    player_id = uuid.uuid4()
+    connection_manager.active_player_connections[player_id] = _Socket()
+    try:
+        with make_session() as db, unit_of_work(db) as uow:
+            await send_combat_log(player_id, ["You are hit."], character_vitals={"current_hp": 5})
+            await uow.rollback()
+        assert sent == []
+        assert player_id not in connection_manager.last_sent_vitals
+
+        await send_combat_log(player_id, ["You are hit."], character_vitals={"current_hp": 5})
+        assert sent[0]["character_vitals"]["current_hp"] == 5
+        assert connection_manager.last_sent_vitals[player_id]["current_hp"] == 5
+    finally:
+        connection_manager.disconnect(player_id)
+
+
+async def test_combat_log_to_an_offline_player_keeps_no_vitals_baseline():
+    from app.game_logic.combat.combat_utils import send_combat_log
+    from app.websocket_manager import connection_manager
+
+    player_id = uuid.uuid4()
+    await send_combat_log(player_id, ["You are hit."], character_vitals={"current_hp": 5})
+    assert player_id not in connection_manager.last_sent_vitals
+    assert player_id not in connection_manager.last_full_vitals_at
+
+
+async def test_who_list_level_follows_only_committed_changes(make_session):
+    from app.db import session as db_session
+    from app.websocket_manager import connection_manager
+
+    engine = make_session.kw["bind"]
+    with db_session.SessionLocal(bind=engine) as db:
+        player = models.Player(username="climber", hashed_password="x")
+        db.add(player)
+        db.flush()
+        character = models.Character(
+            name="Climber", player_id=player.id, current_room_id=uuid.uuid4(), level=1
+        )
+        db.add(character)
+        db.commit()
+        connection_manager.player_active_characters[player.id] = character.id
+        connection_manager.index_online_character(character)
+        try:
+            character.level = 2
+            connection_manager.index_online_character_on_commit(db, character)
+            db.rollback()
+            assert connection_manager.get_online_character_by_name("climber").level == 1
+
+            character.level = 3
+            connection_manager.index_online_character_on_commit(db, character)
+            db.commit()
+            assert connection_manager.get_online_character_by_name("climber").level == 3
+        finally:
+            connection_manager.disconnect(player.id)
+
+
+async def test_game_logic_thread_sends_through_the_serving_loop(make_session):
+    import threading
+
+    from app.db.async_db import run_game_logic
+    from app.game_logic.combat.combat_utils import send_combat_log
+    from app.websocket_manager import connection_manager
+
+    sent = []  # (log, thread the frame was sent from)
+
+    class _Socket:
+        async def send_json(self, payload):
+            sent.append((payload["log"], threading.get_ident()))
+
+    async def handler(player_id):
+        await send_combat_log(player_id, ["You buy a torch."])
+        return threading.get_ident()
+
+    player_id = uuid.uuid4()
+    connection_manager.active_player_connections[player_id] = _Socket()
+    try:
+        with make_session() as db, unit_of_work(db) as uow:
+            handler_thread = await uow.run(handler, player_id)
+            assert sent == []
+            await uow.commit()
+        # A combat round has no unit of work: its frames go out as it sends them
+        await run_game_logic(send_combat_log, player_id, ["You are hit."])
+    finally:
+        connection_manager.disconnect(player_id)
+
+    assert handler_thread != threading.get_ident()
+    assert sent == [
+        (["You buy a torch."], threading.get_ident()),
+        (["You are hit."], threading.get_ident()),
+    ]
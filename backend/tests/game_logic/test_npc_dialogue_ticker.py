@@ -0,0 +1,111 @@
+# backend/tests/game_logic/test_npc_dialogue_ticker.py
+import asyncio
+import time
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+from app.core.config import settings
+from app.game_logic import npc_dialogue_ticker
+from app.game_logic.npc_dialogue_cache import DialogueTokenBudget
+from app.game_logic.npc_dialogue_provider import DialogueRequest, StaticDialogueProvider
+from app.game_logic.npc_dialogue_ticker import DialogueJob, run_dialogue_jobs
+
+pytestmark = pytest.mark.asyncio
+
+
+def _job(tag: str) -> DialogueJob:
+    return DialogueJob(
+        room_id=uuid.uuid4(),
+        request=DialogueRequest(
+            npc_tag=tag,
+            npc_name=tag.title(),
+            personality_prompt="A grumpy guard.",
+            static_lines=(f"{tag} line",),
+            player_names=("Alice",),
+        ),
+    )
+
+
+async def test_dialogue_jobs_run_concurrently_with_stub_provider(monkeypatch):
+    """
+    Eight jobs against a 0.2s stub with a pool of 4 should take ~2 rounds,
+    not 8 sequential calls, and every job should get its line and tokens back.
+    """
+    monkeypatch.setattr(settings, "NPC_DIALOGUE_MAX_CONCURRENCY", 4)
+    provider = StaticDialogueProvider(latency_seconds=0.2, tokens_per_call=7)
+    jobs = [_job(f"npc{i}") for i in range(8)]
+
+    started = time.perf_counter()
+    results = await run_dialogue_jobs(provider, jobs)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.2 * 8 / 2
+    assert [r.text for _, r in results] == [f"npc{i} line" for i in range(8)]
+    assert all(r.tokens_used == 7 for _, r in results)
+
+
+async def test_dialogue_job_timeout_falls_back_to_static_line(monkeypatch):
+    monkeypatch.setattr(settings, "NPC_DIALOGUE_TIMEOUT_SECONDS", 0.05)
+    provider = StaticDialogueProvider(latency_seconds=1.0, tokens_per_call=7)
+
+    [(_, result)] = await run_dialogue_jobs(provider, [_job("slowpoke")])
+
+    assert result.text == "slowpoke line"
+    assert result.tokens_used == 0
+
+
+async def test_over_budget_npc_is_never_sent_to_provider(monkeypatch):
+    """The daily budget is checked before the call, using the tokens already spent today."""
+    monkeypatch.setattr(settings, "NPC_DIALOGUE_DAILY_TOKEN_BUDGET", 1000)
+    budget = DialogueTokenBudget()
+    budget.observe("chatterbox", tokens_used_today=990, last_reset=date.today())
+    monkeypatch.setattr(npc_dialogue_ticker, "token_budget", budget)
+    monkeypatch.setattr(npc_dialogue_ticker, "record_token_usage", lambda *args: None)
+    provider = StaticDialogueProvider(tokens_per_call=7)
+    provider.generate = AsyncMock()
+
+    [(_, result)] = await npc_dialogue_ticker._run_budgeted_jobs(
+        provider, [_job("chatterbox")]
+    )
+
+    provider.generate.assert_not_called()
+    assert result.text == "chatterbox line"
+    assert result.tokens_used == 0
+
+
+async def test_timed_out_call_keeps_its_permit_and_is_charged_when_it_returns(monkeypatch):
+    monkeypatch.setattr(settings, "NPC_DIALOGUE_TIMEOUT_SECONDS", 0.05)
+    budget = DialogueTokenBudget()
+    monkeypatch.setattr(npc_dialogue_ticker, "token_budget", budget)
+    charged = []
+    monkeypatch.setattr(npc_dialogue_ticker, "record_token_usage", lambda *args: charged.append(args))
+    provider = StaticDialogueProvider(latency_seconds=0.2, tokens_per_call=7)
+    semaphore = asyncio.Semaphore(1)
+
+    result = await npc_dialogue_ticker._generate_with_limits(
+        provider, _job("slowpoke").request, semaphore
+    )
+
+    assert result.tokens_used == 0
+    assert semaphore.locked()  # The provider call is still running
+    await asyncio.sleep(0.3)
+    assert not semaphore.locked()
+    assert charged == [("slowpoke", 7)]
+    assert budget._used_today["slowpoke"] == 7
+
+
+async def test_permit_held_by_a_timed_out_call_bounds_the_next_cycle(monkeypatch):
+    monkeypatch.setattr(settings, "NPC_DIALOGUE_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "NPC_DIALOGUE_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(npc_dialogue_ticker, "token_budget", DialogueTokenBudget())
+    monkeypatch.setattr(npc_dialogue_ticker, "record_token_usage", lambda *args: None)
+    await run_dialogue_jobs(StaticDialogueProvider(latency_seconds=0.3), [_job("hung")])
+
+    started = time.perf_counter()
+    [(_, result)] = await run_dialogue_jobs(StaticDialogueProvider(tokens_per_call=7), [_job("next")])
+
+    # The next cycle waits for the hung call's permit instead of adding a second call
+    assert time.perf_counter() - started >= 0.2
+    assert result.tokens_used == 7
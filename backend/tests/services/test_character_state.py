@@ -0,0 +1,168 @@
+# backend/tests/services/test_character_state.py
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.db import session as db_session
+from app.db.base_class import Base
+from app.services.character_state import character_state
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """A private in-memory DB behind the app's SessionLocal, with one tracked character."""
+    test_engine = create_engine(
+        "sqlite:///:memory:", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=test_engine)
+    monkeypatch.setattr(db_session, "engine", test_engine)
+    yield test_engine
+    character_state._entries.clear()
+    test_engine.dispose()
+
+
+@pytest.fixture
+def character_id(engine):
+    with db_session.SessionLocal(bind=engine) as db:
+        player = models.Player(username="keeper", hashed_password="x")
+        db.add(player)
+        db.flush()
+        character = models.Character(
+            name="Keeper",
+            player_id=player.id,
+            current_room_id=uuid.uuid4(),
+            current_health=40,
+            max_health=40,
+            gold_coins=10,
+        )
+        db.add(character)
+        db.commit()
+        character_state.track(character)
+        return character.id
+
+
+def _row(engine, character_id, column):
+    """What a restart after a crash would find: the row as stored, no in-memory state."""
+    with engine.connect() as connection:
+        return connection.execute(
+            select(getattr(models.Character, column)).where(models.Character.id == character_id)
+        ).scalar_one()
+
+
+def _hit(engine, character_id, damage):
+    with db_session.SessionLocal(bind=engine) as db:
+        character = db.get(models.Character, character_id)
+        character.current_health -= damage
+        db.commit()
+
+
+async def test_hot_change_is_held_in_memory_until_flushed(engine, character_id):
+    _hit(engine, character_id, 5)
+
+    assert _row(engine, character_id, "current_health") == 40
+    with db_session.SessionLocal(bind=engine) as db:
+        # Every ORM read sees the in-memory value
+        assert db.get(models.Character, character_id).current_health == 35
+
+    assert await character_state.flush() == 1
+    assert _row(engine, character_id, "current_health") == 35
+    assert character_state.dirty_count() == 0
+
+
+async def test_crash_loses_only_changes_since_last_flush(engine, character_id):
+    _hit(engine, character_id, 5)
+    await character_state.flush()
+    _hit(engine, character_id, 7)
+
+    character_state._entries.clear()  # The process dies: memory is gone
+
+    with db_session.SessionLocal(bind=engine) as db:
+        assert db.get(models.Character, character_id).current_health == 35
+
+
+async def test_coins_and_new_item_are_written_together(engine, character_id):
+    with db_session.SessionLocal(bind=engine) as db:
+        character = db.get(models.Character, character_id)
+        character.gold_coins -= 4
+        db.add(models.Item(name="Torch", item_type="misc", value=4))
+        db.commit()
+
+    # No flush: the purchase is already on disk with its price paid
+    assert _row(engine, character_id, "gold_coins") == 6
+    assert character_state.dirty_count() == 0
+
+
+async def test_rolled_back_change_never_reaches_memory(engine, character_id):
+    with db_session.SessionLocal(bind=engine) as db:
+        character = db.get(models.Character, character_id)
+        character.current_health = 1
+        db.flush()
+        db.rollback()
+
+    assert character_state.get(character_id)["current_health"] == 40
+    assert character_state.dirty_count() == 0
+
+
+async def test_failed_flush_is_retried(engine, character_id, monkeypatch):
+    _hit(engine, character_id, 5)
+
+    def unavailable(rows):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(character_state, "_write_rows", unavailable)
+        assert await character_state.flush() == 0
+    assert character_state.dirty_count() == 1
+
+    assert await character_state.flush() == 1
+    assert _row(engine, character_id, "current_health") == 35
+
+
+async def test_release_writes_back_and_stops_tracking(engine, character_id):
+    _hit(engine, character_id, 5)
+
+    await character_state.release(character_id)
+
+    assert _row(engine, character_id, "current_health") == 35
+    assert not character_state.is_tracked(character_id)
+
+
+async def test_staged_change_survives_refresh_before_commit(engine, character_id):
+    with db_session.SessionLocal(bind=engine) as db:
+        character = db.get(models.Character, character_id)
+        character.current_health = 12
+        db.flush()  # Handlers stage like this; the WS loop commits later
+        db.refresh(character)
+        assert character.current_health == 12
+        db.commit()
+
+    assert character_state.get(character_id)["current_health"] == 12
+
+
+async def test_write_through_between_snapshot_and_write_is_not_lost(engine, character_id, monkeypatch):
+    _hit(engine, character_id, 5)
+    write_rows = character_state._write_rows
+
+    def write_through_first(rows):
+        # A purchase commits hp 30 straight to the row after the flusher snapshotted hp 35
+        with db_session.SessionLocal(bind=engine) as db:
+            character = db.get(models.Character, character_id)
+            character.current_health = 30
+            db.add(models.Item(name="Torch", item_type="misc", value=4))
+            db.commit()
+        write_rows(rows)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(character_state, "_write_rows", write_through_first)
+        await character_state.flush()
+    assert _row(engine, character_id, "current_health") == 35  # The stale snapshot landed
+    assert character_state.dirty_count() == 1
+
+    await character_state.flush()
+    assert _row(engine, character_id, "current_health") == 30
+    assert character_state.dirty_count() == 0
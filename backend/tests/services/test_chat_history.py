@@ -0,0 +1,28 @@
+# backend/tests/services/test_chat_history.py
+import pytest
+
+from app.core.config import settings
+from app.services.chat_history import ChatHistory
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_failed_archive_write_requeues_the_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_ARCHIVE_DIR", str(tmp_path))
+    history = ChatHistory(per_channel=5)
+    for i in range(3):
+        history.record("ooc", "Alice", f"line {i}")
+
+    def fail(batch):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(history, "_write_batch", fail)
+    await history.flush_archive()
+    assert [line["message"] for line in history._archive_queue] == ["line 0", "line 1", "line 2"]
+    assert history.archive_dropped_count == 0
+
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "CHAT_ARCHIVE_DIR", str(tmp_path))
+    await history.flush_archive()
+    assert history.archived_count == 3
+    assert not history._archive_queue
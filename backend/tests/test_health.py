@@ -0,0 +1,57 @@
+# backend/tests/test_health.py
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.warmup import WarmUp, WarmupStep
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def seeded_client(tmp_path_factory):
+    """The real app on a seeded SQLite file (the warm-up reads it from the DB thread pool)."""
+    original_url = settings.DATABASE_URL
+    settings.DATABASE_URL = f"sqlite:///{tmp_path_factory.mktemp('health') / 'world.db'}"
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        settings.DATABASE_URL = original_url
+
+
+def test_readyz_turns_ready_once_every_warmup_step_has_run(seeded_client: TestClient):
+    assert seeded_client.get("/healthz").status_code == 200
+
+    deadline = time.monotonic() + 10
+    response = seeded_client.get("/readyz")
+    while response.status_code == 503 and time.monotonic() < deadline:
+        assert response.json()["status"] == "warming"
+        time.sleep(0.05)
+        response = seeded_client.get("/readyz")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ready"
+    assert report["steps_done"] == report["steps_total"] > 0
+    assert {step["state"] for step in report["steps"]} == {"done"}
+    assert seeded_client.get("/healthz").json()["warmup"] == "ready"
+
+
+def test_failed_warmup_step_is_reported_without_holding_back_readiness():
+    def broken(db):
+        raise RuntimeError("no catalog today")
+
+    async def warm():
+        warmup = WarmUp()
+        warmup.start([WarmupStep("broken", broken), WarmupStep("fine", lambda db: 3)])
+        assert await warmup.wait_ready(timeout=5)
+        return warmup.report()
+
+    report = asyncio.run(warm())
+    assert report["status"] == "ready"
+    assert [(s["name"], s["state"]) for s in report["steps"]] == [("broken", "failed"), ("fine", "done")]
+    assert report["steps"][0]["error"] == "no catalog today"
+    assert report["steps"][1]["count"] == 3
@@ -0,0 +1,12 @@
+# backend/tests/test_import_time.py
+import os
+
+from benchmarks.check_import_time import import_app, problems
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_defers_optional_libraries_and_seed_files():
+    cumulative, report = import_app(BACKEND_DIR)
+    assert "app.main" in cumulative
+    assert problems(report) == []
@@ -110,13 +110,18 @@ export const apiService = {
             // No body needed for this unequip endpoint
         }, token);
     },
+    logoutUser: (token) => {
+        return fetchData('/users/logout', { method: 'POST' }, token);
+    },
     fetchWhoList: async (token) => {
         const response = await fetch(`${API_BASE_URL}/character/who_list`, {
             // No token needed if it's a public endpoint, otherwise add:
             // headers: { 'Authorization': `Bearer ${token}` },
         });
         if (!response.ok) throw new Error('Failed to fetch who list');
-        return response.json();
+        // The version lets later who_list_updated diffs be applied on top of this list.
+        const version = response.headers.get('X-Who-List-Version');
+        return { entries: await response.json(), version: version === null ? null : Number(version) };
     },
     setHotbarSlot: (slotId, payload, token) => {
         return fetchData(`/character/me/hotbar/${slotId}`, {
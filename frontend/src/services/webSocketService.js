@@ -21,7 +21,7 @@ const handleMessage = (event) => {
         console.log("WS RCV:", serverData);
 
         // Get all the actions we might need from the store.
-        const { addLogLine, addMessage, setVitals, fetchWhoList, setHotbar, setCombatState } = getState(); // Add fetchWhoList
+        const { addLogLine, addMessage, setVitals, applyWhoListUpdate, setHotbar, setCombatState } = getState();
 
         switch (serverData.type) {
             case "welcome_package":
@@ -84,6 +84,11 @@ const handleMessage = (event) => {
                 setVitals(serverData);
                 break;
 
+            case "vitals_delta":
+                // Only the changed fields are present; setVitals merges them field by field.
+                setVitals(serverData);
+                break;
+
             case "inventory_update":
                 setState(state => {
                     state.inventory = serverData.inventory_data;
@@ -103,10 +108,24 @@ const handleMessage = (event) => {
                     addMessage(serverData.payload);
                 }
                 break;
+            case "chat_history":
+                // Catch-up on connect: one frame, messages are [ts, sender, text, is_self].
+                (serverData.channels || []).forEach(channel => {
+                    channel.messages.forEach(([, sender_name, message, is_self]) => {
+                        addMessage({
+                            channel_tag: channel.channel_tag,
+                            channel_display: channel.channel_display,
+                            style: channel.style,
+                            sender_name,
+                            message,
+                            is_self: Boolean(is_self),
+                        });
+                    });
+                });
+                break;
 
-            case "who_list_updated": // New case
-                console.log("WS: Received who_list_updated, fetching new list.");
-                fetchWhoList();
+            case "who_list_updated": // Versioned diff; falls back to a refetch on a gap
+                applyWhoListUpdate(serverData);
                 break;
 
             case "shop_listing":
@@ -29,6 +29,7 @@ const initialState = {
   inventory: null,
   abilities: null,
   whoListData: null, // Added for Who List
+  whoListVersion: null,
   hotbar: {},
   combatState: { isInCombat: false, targets: [], currentTargetId: null },   
 };
@@ -170,14 +171,32 @@ const useGameStore = create(
       // const token = get().token; // Needed if endpoint is secured
       // if (!token && endpoint_is_secured) return;
       try {
-        const whoData = await apiService.fetchWhoList(/*token*/);
-        set({ whoListData: whoData });
+        const { entries, version } = await apiService.fetchWhoList(/*token*/);
+        set({ whoListData: entries, whoListVersion: version });
       } catch (error) {
         console.error("Failed to fetch who list:", error);
         get().addLogLine("! Could not retrieve who list.");
       }
     },
 
+    applyWhoListUpdate: (update) => {
+      const { whoListData, whoListVersion } = get();
+      if (!whoListData) return; // Not loaded yet; the Who tab fetches it when opened
+      if (whoListVersion === null || update.version !== whoListVersion + 1) {
+        get().fetchWhoList(); // Missed a diff (or the server restarted): resync from the full list
+        return;
+      }
+      const changed = [...update.joined, ...update.updated];
+      const dropped = new Set([...update.left, ...changed.map(entry => entry.name)].map(name => name.toLowerCase()));
+      set(state => {
+        state.whoListData = state.whoListData
+          .filter(entry => !dropped.has(entry.name.toLowerCase()))
+          .concat(changed)
+          .sort((a, b) => (a.name.toLowerCase() < b.name.toLowerCase() ? -1 : 1));
+        state.whoListVersion = update.version;
+      });
+    },
+
     setCombatState: (payload) => { // <<< ADD THIS WHOLE ACTION
       set(state => {
         state.combatState.isInCombat = payload.is_in_combat;
@@ -186,6 +205,11 @@ const useGameStore = create(
     },
 
     logout: () => {
+      // Let the server drop its cached session for this token (best effort)
+      const token = get().token;
+      if (token) {
+        apiService.logoutUser(token).catch(error => console.warn("Logout request failed:", error));
+      }
       // Disconnect WebSocket if connected
       const { webSocketService } = require('../services/webSocketService');
       webSocketService.disconnect();
@@ -209,6 +233,7 @@ const useGameStore = create(
         inventory: null,
         abilities: null,
         whoListData: null,
+        whoListVersion: null,
         hotbar: {},
         combatState: { isInCombat: false, targets: [], currentTargetId: null },
       });